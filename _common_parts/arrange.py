@@ -0,0 +1,210 @@
+import math
+import time
+
+import numpy as np
+from build123d import Location
+
+from _common_parts.instancing import Instances
+
+# Default bed width and depth in mm, 220 x 220 fits most consumer printers.
+# Pass bed= to arrange() for a bigger or smaller one
+BED_SIZE = (220, 220)
+
+# Gap between footprints in mm, enough for the nozzle to travel between
+# islands without dragging strings across a neighbour
+SPACING = 3.0
+
+
+def _convex_hull(points: np.ndarray) -> np.ndarray:
+    # Andrew's monotone chain, counter-clockwise without repeating the first point
+    points = np.unique(np.round(points, 4), axis=0)
+    if len(points) < 3:
+        return points
+
+    def half(ordered):
+        chain = []
+        for p in ordered:
+            while len(chain) >= 2:
+                (ax, ay), (bx, by) = chain[-2], chain[-1]
+                if (bx - ax) * (p[1] - ay) - (by - ay) * (p[0] - ax) > 0:
+                    break
+                chain.pop()
+            chain.append(tuple(p))
+        return chain[:-1]
+
+    return np.array(half(points) + half(points[::-1]))
+
+
+def footprint(shape, tolerance: float = 0.1) -> np.ndarray:
+    """
+    Convex hull of a shape projected onto the bed (XY), as counter-clockwise
+    (n, 2) points. Works on B-rep solids and imported STL meshes alike.
+
+    Args:
+        shape: Part in print orientation
+        tolerance: Tessellation tolerance in mm
+    """
+    vertices, _ = shape.tessellate(tolerance)
+    return _convex_hull(np.array([(v.X, v.Y) for v in vertices]))
+
+
+def _min_area_rectangle(hull: np.ndarray):
+    # The smallest enclosing rectangle has a side on a hull edge, try each
+    edges = np.roll(hull, -1, axis=0) - hull
+    angles = np.unique(np.mod(np.arctan2(edges[:, 1], edges[:, 0]), math.pi / 2))
+    cos, sin = np.cos(angles)[:, None], np.sin(angles)[:, None]
+    # Hull rotated by -angle, one row per candidate
+    x = hull[:, 0] * cos + hull[:, 1] * sin
+    y = -hull[:, 0] * sin + hull[:, 1] * cos
+    areas = np.ptp(x, axis=1) * np.ptp(y, axis=1)
+    best = int(np.argmin(areas))
+    return float(angles[best]), float(np.ptp(x[best])), float(np.ptp(y[best]))
+
+
+class _Skyline:
+    # Bottom-left skyline packing: the top edge of everything placed so far
+    # as (x, y, width) segments, each rectangle goes where its top is lowest
+
+    def __init__(self, width: float, height: float):
+        self.width, self.height = width, height
+        self.segments = [(0.0, 0.0, width)]
+
+    def _fit(self, index: int, width: float, height: float):
+        x = self.segments[index][0]
+        if x + width > self.width + 1e-9:
+            return None
+        y, covered = 0.0, 0.0
+        for sx, sy, sw in self.segments[index:]:
+            y = max(y, sy)
+            covered = sx + sw - x
+            if covered >= width - 1e-9:
+                break
+        if y + height > self.height + 1e-9:
+            return None
+        return x, y
+
+    def insert(self, width: float, height: float, rotate: bool = True):
+        """Place a rectangle, returns (x, y, rotated) or None when it does not fit."""
+        best = None
+        for w, h, rotated in ((width, height, False), (height, width, True))[:2 if rotate else 1]:
+            for index in range(len(self.segments)):
+                spot = self._fit(index, w, h)
+                if spot and (best is None or (spot[1] + h, spot[0]) < (best[1] + best[3], best[0])):
+                    best = (spot[0], spot[1], w, h, rotated)
+        if best is None:
+            return None
+
+        x, y, w, h, rotated = best
+        segments = []
+        for sx, sy, sw in self.segments:
+            # Keep the parts of old segments left and right of the new top
+            if sx < x:
+                segments.append((sx, sy, min(sw, x - sx)))
+            if sx + sw > x + w:
+                start = max(sx, x + w)
+                segments.append((start, sy, sx + sw - start))
+        segments.append((x, y + h, w))
+        segments.sort()
+        # Merge neighbours at the same height
+        self.segments = []
+        for segment in segments:
+            if self.segments and abs(self.segments[-1][1] - segment[1]) < 1e-9:
+                px, py, pw = self.segments[-1]
+                self.segments[-1] = (px, py, pw + segment[2])
+            else:
+                self.segments.append(segment)
+        return x, y, rotated
+
+
+def _pack(copies: list, shapes: list, width: float, height: float, spacing: float, rotate: bool):
+    # One plate: (index, x, y, rotated) per placed copy, plus the copies left over
+    skyline = _Skyline(width, height)
+    placed, remaining = [], []
+    for index, copy in copies:
+        _, _, _, part_width, part_depth, _, _ = shapes[index]
+        spot = skyline.insert(part_width + spacing, part_depth + spacing, rotate)
+        if spot is None:
+            remaining.append((index, copy))
+        else:
+            placed.append((index, *spot))
+    return placed, remaining
+
+
+def _extent(placed: list, shapes: list) -> tuple:
+    if not placed:
+        return 0.0, 0.0
+    return (max(x + (shapes[i][4] if r else shapes[i][3]) for i, x, _, r in placed),
+            max(y + (shapes[i][3] if r else shapes[i][4]) for i, _, y, r in placed))
+
+
+def arrange(parts: list, bed: tuple = BED_SIZE, spacing: float = SPACING, rotate: bool = True) -> list:
+    """
+    Pack copies of parts flat onto build plates.
+
+    Each part's footprint is the convex hull of its projected mesh, turned
+    into its smallest enclosing rectangle and packed with a bottom-left
+    skyline heuristic, largest first, into the most compact area that
+    holds them. Copies that don't fit start a new plate. Every plate is
+    centered on the origin like the slicer bed.
+
+        connector = Rot(90, 0, 0) * import_stl("source_connector.stl")
+        plates = arrange([(connector, 30)])
+        export_instances(plates[0], "connectors")
+
+    Args:
+        parts: (shape, count) pairs, shapes in print orientation
+        bed: Bed width and depth in mm, defaults to BED_SIZE
+        spacing: Gap between footprints in mm
+        rotate: Allow turning footprints by 90 degrees
+
+    Returns:
+        One list of Instances per plate, at most one Instances per part
+    """
+    start = time.perf_counter()
+    shapes = []
+    for shape, count in parts:
+        hull = footprint(shape)
+        angle, width, depth = _min_area_rectangle(hull)
+        shapes.append((shape, hull, angle, width, depth, shape.bounding_box().min.Z, count))
+
+    # Largest first, small parts fill the gaps
+    copies = sorted(((i, copy) for i, s in enumerate(shapes) for copy in range(s[-1])),
+                    key=lambda item: -shapes[item[0]][3] * shapes[item[0]][4])
+    plates = []
+    while copies:
+        # Short travels need a compact plate, not a strip along the bed edge:
+        # pack into a square-ish area first, widen it until everything fits
+        area = sum((shapes[i][3] + spacing) * (shapes[i][4] + spacing) for i, _ in copies)
+        widths = np.linspace(min(math.sqrt(area), bed[0]), bed[0], 8) + spacing
+        best = None
+        for width in widths:
+            placed, remaining = _pack(copies, shapes, width, bed[1] + spacing, spacing, rotate)
+            score = (len(remaining), sum(_extent(placed, shapes)))
+            if best is None or score < best[0]:
+                best = score, placed, remaining
+        _, placed, remaining = best
+        if not placed:
+            raise ValueError(f"Part {copies[0][0]} does not fit on a {bed[0]}x{bed[1]} mm bed")
+
+        # Center what was placed on the origin
+        extent_x, extent_y = _extent(placed, shapes)
+        plate = {}
+        for index, x, y, rotated in placed:
+            shape, hull, angle, _, _, bottom, _ = shapes[index]
+            turn = angle - math.pi / 2 if rotated else angle
+            # Hull turned by -turn, its lower left corner goes to (x, y)
+            cos, sin = math.cos(turn), math.sin(turn)
+            low_x = np.min(hull[:, 0] * cos + hull[:, 1] * sin)
+            low_y = np.min(-hull[:, 0] * sin + hull[:, 1] * cos)
+            location = Location(
+                (x - extent_x / 2 - low_x, y - extent_y / 2 - low_y, -bottom),
+                (0, 0, -math.degrees(turn)))
+            if index not in plate:
+                plate[index] = Instances(shape)
+            plate[index].place(location)
+        plates.append([plate[i] for i in sorted(plate)])
+        copies = remaining
+
+    total = sum(count for _, count in parts)
+    print(f"Arranged {total} parts on {len(plates)} plate(s) ({time.perf_counter() - start:.2f}s)")
+    return plates
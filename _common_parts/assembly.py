@@ -0,0 +1,261 @@
+"""
+Interference and clearance between the parts of an assembly, as positioned.
+
+    results = check_assembly({"front": front, "back": back, "foot": foot})
+    print_report(results)
+
+    model.check_assembly()      # every ModelGraph node, see model_graph.py
+
+    python -m _common_parts.assembly ac_pir_detector_case/*.step
+
+Every part is tessellated once and put in a BVH (see bvh.py). For each pair
+of parts the two trees are walked against each other down to the triangle
+pairs that touch or could be the closest pair, and only those get an exact
+triangle distance. That gives the minimum clearance, and the triangle pairs
+closer than the tessellation error are grouped into candidate regions.
+Surfaces that never come close can still overlap when one part sits
+inside the other, so such pairs also cast one ray from a vertex of each
+part against the other part's BVH. Only pairs with candidate regions or a
+part inside the other go to OCCT for an exact intersection,
+which tells real interference (a volume) from parts that just touch; its
+solids are reported in the region they fall in. Clipping the B-reps to the
+region boxes first was tried and is slower: the boolean already skips face
+pairs whose boxes don't meet, while every clip is a boolean of its own.
+"""
+import argparse
+import sys
+import time
+from dataclasses import dataclass, field
+from itertools import combinations
+from pathlib import Path
+
+import numpy as np
+from build123d import import_step
+from scipy import ndimage
+
+from _common_parts import mesh_io
+from _common_parts.bvh import BVH, triangle_distance
+from _common_parts.indexed_mesh import IndexedMesh
+
+# Tessellation for the check, in mm. Meshes are this far off the B-rep at
+# most, so triangles of two parts closer than twice this may touch
+TESSELLATION_TOLERANCE = 0.01
+# Candidate triangle pairs are grouped by cells of this size in mm
+REGION_CELL = 2.0
+# Overlap solids within this many mm of a region's box belong to it
+REGION_MARGIN = 0.5
+# Exact overlaps below this in mm3 count as touching
+VOLUME_TOLERANCE = 1e-3
+# Direction of the containment ray, off the axes so it doesn't graze the
+# edges of boxy parts
+INSIDE_RAY = np.array([0.48, 0.6, 0.64])
+# Triangle pairs per exact distance batch
+PAIR_CHUNK = 1 << 14
+
+
+@dataclass
+class Region:
+    """
+    Box where two parts touch or may overlap.
+
+    Attributes:
+        lower, upper: Box corners in mm
+        volume: Exact overlap of the parts in this region in mm3
+    """
+    lower: np.ndarray
+    upper: np.ndarray
+    volume: float = 0.0
+
+
+@dataclass
+class PairCheck:
+    """
+    Result for two parts.
+
+    Attributes:
+        first, second: Part names
+        clearance: Smallest distance between the parts in mm, from the
+            tessellations, 0 where they touch or overlap or one is inside
+            the other
+        location: Midpoint of the closest triangles
+        regions: Candidate regions with their exact overlap
+        seconds: Time the pair took, exact intersections included
+    """
+    first: str
+    second: str
+    clearance: float
+    location: np.ndarray
+    regions: list = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def interferences(self) -> list:
+        return [r for r in self.regions if r.volume > VOLUME_TOLERANCE]
+
+    @property
+    def overlap_volume(self) -> float:
+        return sum(r.volume for r in self.interferences)
+
+
+def _regions(boxes_lower: np.ndarray, boxes_upper: np.ndarray, cell: float) -> list:
+    # Group boxes whose centres share or neighbour a grid cell, one Region each
+    centres = (boxes_lower + boxes_upper) / 2
+    origin = centres.min(axis=0)
+    cells = np.floor((centres - origin) / cell).astype(np.int64)
+    grid = np.zeros(cells.max(axis=0) + 1, dtype=bool)
+    grid[tuple(cells.T)] = True
+    labels, count = ndimage.label(grid, structure=np.ones((3, 3, 3)))
+    group = labels[tuple(cells.T)] - 1
+    lower = np.full((count, 3), np.inf)
+    upper = np.full((count, 3), -np.inf)
+    np.minimum.at(lower, group, boxes_lower)
+    np.maximum.at(upper, group, boxes_upper)
+    return [Region(low, high) for low, high in zip(lower, upper)]
+
+
+def _add_overlaps(first, second, regions: list, margin: float):
+    # Exact B-rep intersection, each overlap solid added to the region it
+    # is in, or as a region of its own. build123d gives None for no overlap
+    overlap = first & second
+    for solid in overlap.solids() if overlap is not None else []:
+        box = solid.bounding_box()
+        low, high = np.array(tuple(box.min)), np.array(tuple(box.max))
+        centre = (low + high) / 2
+        for region in regions:
+            if np.all(centre >= region.lower - margin) and np.all(centre <= region.upper + margin):
+                region.volume += solid.volume
+                break
+        else:
+            regions.append(Region(low, high, solid.volume))
+
+
+def _inside(point: np.ndarray, tree: BVH) -> bool:
+    # A point is inside a closed mesh when the first face a ray from it
+    # hits faces away from it, the ray leaving the mesh
+    _, face = tree.intersect(point[None], INSIDE_RAY[None])
+    if face[0] < 0:
+        return False
+    corners = tree.triangles[face[0]]
+    normal = np.cross(corners[1] - corners[0], corners[2] - corners[0])
+    # A mesh wound inside out has its normals pointing in
+    outward = 1.0 if mesh_io.volume(tree.triangles) >= 0 else -1.0
+    return float(normal @ INSIDE_RAY) * outward > 0
+
+
+def check_pair(first: str, second: str, parts: dict, meshes: dict, trees: dict,
+               contact: float, exact: bool = True) -> PairCheck:
+    """
+    Clearance and interference of two parts.
+
+    Args:
+        first, second: Part names, keys of the other arguments
+        parts: Name to build123d shape
+        meshes: Name to IndexedMesh
+        trees: Name to BVH of the mesh
+        contact: Triangles closer than this in mm are candidates
+        exact: Intersect the B-reps when there are candidate regions
+    """
+    start = time.perf_counter()
+    a, b = meshes[first].triangles.astype(np.float64), meshes[second].triangles.astype(np.float64)
+    mine, theirs, gap = trees[first].near_pairs(trees[second], contact, closest=True)
+    # Nearest boxes first: once the closest distance so far is below the
+    # next box gap, the remaining pairs only matter if they touch
+    order = np.argsort(gap, kind="stable")
+    mine, theirs, gap = mine[order], theirs[order], gap[order]
+    distance = np.full(len(mine), np.inf)
+    for chunk in range(0, len(mine), PAIR_CHUNK):
+        if gap[chunk] > max(contact, distance.min()):
+            break
+        part = slice(chunk, chunk + PAIR_CHUNK)
+        distance[part] = triangle_distance(a[mine[part]], b[theirs[part]])
+
+    if not len(distance):
+        return PairCheck(first, second, np.inf, np.full(3, np.nan), seconds=time.perf_counter() - start)
+    closest = int(np.argmin(distance))
+    location = (a[mine[closest]].mean(axis=0) + b[theirs[closest]].mean(axis=0)) / 2
+    result = PairCheck(first, second, float(distance[closest]), location)
+
+    touching = distance <= contact
+    if touching.any():
+        ta, tb = a[mine[touching]], b[theirs[touching]]
+        lower = np.minimum(ta.min(axis=1), tb.min(axis=1))
+        upper = np.maximum(ta.max(axis=1), tb.max(axis=1))
+        result.regions = _regions(lower, upper, REGION_CELL)
+        if exact:
+            _add_overlaps(parts[first], parts[second], result.regions, REGION_MARGIN)
+    else:
+        # Surfaces apart, so either the parts are apart or one holds the
+        # other whole: any vertex of the inner one tells
+        for inner, outer in ((first, second), (second, first)):
+            mesh = meshes[inner]
+            if len(mesh.vertices) and _inside(mesh.vertices[0].astype(np.float64), trees[outer]):
+                lower, upper = mesh.bounds()
+                result.clearance = 0.0
+                result.regions = [Region(lower.astype(np.float64), upper.astype(np.float64))]
+                if exact:
+                    _add_overlaps(parts[first], parts[second], result.regions, REGION_MARGIN)
+                break
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def check_assembly(parts: dict, tolerance: float = TESSELLATION_TOLERANCE, exact: bool = True) -> list:
+    """
+    Check every pair of parts for interference and clearance.
+
+    Args:
+        parts: Name to build123d shape, each where it sits in the assembly
+        tolerance: Tessellation tolerance in mm
+        exact: Intersect the B-reps of pairs with candidate regions,
+            False for the mesh result only
+
+    Returns:
+        PairCheck per pair of parts, in the order of the dict
+    """
+    meshes = {name: IndexedMesh.from_part(part, tolerance) for name, part in parts.items()}
+    trees = {name: BVH(mesh.triangles) for name, mesh in meshes.items()}
+    return [check_pair(first, second, parts, meshes, trees, 2 * tolerance, exact)
+            for first, second in combinations(parts, 2)]
+
+
+def _point(values: np.ndarray) -> str:
+    return "(" + ", ".join(f"{v:.2f}" for v in values) + ")"
+
+
+def print_report(results: list):
+    if not results:
+        print("Fewer than two parts, nothing to check")
+        return
+    width = max(len(f"{r.first} / {r.second}") for r in results)
+    print(f"{'parts':<{width}}  {'clearance mm':>12}  {'overlap mm3':>11}  regions  closest at")
+    for result in results:
+        pair = f"{result.first} / {result.second}"
+        print(f"{pair:<{width}}  {result.clearance:>12.3f}  {result.overlap_volume:>11.3f}  "
+              f"{len(result.regions):>7}  {_point(result.location)}  ({result.seconds:.2f}s)")
+        for region in result.interferences:
+            print(f"{'':<{width}}  overlap {region.volume:.3f} mm3 in {_point(region.lower)} - {_point(region.upper)}")
+    interfering = sum(bool(r.interferences) for r in results)
+    print(f"{interfering} of {len(results)} pairs interfere")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check assembled parts for interference and clearance.")
+    parser.add_argument("step", type=Path, nargs="+", help="STEP files of the parts, as positioned in the assembly")
+    parser.add_argument("--tolerance", type=float, default=TESSELLATION_TOLERANCE,
+                        help=f"Tessellation tolerance in mm (default: {TESSELLATION_TOLERANCE})")
+    parser.add_argument("--mesh-only", action="store_true", help="Skip the exact B-rep intersections")
+    args = parser.parse_args(argv)
+
+    missing = [str(path) for path in args.step if not path.exists()]
+    if missing:
+        parser.error(f"No such file: {', '.join(missing)}")
+    start = time.perf_counter()
+    parts = {path.stem: import_step(path) for path in args.step}
+    results = check_assembly(parts, args.tolerance, exact=not args.mesh_only)
+    print_report(results)
+    print(f"Checked {len(parts)} parts in {time.perf_counter() - start:.2f}s")
+    return 1 if any(r.interferences for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""
+Build and export timings for every model, kept in a JSON history.
+
+    python -m _common_parts.benchmark                     # every model, 3 runs each
+    python -m _common_parts.benchmark gear_slotter wl_1865 -n 5
+    python -m _common_parts.benchmark --compare           # and compare with the previous entry
+    python -m _common_parts.benchmark --report --compare 0  # newest entry against the first, no builds
+
+Every run is a fresh Python process building without the BREP and export
+caches, so each number is what a cold build costs. Per model it records:
+    import: build123d, OCP and _common_parts
+    construction: the script itself, everything but the exports
+    mesh, step, stl, 3mf: export_model's steps, summed over the model's exports
+The history keeps the median and every sample of each, plus the library
+versions, so a build123d or OCCT upgrade can be checked against the entry
+before it.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+DEFAULT_HISTORY = REPO_ROOT / "build" / "benchmarks.json"
+
+METRICS = ("import", "construction", "mesh", "step", "stl", "3mf", "total")
+
+# Slower than the reference by this fraction is a regression
+THRESHOLD = 0.10
+# Differences below this many seconds are noise, whatever the ratio
+NOISE_FLOOR = 0.05
+
+
+def _measure(script: Path) -> dict:
+    # Runs in the benchmark's child process, the imports are part of the timing
+    start = time.perf_counter()
+    import build123d  # noqa: F401
+    from _common_parts import brep_cache, export_cache
+    from _common_parts.model_runner import run_model
+    imported = time.perf_counter()
+
+    brep_cache.ENABLED = export_cache.ENABLED = False
+    exports = {}
+    with tempfile.TemporaryDirectory() as output, \
+            contextlib.redirect_stdout(io.StringIO()):
+        run_model(script, Path(output), timings=exports)
+    end = time.perf_counter()
+
+    result = {step: sum(t.get(step, 0.0) for t in exports.values()) for step in ("mesh", "step", "stl", "3mf")}
+    exporting = sum(result.values())
+    result["import"] = imported - start
+    result["construction"] = end - imported - exporting
+    result["total"] = end - start
+    return result
+
+
+def _run_once(script: Path) -> dict:
+    # Draft mode would skip the exports and the fillets
+    env = {name: value for name, value in os.environ.items() if name != "DRAFT_MODE"}
+    completed = subprocess.run(
+        [sys.executable, "-m", "_common_parts.benchmark", "--measure", str(script)],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        lines = completed.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"exit code {completed.returncode}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _versions() -> dict:
+    import build123d
+    import OCP
+    return {
+        "python": platform.python_version(),
+        "build123d": build123d.__version__,
+        "ocp": getattr(OCP, "__version__", None),
+    }
+
+
+def benchmark(scripts: list, runs: int = 3, label: str = None) -> dict:
+    """
+    Time every script over repeated cold runs.
+
+    Runs go round-robin over the scripts, so slow drift of the machine
+    (thermals, other programs) spreads over every model instead of one.
+
+    Args:
+        scripts: Model scripts
+        runs: Runs per script
+        label: Note stored with the entry, e.g. "build123d 0.10 upgrade"
+
+    Returns:
+        History entry: time, label, versions and per model the median
+        and samples of each metric, or the error of a failed model
+    """
+    from _common_parts.model_runner import model_name
+
+    samples = {model_name(s): {metric: [] for metric in METRICS} for s in scripts}
+    errors = {}
+    for run in range(runs):
+        for script in scripts:
+            name = model_name(script)
+            if name in errors:
+                continue
+            try:
+                result = _run_once(script)
+            except RuntimeError as error:
+                errors[name] = str(error)
+                print(f"[{run + 1}/{runs}] {name}: FAILED {error}")
+                continue
+            for metric in METRICS:
+                samples[name][metric].append(result[metric])
+            print(f"[{run + 1}/{runs}] {name}: {result['total']:.2f}s")
+
+    models = {}
+    for name, values in samples.items():
+        if name in errors:
+            models[name] = {"error": errors[name]}
+        else:
+            models[name] = {
+                "median": {metric: statistics.median(v) for metric, v in values.items()},
+                "samples": values,
+            }
+    return {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "label": label,
+        "machine": platform.node(),
+        "runs": runs,
+        "versions": _versions(),
+        "profile": os.environ.get("OCCT_PROFILE"),
+        "models": models,
+    }
+
+
+def load_history(path: Path) -> list:
+    path = Path(path)
+    return json.loads(path.read_text()) if path.exists() else []
+
+
+def save_history(path: Path, history: list):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(history, indent=1))
+
+
+def compare(entry: dict, reference: dict, threshold: float = THRESHOLD, noise_floor: float = NOISE_FLOOR) -> list:
+    """
+    Compare the medians of two history entries, model by model.
+
+    Args:
+        entry: The newer entry
+        reference: The entry to compare against
+        threshold: Fraction slower that counts as a regression
+        noise_floor: Seconds a difference must exceed to count
+
+    Returns:
+        (model, metric, reference seconds, new seconds, regressed) for
+        every metric both entries measured
+    """
+    rows = []
+    for name, result in entry["models"].items():
+        before = reference["models"].get(name, {}).get("median")
+        after = result.get("median")
+        if not before or not after:
+            continue
+        for metric in METRICS:
+            old, new = before[metric], after[metric]
+            regressed = new > old * (1 + threshold) and new - old > noise_floor
+            rows.append((name, metric, old, new, regressed))
+    return rows
+
+
+def _describe(entry: dict) -> str:
+    versions = entry["versions"]
+    text = f"{entry['time']} build123d {versions['build123d']}, OCP {versions['ocp']}"
+    return f"{text} ({entry['label']})" if entry.get("label") else text
+
+
+def print_results(entry: dict):
+    names = list(entry["models"])
+    width = max(len(n) for n in names) if names else 5
+    print(f"{'model':<{width}}  " + "  ".join(f"{m:>12}" for m in METRICS))
+    for name in names:
+        result = entry["models"][name]
+        if "error" in result:
+            print(f"{name:<{width}}  FAILED: {result['error']}")
+        else:
+            print(f"{name:<{width}}  " + "  ".join(f"{result['median'][m]:>11.3f}s" for m in METRICS))
+
+
+def print_comparison(rows: list, entry: dict, reference: dict, threshold: float):
+    print(f"\nNew:       {_describe(entry)}")
+    print(f"Reference: {_describe(reference)}")
+    if not rows:
+        print("No models in common")
+        return
+    width = max(len(r[0]) for r in rows)
+    for name, metric, old, new, regressed in rows:
+        change = (new - old) / old if old else 0.0
+        flag = "REGRESSION" if regressed else ""
+        print(f"{name:<{width}}  {metric:<12}  {old:>8.3f}s -> {new:>8.3f}s  {change:>+7.1%}  {flag}")
+    regressions = sum(r[4] for r in rows)
+    print(f"{regressions} regression(s) beyond {threshold:.0%}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark building and exporting every model.")
+    parser.add_argument("models", nargs="*",
+                        help="Only models whose name contains one of these (default: every model)")
+    parser.add_argument("-n", "--runs", type=int, default=3, help="Cold runs per model (default: 3)")
+    parser.add_argument("--label", default=None, help="Note stored with the results")
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY,
+                        help=f"History file (default: {DEFAULT_HISTORY.relative_to(REPO_ROOT)})")
+    parser.add_argument("--no-save", action="store_true", help="Don't append the results to the history")
+    parser.add_argument("--compare", type=int, nargs="?", const=-1, default=None, metavar="INDEX",
+                        help="Compare with this history entry (default: the one before the new results)")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help=f"Slowdown that counts as a regression (default: {THRESHOLD})")
+    parser.add_argument("--report", action="store_true",
+                        help="Don't build, use the newest history entry as the new results")
+    parser.add_argument("--measure", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        print(json.dumps(_measure(args.measure)))
+        return 0
+
+    history = load_history(args.history)
+    if args.report:
+        if not history:
+            parser.error(f"No results in {args.history}")
+        entry, previous = history[-1], history[:-1]
+    else:
+        from _common_parts.model_runner import find_models, model_name
+        scripts = [s for s in find_models()
+                   if not args.models or any(m in model_name(s) for m in args.models)]
+        if not scripts:
+            parser.error(f"No model matches {', '.join(args.models)}")
+        entry, previous = benchmark(scripts, args.runs, args.label), history
+        if not args.no_save:
+            save_history(args.history, history + [entry])
+            print(f"Saved to {args.history}")
+    print()
+    print_results(entry)
+
+    if args.compare is None:
+        return 0
+    try:
+        reference = previous[args.compare]
+    except IndexError:
+        parser.error(f"No history entry {args.compare} to compare with ({len(previous)} available)")
+    rows = compare(entry, reference, args.threshold)
+    print_comparison(rows, entry, reference, args.threshold)
+    return 1 if any(r[4] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
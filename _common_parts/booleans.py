@@ -0,0 +1,94 @@
+from build123d import Compound, Part, Shape
+from build123d.topology import downcast
+from OCP.BRepAlgoAPI import BRepAlgoAPI_Cut, BRepAlgoAPI_Fuse
+from OCP.ShapeUpgrade import ShapeUpgrade_UnifySameDomain
+from OCP.TopoDS import TopoDS_Compound
+
+try:
+    from OCP.collections import List_TopoDS_Shape as TopTools_ListOfShape
+except ImportError:  # OCP < 8
+    from OCP.TopTools import TopTools_ListOfShape
+
+# Fuzzy tolerance in mm applied to every boolean, None for exact booleans.
+# Set it with set_fuzzy_value(), which also covers build123d's operators.
+FUZZY_VALUE = None
+
+_bool_op = Shape._bool_op
+
+
+def _shape_list(shapes) -> TopTools_ListOfShape:
+    result = TopTools_ListOfShape()
+    for shape in shapes:
+        if shape is not None and shape.wrapped is not None:
+            result.Append(shape.wrapped)
+    return result
+
+
+def _fuzzy_bool_op(self, args, tools, operation):
+    if FUZZY_VALUE:
+        operation.SetFuzzyValue(FUZZY_VALUE)
+    return _bool_op(self, args, tools, operation)
+
+
+def set_fuzzy_value(fuzzy: float = None):
+    """
+    Set the fuzzy tolerance of every boolean: batch_boolean and build123d's
+    +, -, & operators and the add/subtract/intersect operations.
+
+    A small fuzzy value lets touching and coplanar solids fuse cleanly
+    instead of leaving slivers or failing.
+
+    Args:
+        fuzzy: Tolerance in mm, None for exact booleans
+    """
+    global FUZZY_VALUE
+    FUZZY_VALUE = fuzzy
+    Shape._bool_op = _fuzzy_bool_op if fuzzy else _bool_op
+
+
+def _run(operation, base, tools: list, parallel: bool, fuzzy: float):
+    if not tools:
+        return base.wrapped
+    operation.SetArguments(_shape_list([base]))
+    operation.SetTools(_shape_list(tools))
+    operation.SetRunParallel(parallel)
+    if fuzzy is None:
+        fuzzy = FUZZY_VALUE
+    if fuzzy:
+        operation.SetFuzzyValue(fuzzy)
+    operation.Build()
+    if not operation.IsDone():
+        raise RuntimeError(f"{type(operation).__name__} with {len(tools)} tools failed")
+    return operation.Shape()
+
+
+def batch_boolean(base, fuse: list = (), cut: list = (), parallel: bool = True, fuzzy: float = None):
+    """
+    Fuse and cut many tools in single multi-argument OCCT booleans.
+
+    `base + a + b - c - d` builds a new intermediate solid per operator and
+    intersects every tool with an ever-growing shape. This runs one fuse with
+    all fuse tools, then one cut with all cut tools, and cleans once at the end.
+
+    Args:
+        base: Shape everything is applied to
+        fuse: Shapes to add
+        cut: Shapes to subtract, applied after the fuse
+        parallel: Let OCCT run the boolean on all cores
+        fuzzy: Fuzzy tolerance in mm for touching/coplanar tools, defaults to FUZZY_VALUE
+
+    Returns:
+        Part with the result
+    """
+    fused = _run(BRepAlgoAPI_Fuse(), base, list(fuse), parallel, fuzzy)
+    result = _run(BRepAlgoAPI_Cut(), Shape.cast(downcast(fused)), list(cut), parallel, fuzzy)
+
+    # Merge the faces split by the tools, like build123d does after booleans
+    upgrader = ShapeUpgrade_UnifySameDomain(result, True, True, True)
+    upgrader.AllowInternalEdges(False)
+    upgrader.Build()
+    result = downcast(upgrader.Shape())
+
+    if isinstance(result, TopoDS_Compound):
+        return Part(result)
+    return Part(Compound([Shape.cast(result)]).wrapped)
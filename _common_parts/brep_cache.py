@@ -0,0 +1,119 @@
+import functools
+import hashlib
+import importlib
+import inspect
+import json
+import os
+from importlib import metadata
+from pathlib import Path
+
+import OCP
+from build123d import Part, Shape
+from build123d.topology import downcast
+from OCP.BinTools import BinTools
+from OCP.TopoDS import TopoDS_Compound, TopoDS_Shape
+
+from _common_parts import draft
+from _common_parts.part_cache import dependencies, module_constants, plain_class
+
+# Persistent store of expensive solids (threads, screws) in OCCT's binary
+# BREP format. Survives across processes and build runs.
+BREP_CACHE_DIR = Path(os.environ.get(
+    "BREP_CACHE_DIR", Path(__file__).parent.parent / ".brep_cache"))
+ENABLED = os.environ.get("BREP_CACHE", "1") != "0"
+
+
+def _library_versions() -> dict:
+    versions = {"OCP": getattr(OCP, "__version__", "unknown")}
+    for package in ("build123d", "bd_warehouse"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = "unknown"
+    return versions
+
+
+def save_brep(shape, path: Path):
+    """Write a shape as binary BREP, atomically so parallel builds never read half a file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    BinTools.Write_s(shape.wrapped, str(tmp))
+    os.replace(tmp, path)
+
+
+def load_brep(path: Path):
+    """Read a binary BREP file back into a build123d Part or Solid."""
+    shape = TopoDS_Shape()
+    BinTools.Read_s(shape, str(path))
+    shape = downcast(shape)
+    if isinstance(shape, TopoDS_Compound):
+        return Part(shape)
+    return Shape.cast(shape)
+
+
+def _class_name(cls: type) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def _load_class(name: str) -> type:
+    module, qualname = name.split(":")
+    value = importlib.import_module(module)
+    for attribute in qualname.split("."):
+        value = getattr(value, attribute)
+    return value
+
+
+def disk_cached_part(func):
+    """
+    Cache the solid a function returns on disk as binary BREP.
+
+    The key is the source of the function and of the same-module functions
+    it calls, the module constants any of them read, its arguments
+    (defaults included) and the OCP, build123d and bd_warehouse versions,
+    so editing the code or upgrading a library builds fresh solids instead
+    of loading stale ones. Hits and misses both return the class the
+    function built, builder objects (Box, threads) as a plain Part.
+    Use it for solids that take seconds to build, like helical threads.
+    """
+    signature = inspect.signature(func)
+    # Resolved on first call, the helpers may be defined after the function
+    dependency = None
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        nonlocal dependency
+        if not ENABLED:
+            return func(*args, **kwargs)
+        if dependency is None:
+            functions, names = dependencies(func)
+            sources = hashlib.sha256()
+            for code in [func, *functions]:
+                sources.update(inspect.getsource(code).encode())
+            dependency = sources.hexdigest(), names
+
+        source, constant_names = dependency
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = hashlib.sha256(json.dumps({
+            "function": f"{func.__module__}.{func.__qualname__}",
+            "source": source,
+            "constants": {name: repr(value) for name, value in module_constants(func, constant_names)},
+            "arguments": {name: repr(value) for name, value in bound.arguments.items()},
+            "versions": _library_versions(),
+            "draft": draft.ENABLED,
+        }, sort_keys=True).encode()).hexdigest()
+        path = BREP_CACHE_DIR / f"{func.__name__}-{key[:24]}.brep"
+        class_path = path.with_suffix(".class")
+
+        if path.exists() and class_path.exists():
+            return _load_class(class_path.read_text())(load_brep(path).wrapped)
+        part = func(*args, **kwargs)
+        cls = plain_class(part)
+        save_brep(part, path)
+        # Written after the BREP, a reader seeing it finds both complete
+        tmp = class_path.with_name(f"{class_path.name}.{os.getpid()}.tmp")
+        tmp.write_text(_class_name(cls))
+        os.replace(tmp, class_path)
+        return cls(part.wrapped)
+
+    return wrapper
@@ -0,0 +1,140 @@
+"""
+Build every model headless, in parallel.
+
+    python -m _common_parts.build_all                  # all models, all cores
+    python -m _common_parts.build_all -j 4 -o out      # 4 workers, into out/
+    python -m _common_parts.build_all gear_slotter/gear_slotter.py
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from _common_parts.model_runner import REPO_ROOT, find_models, model_name, run_model
+
+DEFAULT_OUTPUT = REPO_ROOT / "build"
+
+# Per-model durations from earlier builds, used to schedule longest first
+TIMES_FILE = "build_times.json"
+
+
+def _build_one(script: str, output: str) -> dict:
+    # Worker entry point, one model per call
+    name = model_name(script)
+    export_dir = Path(output) / name
+    export_dir.mkdir(parents=True, exist_ok=True)
+    log_path = export_dir / "build.log"
+
+    start = time.perf_counter()
+    result = {"model": name, "ok": True, "files": [], "error": None}
+    with open(log_path, "w", encoding="utf-8") as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            result["files"] = [str(p) for p in run_model(Path(script), export_dir)]
+        except BaseException:
+            traceback.print_exc()
+            result["ok"] = False
+            result["error"] = traceback.format_exc().strip().splitlines()[-1]
+    result["seconds"] = time.perf_counter() - start
+    result["log"] = str(log_path)
+    return result
+
+
+def _load_times(output: Path) -> dict:
+    path = output / TIMES_FILE
+    if path.exists():
+        return json.loads(path.read_text())
+    return {}
+
+
+def _estimate(script: Path, times: dict) -> float:
+    # Unknown models are guessed from script size, roughly a second per KB
+    return times.get(model_name(script), script.stat().st_size / 1000)
+
+
+# Imported once in the fork server, every worker forks with them loaded
+PRELOAD = ["build123d", "ocp_vscode", "bd_warehouse.thread", "_common_parts.model_runner"]
+
+
+def pool_context():
+    # Each model gets a fresh process (no state leaks between scripts)
+    # without paying the OCP/build123d import per model
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(PRELOAD)
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def print_table(results: list):
+    """Print a per-model timing table, slowest first."""
+    width = max([len(r["model"]) for r in results] + [5])
+    print(f"\n{'Model':<{width}}  {'Status':<6}  {'Time':>8}  Files")
+    print("-" * (width + 30))
+    for r in sorted(results, key=lambda r: r["seconds"], reverse=True):
+        status = "ok" if r["ok"] else "FAILED"
+        print(f"{r['model']:<{width}}  {status:<6}  {r['seconds']:>7.2f}s  {len(r['files'])}")
+        if not r["ok"]:
+            print(f"    {r['error']} (see {r['log']})")
+    print("-" * (width + 30))
+    print(f"{'Total':<{width}}  {'':<6}  {sum(r['seconds'] for r in results):>7.2f}s")
+
+
+def build_all(scripts: list, output: Path = DEFAULT_OUTPUT, jobs: int = None) -> list:
+    """
+    Build model scripts across worker processes, longest job first.
+
+    Args:
+        scripts: Model scripts to build
+        output: Output tree, each model exports into output/<dir>/<script>/
+        jobs: Worker count, defaults to all cores
+
+    Returns:
+        One result dict per model with model, ok, seconds, files, error and log
+    """
+    output = Path(output).resolve()
+    output.mkdir(parents=True, exist_ok=True)
+    times = _load_times(output)
+    scripts = sorted(scripts, key=lambda s: _estimate(s, times), reverse=True)
+
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count(),
+                             mp_context=pool_context(),
+                             max_tasks_per_child=1) as pool:
+        # Pool workers take jobs in submission order, so this is longest first
+        futures = [pool.submit(_build_one, str(s), str(output)) for s in scripts]
+        for future in as_completed(futures):
+            result = future.result()
+            status = "ok" if result["ok"] else "FAILED"
+            print(f"[{len(results) + 1}/{len(scripts)}] {result['model']}: {status} ({result['seconds']:.2f}s)")
+            results.append(result)
+
+    times.update({r["model"]: r["seconds"] for r in results if r["ok"]})
+    (output / TIMES_FILE).write_text(json.dumps(times, indent=2, sort_keys=True))
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build every model script headless.")
+    parser.add_argument("models", nargs="*", type=Path,
+                        help="Model scripts to build, defaults to every model in the repo")
+    parser.add_argument("-o", "--output", type=Path, default=DEFAULT_OUTPUT,
+                        help="Output tree (default: build/)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    scripts = args.models or find_models()
+    results = build_all(scripts, args.output, args.jobs)
+    print_table(results)
+    return 0 if all(r["ok"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""
+Warm build server, keeps build123d/OCP/bd_warehouse imported between builds.
+
+    python -m _common_parts.build_server serve
+    python -m _common_parts.build_server build gear_slotter/gear_slotter.py
+    python -m _common_parts.build_server build guitar_saddle/guitar_saddle.py --set base_height=6
+
+The client only uses the standard library, so it starts in milliseconds.
+Builds run one at a time in the server process. Restart the server after
+editing _common_parts; model scripts and their imports are reloaded per build.
+"""
+import argparse
+import ast
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import traceback
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+HOST = "127.0.0.1"
+PORT = int(os.environ.get("BUILD_SERVER_PORT", "8123"))
+DEFAULT_OUTPUT = Path(__file__).parent.parent / "build"
+
+
+def _build(request: dict) -> dict:
+    from _common_parts.model_runner import forget_model_modules, model_name, run_model
+
+    script = Path(request["script"]).resolve()
+    output = Path(request.get("output") or DEFAULT_OUTPUT)
+    log = io.StringIO()
+    response = {"model": model_name(script), "ok": True, "files": [], "error": None}
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            forget_model_modules()
+            files = run_model(script, output / model_name(script), request.get("overrides"))
+            response["files"] = [str(p) for p in files]
+        except Exception:
+            traceback.print_exc()
+            response["ok"] = False
+            response["error"] = traceback.format_exc().strip().splitlines()[-1]
+    response["seconds"] = time.perf_counter() - start
+    response["log"] = log.getvalue()
+    return response
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def _reply(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._reply(200, {"status": "ready", "pid": os.getpid()})
+
+    def do_POST(self):
+        if self.path != "/build":
+            self._reply(404, {"error": f"Unknown endpoint {self.path}"})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if "script" not in request:
+            self._reply(400, {"error": "Missing 'script'"})
+            return
+        self._reply(200, _build(request))
+
+    def log_message(self, format, *args):
+        # Keep the console for build results
+        pass
+
+
+def serve(port: int = PORT):
+    """Import the heavy libraries once and serve builds until interrupted."""
+    start = time.perf_counter()
+    import build123d  # noqa: F401
+    import bd_warehouse.thread  # noqa: F401
+    import _common_parts.model_runner  # noqa: F401
+    print(f"Libraries loaded in {time.perf_counter() - start:.2f}s")
+
+    # HTTPServer handles one request at a time, which keeps builds serial
+    server = HTTPServer((HOST, port), _Handler)
+    print(f"Build server listening on http://{HOST}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def submit(script: Path, overrides: dict = None, output: Path = None, port: int = PORT) -> dict:
+    """
+    Ask a running build server to build a model.
+
+    Args:
+        script: Model script path
+        overrides: Module-level constants to replace
+        output: Output tree, defaults to build/ next to the repo
+        port: Server port
+
+    Returns:
+        Response with model, ok, files, seconds, error and log
+    """
+    request = {
+        "script": str(Path(script).resolve()),
+        "overrides": overrides or {},
+        "output": str(Path(output).resolve()) if output else None,
+    }
+    http_request = urllib.request.Request(
+        f"http://{HOST}:{port}/build",
+        data=json.dumps(request).encode(),
+        headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(http_request) as reply:
+        return json.loads(reply.read())
+
+
+def parse_overrides(pairs: list) -> dict:
+    """Turn ["base_height=6", "name=abc"] into {"base_height": 6, "name": "abc"}."""
+    overrides = {}
+    for pair in pairs:
+        name, _, value = pair.partition("=")
+        try:
+            overrides[name.strip()] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            overrides[name.strip()] = value
+    return overrides
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Warm build server for model scripts.")
+    parser.add_argument("--port", type=int, default=PORT)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("serve", help="Start the server")
+    build = commands.add_parser("build", help="Build a model on the running server")
+    build.add_argument("script", type=Path)
+    build.add_argument("--set", dest="overrides", action="append", default=[],
+                       metavar="NAME=VALUE", help="Override a module-level constant")
+    build.add_argument("-o", "--output", type=Path, default=None)
+    build.add_argument("-v", "--verbose", action="store_true", help="Print the model's output")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        serve(args.port)
+        return 0
+
+    try:
+        response = submit(args.script, parse_overrides(args.overrides), args.output, args.port)
+    except urllib.error.HTTPError:
+        raise
+    except urllib.error.URLError:
+        # Nothing listening, usually the server was never started
+        print(f"No build server on port {args.port}, start it with "
+              f"`python -m _common_parts.build_server serve`", file=sys.stderr)
+        return 1
+    if args.verbose or not response["ok"]:
+        print(response["log"], end="")
+    for path in response["files"]:
+        print(path)
+    status = "ok" if response["ok"] else f"FAILED: {response['error']}"
+    print(f"{response['model']}: {status} ({response['seconds']:.3f}s)")
+    return 0 if response["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
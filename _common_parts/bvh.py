@@ -0,0 +1,375 @@
+"""
+Bounding volume hierarchy over triangles, queried with NumPy arrays.
+
+    tree = BVH(mesh.triangles)
+    distance, face = tree.intersect(origins, directions)
+    mine, theirs, gap = tree.near_pairs(BVH(other.triangles), 0.1, closest=True)
+
+The tree is a complete binary tree stored as two arrays of boxes: node i
+has children 2i+1 and 2i+2, and the leaves hold LEAF_SIZE triangles each
+in Morton order of their centroids. Building it is a sort and one min/max
+per level. Queries walk every ray down the tree together, one level per
+step: the frontier of (ray, node) pairs is tested against the boxes at
+once, survivors are replaced by their two children, and at the bottom the
+remaining (ray, triangle) pairs are tested exactly. Two trees are walked
+against each other the same way with (node, node) pairs. There is no
+Python loop over rays or nodes, only over the tree depth.
+"""
+import numpy as np
+
+# One triangle per leaf: tight boxes save more exact tests than the
+# extra level costs
+LEAF_SIZE = 1
+# Rays per frontier walk, bounds the memory of the (ray, node) pairs
+RAY_CHUNK = 8192
+# Bits per axis of the Morton code
+MORTON_BITS = 10
+
+
+def _spread_bits(values: np.ndarray) -> np.ndarray:
+    # 10 bits abcdefghij -> a00b00c00d00e00f00g00h00i00j
+    x = values.astype(np.uint64) & 0x3FF
+    x = (x | (x << 16)) & 0x30000FF
+    x = (x | (x << 8)) & 0x300F00F
+    x = (x | (x << 4)) & 0x30C30C3
+    x = (x | (x << 2)) & 0x9249249
+    return x
+
+
+def morton_codes(points: np.ndarray) -> np.ndarray:
+    """Interleaved MORTON_BITS-per-axis codes of points in their own bounding box."""
+    low, high = points.min(axis=0), points.max(axis=0)
+    scale = ((1 << MORTON_BITS) - 1) / np.maximum(high - low, 1e-12)
+    cells = ((points - low) * scale).astype(np.int64)
+    return (_spread_bits(cells[:, 0]) << 2) | (_spread_bits(cells[:, 1]) << 1) | _spread_bits(cells[:, 2])
+
+
+def point_triangle_distance(points: np.ndarray, a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """Distance from each point to the triangle (a, b, c) in the same row (Ericson, Real-Time Collision Detection 5.1.5)."""
+    ab, ac = b - a, c - a
+    ap, bp, cp = points - a, points - b, points - c
+    d1, d2 = np.einsum("ij,ij->i", ab, ap), np.einsum("ij,ij->i", ac, ap)
+    d3, d4 = np.einsum("ij,ij->i", ab, bp), np.einsum("ij,ij->i", ac, bp)
+    d5, d6 = np.einsum("ij,ij->i", ab, cp), np.einsum("ij,ij->i", ac, cp)
+    va, vb, vc = d3 * d6 - d5 * d4, d5 * d2 - d1 * d6, d1 * d4 - d3 * d2
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        on_ab = a + (d1 / (d1 - d3))[:, None] * ab
+        on_ac = a + (d2 / (d2 - d6))[:, None] * ac
+        on_bc = b + ((d4 - d3) / ((d4 - d3) + (d5 - d6)))[:, None] * (c - b)
+        denominator = 1 / (va + vb + vc)
+        inside = a + (vb * denominator)[:, None] * ab + (vc * denominator)[:, None] * ac
+    # First matching Voronoi region of the triangle wins
+    closest = np.select(
+        [((d1 <= 0) & (d2 <= 0))[:, None],
+         ((d3 >= 0) & (d4 <= d3))[:, None],
+         ((vc <= 0) & (d1 >= 0) & (d3 <= 0))[:, None],
+         ((d6 >= 0) & (d5 <= d6))[:, None],
+         ((vb <= 0) & (d2 >= 0) & (d6 <= 0))[:, None],
+         ((va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0))[:, None]],
+        [a, b, on_ab, c, on_ac, on_bc], inside)
+    distance = np.linalg.norm(points - closest, axis=1)
+    return np.where(np.isfinite(distance), distance, np.inf)
+
+
+def segment_distance(p1: np.ndarray, q1: np.ndarray, p2: np.ndarray, q2: np.ndarray) -> np.ndarray:
+    """Distance between the segments p1-q1 and p2-q2 in the same row (Ericson 5.1.9)."""
+    d1, d2, r = q1 - p1, q2 - p2, p1 - p2
+    a, e = np.einsum("ij,ij->i", d1, d1), np.einsum("ij,ij->i", d2, d2)
+    b, c, f = np.einsum("ij,ij->i", d1, d2), np.einsum("ij,ij->i", d1, r), np.einsum("ij,ij->i", d2, r)
+    denominator = a * e - b * b
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Closest point of the infinite lines, clamped to segment 1, then
+        # segment 2's point for it clamped and segment 1's recomputed
+        s = np.where(denominator > 1e-12 * a * e, np.clip((b * f - c * e) / denominator, 0, 1), 0.0)
+        t = np.where(e > 0, (b * s + f) / e, 0.0)
+        s = np.where(t < 0, np.clip(-c / a, 0, 1), np.where(t > 1, np.clip((b - c) / a, 0, 1), s))
+        s = np.where(a > 0, s, 0.0)
+        t = np.clip(t, 0, 1)
+    return np.linalg.norm(p1 + s[:, None] * d1 - p2 - t[:, None] * d2, axis=1)
+
+
+def _segments_cross(p: np.ndarray, q: np.ndarray, triangles: np.ndarray) -> np.ndarray:
+    # Moller-Trumbore with the segment as a ray of length 1
+    direction = q - p
+    e1, e2 = triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0]
+    h = np.cross(direction, e2)
+    det = np.einsum("ij,ij->i", e1, h)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inv = 1.0 / det
+        s = p - triangles[:, 0]
+        u = np.einsum("ij,ij->i", s, h) * inv
+        k = np.cross(s, e1)
+        v = np.einsum("ij,ij->i", direction, k) * inv
+        t = np.einsum("ij,ij->i", e2, k) * inv
+        return (np.abs(det) > 1e-15) & (u >= 0) & (v >= 0) & (u + v <= 1) & (t >= 0) & (t <= 1)
+
+
+def triangle_distance(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """
+    Distance between the (k, 3, 3) triangles in the same row, 0 where they cross.
+
+    Two triangles apart are closest at a corner of one against the other
+    or between two of their edges; crossing ones have an edge through the
+    other triangle.
+    """
+    distance = np.full(len(first), np.inf)
+    for one, other in ((first, second), (second, first)):
+        for corner in range(3):
+            np.minimum(distance, point_triangle_distance(one[:, corner], other[:, 0], other[:, 1], other[:, 2]),
+                       out=distance)
+            p, q = one[:, corner], one[:, (corner + 1) % 3]
+            distance[_segments_cross(p, q, other)] = 0.0
+            if one is first:
+                for side in range(3):
+                    np.minimum(distance, segment_distance(p, q, other[:, side], other[:, (side + 1) % 3]),
+                               out=distance)
+    return distance
+
+
+class BVH:
+    """
+    Complete binary box tree over (n, 3, 3) triangles.
+
+    Attributes:
+        triangles: (n, 3, 3) float64 corners in the caller's order
+        depth: Levels below the root, the leaves are level depth
+        lower, upper: (2 * leaves - 1, 3) box corners per node, empty
+            nodes have lower > upper
+        slots: (leaves * leaf_size,) triangle index per leaf slot, -1 for padding
+    """
+
+    def __init__(self, triangles, leaf_size: int = LEAF_SIZE):
+        self.triangles = np.asarray(triangles, dtype=np.float64).reshape(-1, 3, 3)
+        self.leaf_size = leaf_size
+        count = len(self.triangles)
+        leaves = max(1, -(-count // leaf_size))
+        self.depth = int(np.ceil(np.log2(leaves)))
+        leaves = 1 << self.depth
+
+        self.slots = np.full(leaves * leaf_size, -1, dtype=np.int64)
+        if count:
+            self.slots[:count] = np.argsort(morton_codes(self.triangles.mean(axis=1)), kind="stable")
+        lower = np.full((len(self.slots), 3), np.inf)
+        upper = np.full((len(self.slots), 3), -np.inf)
+        lower[:count] = self.triangles[self.slots[:count]].min(axis=1)
+        upper[:count] = self.triangles[self.slots[:count]].max(axis=1)
+
+        self.lower = np.empty((2 * leaves - 1, 3))
+        self.upper = np.empty((2 * leaves - 1, 3))
+        self.lower[leaves - 1:] = lower.reshape(leaves, leaf_size, 3).min(axis=1)
+        self.upper[leaves - 1:] = upper.reshape(leaves, leaf_size, 3).max(axis=1)
+        for level in range(self.depth - 1, -1, -1):
+            first, width = (1 << level) - 1, 1 << level
+            children = slice(2 * first + 1, 2 * first + 1 + 2 * width)
+            self.lower[first:first + width] = self.lower[children].reshape(width, 2, 3).min(axis=1)
+            self.upper[first:first + width] = self.upper[children].reshape(width, 2, 3).max(axis=1)
+        self.filled = np.all(self.lower <= self.upper, axis=1)
+        # A point on a triangle of every node, the first leaf's centroid
+        self.points = np.full((2 * leaves - 1, 3), np.inf)
+        self.points[leaves - 1:][self.slots[::leaf_size] >= 0] = \
+            self.triangles[self.slots[::leaf_size][self.slots[::leaf_size] >= 0]].mean(axis=1)
+        for level in range(self.depth - 1, -1, -1):
+            first, width = (1 << level) - 1, 1 << level
+            self.points[first:first + width] = self.points[2 * first + 1:2 * first + 1 + 2 * width:2]
+
+        # Queries gather one coordinate at a time: 1D takes are several
+        # times faster than gathering and reducing (k, 3) rows. The boxes
+        # are float32, rounded outward so none shrinks
+        self._lower = [np.nextafter(c.astype(np.float32), np.float32(-np.inf)) for c in _columns(self.lower)]
+        self._upper = [np.nextafter(c.astype(np.float32), np.float32(np.inf)) for c in _columns(self.upper)]
+        # Per slot corner and edges for the exact test, padding repeats triangle 0
+        corners = self.triangles[np.maximum(self.slots, 0)] if count else np.zeros((len(self.slots), 3, 3))
+        self._corner = _columns(corners[:, 0])
+        self._edge1 = _columns(corners[:, 1] - corners[:, 0])
+        self._edge2 = _columns(corners[:, 2] - corners[:, 0])
+
+    def __len__(self):
+        return len(self.triangles)
+
+    @property
+    def leaves(self) -> int:
+        return 1 << self.depth
+
+    def bounds(self) -> tuple:
+        """(min, max) corner of everything in the tree."""
+        return self.lower[0], self.upper[0]
+
+    def leaf_triangles(self, node: int) -> np.ndarray:
+        """Triangle indices in a leaf node."""
+        start = (node - (self.leaves - 1)) * self.leaf_size
+        slots = self.slots[start:start + self.leaf_size]
+        return slots[slots >= 0]
+
+    def near_pairs(self, other: "BVH", distance: float = 0.0, closest: bool = False) -> tuple:
+        """
+        Triangle pairs of two trees whose boxes are within a distance.
+
+        Args:
+            other: Tree of the other mesh
+            distance: Box gap in mm, 0 for touching or overlapping boxes
+            closest: Also keep every pair that could be the closest pair
+                of triangles, however far apart
+
+        Returns:
+            (triangle indices in self, triangle indices in other, gap
+            between their leaf boxes in mm), the gap is a lower bound on
+            the distance between the two triangles
+        """
+        empty = np.zeros(0, dtype=np.int64)
+        if not len(self.triangles) or not len(other.triangles):
+            return empty, empty, np.zeros(0)
+        lower, upper, points = _columns(self.lower), _columns(self.upper), _columns(self.points)
+        other_lower, other_upper = _columns(other.lower), _columns(other.upper)
+        other_points = _columns(other.points)
+        mine = np.zeros(1, dtype=np.int64)
+        theirs = np.zeros(1, dtype=np.int64)
+        bound = np.inf
+        for level in range(max(self.depth, other.depth) + 1):
+            gap = apart = 0.0
+            for axis in range(3):
+                low, high = lower[axis].take(mine), upper[axis].take(mine)
+                other_low, other_high = other_lower[axis].take(theirs), other_upper[axis].take(theirs)
+                gap = gap + np.maximum(np.maximum(low - other_high, other_low - high), 0) ** 2
+                if closest:
+                    # Empty nodes have their point at infinity, inf - inf is NaN
+                    with np.errstate(invalid="ignore"):
+                        apart = apart + (points[axis].take(mine) - other_points[axis].take(theirs)) ** 2
+            if closest:
+                # Two points on the meshes are an upper bound on the
+                # closest pair, boxes further apart than that can't hold it
+                bound = min(bound, float(np.nanmin(apart)))
+            keep = gap <= max(distance ** 2, bound if closest else 0.0)
+            mine, theirs, gap = mine[keep], theirs[keep], gap[keep]
+            if level < self.depth:
+                mine = np.repeat(2 * mine + 1, 2)
+                mine[1::2] += 1
+                theirs = np.repeat(theirs, 2)
+            if level < other.depth:
+                theirs = np.repeat(2 * theirs + 1, 2)
+                theirs[1::2] += 1
+                mine = np.repeat(mine, 2)
+
+        # Leaves to triangles, every slot of one leaf against every slot of the other
+        size, other_size = self.leaf_size, other.leaf_size
+        slots = ((mine - (self.leaves - 1)) * size)[:, None, None] + np.arange(size)[None, :, None]
+        other_slots = ((theirs - (other.leaves - 1)) * other_size)[:, None, None] + np.arange(other_size)
+        slots, other_slots = np.broadcast_arrays(slots, other_slots)
+        gap = np.broadcast_to(gap[:, None, None], slots.shape).ravel()
+        mine, theirs = self.slots.take(slots.ravel()), other.slots.take(other_slots.ravel())
+        keep = (mine >= 0) & (theirs >= 0)
+        return mine[keep], theirs[keep], np.sqrt(gap[keep])
+
+    def _ray_boxes(self, origins, inverse, limit, rays, nodes) -> np.ndarray:
+        # Slab test of each ray against its node's box, True where it
+        # enters the box between 0 and its limit
+        enter = leave = None
+        for axis in range(3):
+            origin, scale = origins[axis].take(rays), inverse[axis].take(rays)
+            # Overflow gives a slab at infinity, which still compares right
+            with np.errstate(over="ignore"):
+                near = (self._lower[axis].take(nodes) - origin) * scale
+                far = (self._upper[axis].take(nodes) - origin) * scale
+            if enter is None:
+                enter, leave = np.minimum(near, far), np.maximum(near, far)
+            else:
+                np.maximum(enter, np.minimum(near, far), out=enter)
+                np.minimum(leave, np.maximum(near, far), out=leave)
+        np.minimum(leave, limit.take(rays), out=leave)
+        return (enter <= leave) & (leave >= 0) & self.filled.take(nodes)
+
+    def _ray_triangles(self, origins, directions, rays, slots) -> np.ndarray:
+        # Moller-Trumbore per component, distance along the ray or inf for a miss
+        dx, dy, dz = (c.take(rays) for c in directions)
+        ax, ay, az = (c.take(slots) for c in self._edge1)
+        bx, by, bz = (c.take(slots) for c in self._edge2)
+        px, py, pz = dy * bz - dz * by, dz * bx - dx * bz, dx * by - dy * bx
+        det = ax * px + ay * py + az * pz
+        sx, sy, sz = (o.take(rays) - c.take(slots) for o, c in zip(origins, self._corner))
+        qx, qy, qz = sy * az - sz * ay, sz * ax - sx * az, sx * ay - sy * ax
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inv = 1.0 / det
+            u = (sx * px + sy * py + sz * pz) * inv
+            v = (dx * qx + dy * qy + dz * qz) * inv
+            t = (bx * qx + by * qy + bz * qz) * inv
+            hit = (np.abs(det) > 1e-15) & (u >= 0) & (v >= 0) & (u + v <= 1) & (t >= 0)
+        return np.where(hit, t, np.inf)
+
+    def _intersect_chunk(self, origins, directions, limit, skip) -> tuple:
+        count = len(origins)
+        origins, directions = _columns(origins), _columns(directions)
+        origins32 = [o.astype(np.float32) for o in origins]
+        # A zero component becomes tiny instead of dividing to inf, which
+        # would give 0 * inf = NaN for a ray in a box face plane
+        inverse = [(1.0 / np.where(np.abs(d) < 1e-12, 1e-12, d)).astype(np.float32) for d in directions]
+        limit32 = limit.astype(np.float32)
+        rays = np.arange(count)
+        nodes = np.zeros(count, dtype=np.int64)
+        for level in range(self.depth + 1):
+            keep = self._ray_boxes(origins32, inverse, limit32, rays, nodes)
+            rays, nodes = rays[keep], nodes[keep]
+            if level == self.depth:
+                break
+            rays = np.repeat(rays, 2)
+            nodes = np.repeat(2 * nodes + 1, 2)
+            nodes[1::2] += 1
+
+        distance = np.full(count, np.inf)
+        face = np.full(count, -1, dtype=np.int64)
+        slots = (((nodes - (self.leaves - 1)) * self.leaf_size)[:, None] + np.arange(self.leaf_size)).ravel()
+        rays = np.repeat(rays, self.leaf_size)
+        triangles = self.slots.take(slots)
+        keep = triangles >= 0
+        if skip is not None:
+            keep &= triangles != skip.take(rays)
+        rays, slots, triangles = rays[keep], slots[keep], triangles[keep]
+        t = self._ray_triangles(origins, directions, rays, slots)
+        hit = t <= limit.take(rays)
+        rays, triangles, t = rays[hit], triangles[hit], t[hit]
+        if not len(rays):
+            return distance, face
+        # The frontier keeps the rays in order, so each ray's hits are one
+        # run: the nearest is the minimum of the run
+        starts = np.flatnonzero(np.r_[True, rays[1:] != rays[:-1]])
+        nearest = np.minimum.reduceat(t, starts)
+        runs = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(rays)]))
+        # Last match of the minimum in each run, any one of equal hits will do
+        where = np.flatnonzero(t == nearest[runs])
+        face[rays[where]] = triangles[where]
+        distance[rays[starts]] = nearest
+        return distance, face
+
+    def intersect(self, origins, directions, max_distance=np.inf, skip=None) -> tuple:
+        """
+        First triangle hit by each ray.
+
+        Args:
+            origins: (m, 3) ray starts
+            directions: (m, 3) ray directions, distances are in their
+                length, so pass unit vectors for distances in mm
+            max_distance: Ignore hits further than this, scalar or (m,)
+            skip: (m,) triangle index per ray to ignore, e.g. the face a
+                ray starts on
+
+        Returns:
+            (distance, triangle index) per ray, inf and -1 for a miss
+        """
+        origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+        directions = np.asarray(directions, dtype=np.float64).reshape(-1, 3)
+        limit = np.broadcast_to(np.asarray(max_distance, dtype=np.float64), len(origins))
+        if skip is not None:
+            skip = np.asarray(skip, dtype=np.int64)
+        distance = np.full(len(origins), np.inf)
+        face = np.full(len(origins), -1, dtype=np.int64)
+        if not len(self.triangles):
+            return distance, face
+        for start in range(0, len(origins), RAY_CHUNK):
+            part = slice(start, start + RAY_CHUNK)
+            distance[part], face[part] = self._intersect_chunk(
+                origins[part], directions[part], limit[part], None if skip is None else skip[part])
+        return distance, face
+
+
+def _columns(points: np.ndarray) -> list:
+    # (n, 3) rows as three contiguous coordinate arrays
+    return [np.ascontiguousarray(points[:, axis]) for axis in range(3)]
@@ -0,0 +1,209 @@
+"""
+Fit-test coupons: one small labeled block per clearance, all on one plate.
+
+    python -m _common_parts.coupons hole --size 2 --clearances 0:0.7:0.05
+    python -m _common_parts.coupons peg --size 5.5 --clearances 0.1,0.2,0.3,0.5
+    python -m _common_parts.coupons my_model.features:m3_insert --clearances 0:0.3:0.05
+
+Print the plate, try the mating part in each coupon and copy the label of
+the best fit into the model's clearance constant.
+
+Features:
+    hole: through hole of size + clearance, for pins and screws
+    peg: peg of size - clearance, for sockets
+    slot: through slot size + clearance wide, for tabs and sliders
+    module:function: factory called with the clearance, returns the shape
+        cut from the coupon, or added to it with --add
+"""
+import argparse
+import importlib
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from build123d import Align, Box, Cylinder, Part, Pos, SlotOverall, Text, extrude
+from build123d.topology import downcast
+from build123d.persistence import deserialize_shape, serialize_shape
+
+from _common_parts.booleans import batch_boolean
+from _common_parts.brep_cache import disk_cached_part
+from _common_parts.build_all import pool_context
+from _common_parts.export import export_model, export_session
+from _common_parts.part_cache import cached_part
+
+COUPON_HEIGHT = 4.0
+# Room around the feature and for the label, in mm
+COUPON_MARGIN = 3.0
+LABEL_HEIGHT = 5.0
+LABEL_DEPTH = 0.4
+PEG_HEIGHT = 6.0
+SLOT_LENGTH = 8.0
+
+# Coarser than the project default, the engraved labels would otherwise
+# make up most of the mesh
+MESH_LINEAR_DEFLECTION = 0.01
+MESH_ANGULAR_DEFLECTION = 0.2
+
+FEATURES = ("hole", "peg", "slot")
+
+
+def parse_clearances(text: str) -> list:
+    """Turn "0:0.3:0.05" (start:stop:step, stop included) or "0.1,0.2" into a list of clearances."""
+    if ":" in text:
+        start, stop, step = (float(v) for v in text.split(":"))
+        count = int(math.floor((stop - start) / step + 1e-9)) + 1
+        return [round(start + i * step, 6) for i in range(count)]
+    return [float(v) for v in text.split(",")]
+
+
+def _resolve(feature):
+    # "package.module:function" to the function, builtin names stay strings
+    if callable(feature) or feature in FEATURES:
+        return feature
+    module, _, name = feature.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+@cached_part
+def _block(width: float, depth: float, height: float):
+    return Box(width, depth, height, align=(Align.CENTER, Align.CENTER, Align.MIN))
+
+
+@cached_part
+def _label(text: str, y: float, height: float):
+    # Engraved into the top face
+    return Pos(0, y, height) * extrude(Text(text, font_size=LABEL_HEIGHT * 0.7), amount=-LABEL_DEPTH)
+
+
+def _footprint(feature, size: float) -> tuple:
+    # Coupon width and depth for a feature, without the label strip
+    if feature == "slot":
+        return SLOT_LENGTH + 2 * COUPON_MARGIN, size + 2 * COUPON_MARGIN
+    return size + 2 * COUPON_MARGIN, size + 2 * COUPON_MARGIN
+
+
+def _build(feature, size: float, clearance: float, add: bool = False):
+    width, depth = _footprint(feature, size)
+    total_depth = depth + LABEL_HEIGHT
+    block = _block(width, total_depth, COUPON_HEIGHT)
+    label = _label(f"{clearance:.2f}", -total_depth / 2 + LABEL_HEIGHT / 2, COUPON_HEIGHT)
+    center = Pos(0, total_depth / 2 - depth / 2, 0)
+
+    through = COUPON_HEIGHT * 3
+    if feature == "hole":
+        return batch_boolean(block, cut=[label, center * Cylinder((size + clearance) / 2, through)])
+    if feature == "slot":
+        slot = extrude(SlotOverall(SLOT_LENGTH + clearance, size + clearance), amount=through, both=True)
+        return batch_boolean(block, cut=[label, center * slot])
+    if feature == "peg":
+        peg = Cylinder((size - clearance) / 2, PEG_HEIGHT, align=(Align.CENTER, Align.CENTER, Align.MIN))
+        return batch_boolean(block, fuse=[center * Pos(0, 0, COUPON_HEIGHT) * peg], cut=[label])
+
+    # Factory shapes are placed with their origin on the top face center of the feature area
+    tool = center * Pos(0, 0, COUPON_HEIGHT) * feature(clearance)
+    if add:
+        return batch_boolean(block, fuse=[tool], cut=[label])
+    return batch_boolean(block, cut=[label, tool])
+
+
+# The disk cache key follows _build and the helpers it calls, so editing
+# them or the constants above builds fresh coupons
+@disk_cached_part
+def _builtin_coupon(feature: str, size: float, clearance: float):
+    return _build(feature, size, clearance)
+
+
+def build_coupon(feature, size: float, clearance: float, add: bool = False):
+    """
+    One coupon: a block with the feature at the given clearance and the
+    clearance engraved in front of it, bottom at Z=0.
+
+    Builtin features are cached on disk, factories per process by their own
+    cached_part if they have one.
+
+    Args:
+        feature: "hole", "peg", "slot", a factory or "module:function"
+        size: Nominal feature size in mm (diameter, slot width), ignored by factories
+        clearance: Clearance in mm
+        add: Add a factory's shape instead of cutting it
+    """
+    feature = _resolve(feature)
+    if feature in FEATURES:
+        return _builtin_coupon(feature, size, clearance)
+    return _build(feature, size, clearance, add)
+
+
+def _build_serialized(feature, size: float, clearance: float, add: bool) -> bytes:
+    # Worker entry point, shapes travel between processes as BREP bytes
+    return serialize_shape(build_coupon(feature, size, clearance, add).wrapped)
+
+
+def coupon_plate(feature, clearances: list, size: float = 2.0, add: bool = False,
+                 columns: int = None, jobs: int = None):
+    """
+    Build one coupon per clearance and join them into a single plate.
+
+    Coupons touch their neighbours, so the plate is one solid and one
+    compact mesh. Factories passed as callables must be module-level
+    functions to build in parallel.
+
+    Args:
+        feature: "hole", "peg", "slot", a factory or "module:function"
+        clearances: Clearances in mm, one coupon each
+        size: Nominal feature size in mm
+        add: Add a factory's shape instead of cutting it
+        columns: Coupons per row, defaults to a near-square grid
+        jobs: Worker processes, 1 builds in this process
+
+    Returns:
+        Part with every coupon
+    """
+    start = time.perf_counter()
+    jobs = jobs or os.cpu_count()
+    if jobs > 1 and len(clearances) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(clearances)), mp_context=pool_context()) as pool:
+            blobs = pool.map(_build_serialized, *zip(*[(feature, size, c, add) for c in clearances]))
+            coupons = [Part(downcast(deserialize_shape(blob))) for blob in blobs]
+    else:
+        coupons = [build_coupon(feature, size, c, add) for c in clearances]
+
+    columns = columns or math.ceil(math.sqrt(len(coupons)))
+    width, depth = _footprint(feature, size)
+    depth += LABEL_HEIGHT
+    placed = []
+    for i, coupon in enumerate(coupons):
+        row, column = divmod(i, columns)
+        # Row 0 at the back, reading order like the labels
+        placed.append(Pos(column * width, -row * depth, 0) * coupon)
+    plate = batch_boolean(placed[0], fuse=placed[1:])
+    print(f"Built {len(coupons)} coupons ({time.perf_counter() - start:.2f}s)")
+    return plate
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build a plate of fit-test coupons over a range of clearances.")
+    parser.add_argument("feature", help="hole, peg, slot or module:function of a feature factory")
+    parser.add_argument("--clearances", type=parse_clearances, default=parse_clearances("0:0.5:0.05"),
+                        help="start:stop:step or a comma separated list in mm (default: 0:0.5:0.05)")
+    parser.add_argument("--size", type=float, default=2.0, help="Nominal feature size in mm (default: 2)")
+    parser.add_argument("--add", action="store_true", help="Add a factory's shape instead of cutting it")
+    parser.add_argument("--columns", type=int, default=None, help="Coupons per row")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Worker processes (default: all cores)")
+    parser.add_argument("-n", "--name", default=None, help="Export name (default: coupons_<feature>_<size>)")
+    parser.add_argument("-o", "--output", type=Path, default=Path.cwd(),
+                        help="Output directory (default: current directory)")
+    args = parser.parse_args(argv)
+
+    plate = coupon_plate(args.feature, args.clearances, args.size, args.add, args.columns, args.jobs)
+    name = args.name or f"coupons_{args.feature.rpartition(':')[2]}_{args.size:g}"
+    with export_session(args.output):
+        export_model(plate, name, MESH_LINEAR_DEFLECTION, MESH_ANGULAR_DEFLECTION)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+import contextlib
+import io
+import os
+
+import ocp_vscode
+from build123d.topology.three_d import Mixin3D
+
+# Draft mode for fast iteration: 3D fillets and chamfers are skipped and the
+# viewer tessellates coarsely. Turn it on for a whole session with
+#   DRAFT_MODE=1 code .
+# or per script with set_draft_mode(True). Nothing is exported in draft mode.
+ENABLED = False
+
+# ocp_vscode tessellation (its defaults are 0.1 and 0.2)
+VIEWER_DEVIATION = 0.1
+VIEWER_ANGULAR_TOLERANCE = 0.2
+DRAFT_VIEWER_DEVIATION = 1.0
+DRAFT_VIEWER_ANGULAR_TOLERANCE = 0.6
+
+_fillet = Mixin3D.fillet
+_chamfer = Mixin3D.chamfer
+
+
+def _skip_fillet(self, radius, edge_list):
+    return self
+
+
+def _skip_chamfer(self, length, length2, edge_list, face=None):
+    return self
+
+
+def _set_viewer_quality(deviation: float, angular_tolerance: float):
+    # ocp_vscode reports a missing viewer on stdout, which is fine here
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        try:
+            ocp_vscode.set_defaults(deviation=deviation, angular_tolerance=angular_tolerance)
+        except Exception:
+            pass
+
+
+def set_draft_mode(enabled: bool = True):
+    """
+    Switch draft mode on or off.
+
+    Draft mode replaces Solid/Part fillet() and chamfer() (which the
+    fillet() and chamfer() operations call) with no-ops and coarsens the
+    viewer's tessellation. cached_part and disk_cached_part keep draft and
+    full quality results apart, so switching back rebuilds real fillets.
+    """
+    global ENABLED
+    ENABLED = enabled
+    Mixin3D.fillet = _skip_fillet if enabled else _fillet
+    Mixin3D.chamfer = _skip_chamfer if enabled else _chamfer
+    if enabled:
+        _set_viewer_quality(DRAFT_VIEWER_DEVIATION, DRAFT_VIEWER_ANGULAR_TOLERANCE)
+    else:
+        _set_viewer_quality(VIEWER_DEVIATION, VIEWER_ANGULAR_TOLERANCE)
+
+
+if os.environ.get("DRAFT_MODE", "0") not in ("", "0"):
+    set_draft_mode(True)
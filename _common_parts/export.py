@@ -1,35 +1,255 @@
-from build123d import export_step
+from build123d import Shape, export_step
 from build123d.mesher import Mesher
+from build123d.persistence import serialize_shape, deserialize_shape
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
+import time
 
+from _common_parts import draft, export_cache, printability
 
-def export_model(part, name: str):
+# Tessellation defaults shared by every export in the project.
+# Linear deflection is relative to the edge size (Mesher meshes with isRelative).
+# Change them for a whole project with set_mesh_tolerance(), or per call.
+LINEAR_DEFLECTION = 0.001
+ANGULAR_DEFLECTION = 0.1
+
+
+def set_mesh_tolerance(linear_deflection: float = None, angular_deflection: float = None):
     """
-    Export a build123d part to STEP, STL, and 3MF in current directory.
-    Works in Jupyter notebooks.
+    Set the project-wide tessellation tolerances used by export_model.
 
     Args:
-        part: The build123d part to export
-        name: Filename without extension
+        linear_deflection: Relative linear deflection, smaller is finer
+        angular_deflection: Angular deflection in radians, smaller is finer
+    """
+    global LINEAR_DEFLECTION, ANGULAR_DEFLECTION
+    if linear_deflection is not None:
+        LINEAR_DEFLECTION = linear_deflection
+    if angular_deflection is not None:
+        ANGULAR_DEFLECTION = angular_deflection
+
+
+def mesh_part(part, linear_deflection: float = None, angular_deflection: float = None,
+              mesher: Mesher = None) -> Mesher:
     """
+    Tessellate a part exactly once.
+    The returned Mesher holds the triangles in memory and can write
+    both STL and 3MF without meshing the part again.
+
+    Args:
+        part: The build123d part to tessellate
+        linear_deflection: Override LINEAR_DEFLECTION for this part
+        angular_deflection: Override ANGULAR_DEFLECTION for this part
+        mesher: Add the part to this Mesher instead of a new one
+    """
+    if linear_deflection is None:
+        linear_deflection = LINEAR_DEFLECTION
+    if angular_deflection is None:
+        angular_deflection = ANGULAR_DEFLECTION
+
+    if mesher is None:
+        mesher = Mesher()
+    mesher.add_shape(
+        part,
+        linear_deflection=linear_deflection,
+        angular_deflection=angular_deflection)
+    return mesher
+
+
+@dataclass
+class ExportSession:
+    """Redirects export_model for headless builds and records its output."""
+    export_dir: Path
+    files: list = field(default_factory=list)
+    # Export name to the seconds export_model spent per step
+    timings: dict = field(default_factory=dict)
+
+
+_session = None
+
+
+@contextmanager
+def export_session(export_dir):
+    """
+    Send every export_model call inside the block to export_dir.
+
+    Args:
+        export_dir: Directory to write into, created if missing
+
+    Yields:
+        ExportSession, its files list holds every path written or restored
+    """
+    global _session
+    previous = _session
+    _session = ExportSession(Path(export_dir))
+    _session.export_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        yield _session
+    finally:
+        _session = previous
+
+
+def current_export_dir() -> Path:
+    """Directory exports go to: the active export_session, else the current directory."""
     # In Jupyter, Path.cwd() gives you the notebook's directory
-    export_dir = Path.cwd()
+    return _session.export_dir if _session else Path.cwd()
 
-    # Export STEP
-    step_path = export_dir / f"{name}.step"
+
+def record_exports(*paths: Path):
+    """Tell the active export_session about files written outside export_model."""
+    if _session:
+        _session.files.extend(paths)
+
+
+# Pools are kept alive between export_model calls so scripts exporting
+# several parts only pay the worker startup once.
+_pools = {}
+
+
+def _get_pool(kind: str):
+    # No thread pool: OCP holds the GIL through export_step and BRepMesh, a
+    # Python thread gets under 1% of its normal run time while a part
+    # meshes, so threads would only write the files one after the other
+    if kind != "process":
+        raise ValueError(f"Unknown parallel mode '{kind}', use 'process'")
+    if kind not in _pools:
+        _pools[kind] = ProcessPoolExecutor(max_workers=2)
+    return _pools[kind]
+
+
+def _write_step(part, step_path: Path) -> dict:
+    start = time.perf_counter()
     export_step(part, str(step_path))
-    print(f"Exported STEP: {step_path}")
+    return {"step": time.perf_counter() - start}
 
-    # Create mesher for STL and 3MF
-    mesher = Mesher()
-    mesher.add_shape(part)
 
-    # Export STL
-    stl_path = export_dir / f"{name}.stl"
+def _write_meshes(part, stl_path: Path, mf3_path: Path, linear_deflection, angular_deflection) -> dict:
+    timings = {}
+    start = time.perf_counter()
+    mesher = mesh_part(part, linear_deflection, angular_deflection)
+    timings["mesh"] = time.perf_counter() - start
+
+    start = time.perf_counter()
     mesher.write(str(stl_path))
-    print(f"Exported STL: {stl_path}")
+    timings["stl"] = time.perf_counter() - start
 
-    # Export 3MF
-    mf3_path = export_dir / f"{name}.3mf"
+    start = time.perf_counter()
     mesher.write(str(mf3_path))
-    print(f"Exported 3MF: {mf3_path}")
+    timings["3mf"] = time.perf_counter() - start
+    return timings
+
+
+def _run_serialized(writer, brep: bytes, *args) -> dict:
+    # Process pool entry point, parts travel as binary BREP
+    return writer(Shape.cast(deserialize_shape(brep)), *args)
+
+
+def export_files(name: str, part, write, linear_deflection: float = None, angular_deflection: float = None,
+                 use_cache: bool = None, settings: dict = None, detail: str = "") -> dict:
+    """
+    Write the STEP, STL and 3MF of one export target, the part shared by
+    export_model and export_instances: draft mode guard, export cache,
+    session timings and the PRINT_CHECK hook.
+
+    Args:
+        name: Filename without extension
+        part: Shape to fingerprint for the export cache
+        write: Called as write(step_path, stl_path, mf3_path, linear_deflection,
+            angular_deflection), writes the files and returns its timings
+        linear_deflection: Mesh tolerance override, defaults to LINEAR_DEFLECTION
+        angular_deflection: Mesh tolerance override, defaults to ANGULAR_DEFLECTION
+        use_cache: Skip writing when the geometry fingerprint is unchanged,
+            defaults to export_cache.ENABLED (env EXPORT_CACHE=0 disables)
+        settings: Anything besides the part and tolerances that changes the files
+        detail: Shown in the 3MF line before its time
+
+    Returns:
+        Seconds spent per step, keys "step", "mesh", "stl" and "3mf",
+        all zero when the export came from the cache, empty in draft mode
+    """
+    if draft.ENABLED:
+        # Draft parts have no fillets, never let them overwrite real exports
+        print(f"Draft mode: skipped export of {name} (unset DRAFT_MODE for final files)")
+        return {}
+    export_dir = current_export_dir()
+    step_path = export_dir / f"{name}.step"
+    stl_path = export_dir / f"{name}.stl"
+    mf3_path = export_dir / f"{name}.3mf"
+    if linear_deflection is None:
+        linear_deflection = LINEAR_DEFLECTION
+    if angular_deflection is None:
+        angular_deflection = ANGULAR_DEFLECTION
+
+    if use_cache is None:
+        use_cache = export_cache.ENABLED
+    suffixes = (".step", ".stl", ".3mf")
+    record_exports(step_path, stl_path, mf3_path)
+    if use_cache:
+        key = export_cache.fingerprint(part, {
+            **(settings or {}),
+            "linear_deflection": linear_deflection,
+            "angular_deflection": angular_deflection,
+            "formats": suffixes,
+        })
+        if export_cache.restore(export_dir / name, key, suffixes):
+            print(f"Unchanged: {export_dir / name}.step/.stl/.3mf (cached)")
+            timings = {"step": 0.0, "mesh": 0.0, "stl": 0.0, "3mf": 0.0}
+            if _session:
+                _session.timings[name] = timings
+            if printability.ENABLED:
+                printability.check_export(stl_path, name)
+            return timings
+
+    timings = write(step_path, stl_path, mf3_path, linear_deflection, angular_deflection)
+    print(f"Exported STEP: {step_path} ({timings['step']:.2f}s)")
+    print(f"Exported STL: {stl_path} ({timings['mesh'] + timings['stl']:.2f}s incl. meshing)")
+    print(f"Exported 3MF: {mf3_path} ({detail}{timings['3mf']:.2f}s)")
+
+    if use_cache:
+        export_cache.store(export_dir / name, key, suffixes)
+    if _session:
+        _session.timings[name] = timings
+    if printability.ENABLED:
+        printability.check_export(stl_path, name)
+    return timings
+
+
+def export_model(part, name: str, linear_deflection: float = None, angular_deflection: float = None,
+                 parallel: str = None, use_cache: bool = None) -> dict:
+    """
+    Export a build123d part to STEP, STL, and 3MF in current directory.
+    Works in Jupyter notebooks.
+    The part is tessellated once and both mesh formats are written from that mesh.
+
+    Args:
+        part: The build123d part to export
+        name: Filename without extension
+        linear_deflection: Mesh tolerance override, defaults to LINEAR_DEFLECTION
+        angular_deflection: Mesh tolerance override, defaults to ANGULAR_DEFLECTION
+        parallel: None to write serially, "process" to write STEP and the
+            meshes at the same time in two worker processes
+        use_cache: Skip writing when the geometry fingerprint is unchanged,
+            defaults to export_cache.ENABLED (env EXPORT_CACHE=0 disables)
+
+    Returns:
+        Seconds spent per step, keys "step", "mesh", "stl" and "3mf",
+        all zero when the export came from the cache, empty in draft mode
+    """
+    def write(step_path, *mesh_args) -> dict:
+        timings = {}
+        if parallel is None:
+            timings.update(_write_step(part, step_path))
+            timings.update(_write_meshes(part, *mesh_args))
+            return timings
+        pool = _get_pool(parallel)
+        brep = serialize_shape(part.wrapped)
+        jobs = [pool.submit(_run_serialized, _write_step, brep, step_path),
+                pool.submit(_run_serialized, _write_meshes, brep, *mesh_args)]
+        # Waits for every file, re-raises the first writer error
+        for job in jobs:
+            timings.update(job.result())
+        return timings
+
+    return export_files(name, part, write, linear_deflection, angular_deflection, use_cache)
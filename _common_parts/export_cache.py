@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+from build123d import CenterOf
+
+# Content-addressed store for export_model.
+# objects/<fingerprint>/ holds the files exported for one geometry,
+# manifest/ holds one small entry per export target so parallel builds
+# never fight over a shared manifest file.
+CACHE_DIR = Path(os.environ.get(
+    "EXPORT_CACHE_DIR", Path(__file__).parent.parent / ".export_cache"))
+CACHE_MAX_BYTES = int(os.environ.get("EXPORT_CACHE_MAX_MB", "512")) * 1024 * 1024
+ENABLED = os.environ.get("EXPORT_CACHE", "1") != "0"
+
+# Bump when the fingerprint recipe changes
+CACHE_VERSION = 1
+
+# Coordinates are rounded before hashing, well below print resolution
+DIGITS = 6
+
+
+def _num(value: float) -> float:
+    # + 0.0 turns -0.0 into 0.0 so mirrored zeros hash the same
+    return round(value, DIGITS) + 0.0
+
+
+def _vec(v) -> tuple:
+    return (_num(v.X), _num(v.Y), _num(v.Z))
+
+
+def fingerprint(part, settings: dict) -> str:
+    """
+    Stable hash of a part's geometry plus the export settings.
+    Walks the B-rep: shape counts, every face and edge (type, size, position)
+    and every vertex coordinate, sorted so construction order does not matter.
+
+    Args:
+        part: The build123d part
+        settings: Anything else that changes the exported files
+    """
+    digest = hashlib.sha256()
+
+    def feed(value):
+        digest.update(repr(value).encode())
+        digest.update(b"\n")
+
+    feed(CACHE_VERSION)
+    feed(json.dumps(settings, sort_keys=True, default=str))
+    feed(type(part).__name__)
+
+    faces, edges, vertices = part.faces(), part.edges(), part.vertices()
+    feed((len(part.solids()), len(faces), len(edges), len(vertices)))
+    # Bounding box centers also work for STL-sourced faces without a surface
+    box = CenterOf.BOUNDING_BOX
+    feed(sorted((f.geom_type.name, _num(f.area), _vec(f.center(box))) for f in faces))
+    feed(sorted((e.geom_type.name, _num(e.length), _vec(e.center(box))) for e in edges))
+    feed(sorted(_vec(v) for v in vertices))
+    if part.solids():
+        feed(_num(part.volume))
+    return digest.hexdigest()
+
+
+def _entry_path(stem: Path) -> Path:
+    key = hashlib.sha1(str(stem.resolve()).encode()).hexdigest()
+    return CACHE_DIR / "manifest" / f"{key}.json"
+
+
+def _file_state(path: Path):
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _target(stem: Path, suffix: str) -> Path:
+    # Not with_suffix(), part names may contain dots
+    return Path(f"{stem}{suffix}")
+
+
+def _write_entry(stem: Path, key: str, suffixes):
+    entry = {
+        "target": str(stem),
+        "fingerprint": key,
+        "files": {s: _file_state(_target(stem, s)) for s in suffixes},
+    }
+    path = _entry_path(stem)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(entry, indent=2))
+    os.replace(tmp, path)
+
+
+def restore(stem: Path, key: str, suffixes) -> bool:
+    """
+    Try to satisfy an export from the cache instead of writing it.
+
+    Args:
+        stem: Output path without extension
+        key: Fingerprint from fingerprint()
+        suffixes: Extensions that must exist, e.g. (".step", ".stl")
+
+    Returns:
+        True when every target file now matches the fingerprint
+    """
+    obj_dir = CACHE_DIR / "objects" / key
+
+    # Targets already hold this geometry and nobody touched them since
+    entry_path = _entry_path(stem)
+    if entry_path.exists():
+        try:
+            entry = json.loads(entry_path.read_text())
+        except ValueError:
+            entry = {}
+        if entry.get("fingerprint") == key and all(
+                _target(stem, s).exists() and _file_state(_target(stem, s)) == entry["files"].get(s)
+                for s in suffixes):
+            if obj_dir.exists():
+                os.utime(obj_dir)
+            return True
+
+    # Same geometry was exported before, copy it back in place
+    blobs = [obj_dir / f"artifact{s}" for s in suffixes]
+    if all(blob.exists() for blob in blobs):
+        for blob, suffix in zip(blobs, suffixes):
+            shutil.copyfile(blob, _target(stem, suffix))
+        os.utime(obj_dir)
+        _write_entry(stem, key, suffixes)
+        return True
+    return False
+
+
+def store(stem: Path, key: str, suffixes):
+    """
+    Record freshly written export files under their fingerprint.
+
+    Args:
+        stem: Output path without extension
+        key: Fingerprint from fingerprint()
+        suffixes: Extensions that were written
+    """
+    obj_dir = CACHE_DIR / "objects" / key
+    if not obj_dir.exists():
+        tmp_dir = CACHE_DIR / "objects" / f"{key}.{os.getpid()}.tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        for suffix in suffixes:
+            shutil.copyfile(_target(stem, suffix), tmp_dir / f"artifact{suffix}")
+        try:
+            os.replace(tmp_dir, obj_dir)
+        except OSError:
+            # Another process stored the same geometry first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    _write_entry(stem, key, suffixes)
+    evict(keep=key)
+
+
+def evict(max_bytes: int = None, keep: str = None):
+    """
+    Drop least recently used objects until the cache fits in max_bytes.
+
+    Args:
+        max_bytes: Size limit, defaults to CACHE_MAX_BYTES
+        keep: Fingerprint that must survive, usually the one just stored
+    """
+    if max_bytes is None:
+        max_bytes = CACHE_MAX_BYTES
+    objects = CACHE_DIR / "objects"
+    if not objects.exists():
+        return
+
+    entries = []
+    for obj_dir in objects.iterdir():
+        if obj_dir.name.endswith(".tmp"):
+            continue
+        try:
+            size = sum(f.stat().st_size for f in obj_dir.iterdir())
+            entries.append((obj_dir.stat().st_mtime, size, obj_dir))
+        except FileNotFoundError:
+            continue  # evicted by a parallel build
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, obj_dir in sorted(entries):
+        if total <= max_bytes:
+            break
+        if obj_dir.name == keep:
+            continue
+        shutil.rmtree(obj_dir, ignore_errors=True)
+        total -= size
+
+
+def clear():
+    """Remove the whole export cache."""
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+    print(f"Cleared export cache: {CACHE_DIR}")
@@ -1,7 +1,9 @@
 from build123d import *
 from ocp_vscode import *
+from _common_parts.part_cache import cached_part
 
 # Inverse fillet to add to a cutout shape for rounding the outer edges
+@cached_part
 def get_outer_fillet(length, radius, edge_id=0):
     of_base = Rectangle(length, radius*2)
     of_base = extrude(of_base, radius*2)
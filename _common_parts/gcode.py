@@ -0,0 +1,438 @@
+"""
+Print statistics for slicer G-code, read line by line in constant memory.
+
+    python -m _common_parts.gcode curtain-blocker              # every .gcode, in parallel
+    python -m _common_parts.gcode curtain-blocker/curtain_holder_set.gcode --layers
+
+Print time comes from a trapezoidal acceleration model with jerk-limited
+corners and a bounded look-ahead, like the printer's own planner. G2/G3
+arcs in the XY plane are planned as short straight segments like Marlin
+does. Homing, heat-up waits and other firmware time are not counted,
+slicers leave them out of their estimates too.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+AXES = "XYZE"
+
+# Moves planned ahead of the one being timed, at least this many
+LOOKAHEAD = 16
+
+# G2/G3 arcs are planned as straight segments of about this length in mm,
+# Marlin's MM_PER_ARC_SEGMENT
+ARC_SEGMENT = 1.0
+
+
+@dataclass
+class Machine:
+    """Firmware limits used until the file sets its own (M201, M203, M204, M205)."""
+    max_feedrate: dict = field(default_factory=lambda: {"X": 500.0, "Y": 500.0, "Z": 20.0, "E": 100.0})
+    max_acceleration: dict = field(default_factory=lambda: {"X": 10000.0, "Y": 10000.0, "Z": 500.0, "E": 5000.0})
+    jerk: dict = field(default_factory=lambda: {"X": 10.0, "Y": 10.0, "Z": 0.4, "E": 5.0})
+    print_acceleration: float = 1000.0
+    travel_acceleration: float = 1000.0
+    retract_acceleration: float = 1000.0
+    filament_diameter: float = 1.75
+
+
+class _Block:
+    # One straight move, speeds in mm/s
+    __slots__ = ("distance", "unit", "nominal", "acceleration", "entry_max", "entry", "exit", "layer")
+
+    def __init__(self, distance, unit, nominal, acceleration, layer):
+        self.distance = distance
+        self.unit = unit
+        self.nominal = nominal
+        self.acceleration = acceleration
+        self.entry_max = 0.0
+        self.entry = 0.0
+        self.exit = 0.0
+        self.layer = layer
+
+    def time(self) -> float:
+        a, d, vc, v0, v1 = self.acceleration, self.distance, self.nominal, self.entry, self.exit
+        accelerate = (vc * vc - v0 * v0) / (2 * a)
+        decelerate = (vc * vc - v1 * v1) / (2 * a)
+        if accelerate + decelerate <= d:
+            return (vc - v0) / a + (vc - v1) / a + (d - accelerate - decelerate) / vc
+        # Triangle profile, never reaches the nominal speed
+        peak = math.sqrt(max((2 * a * d + v0 * v0 + v1 * v1) / 2, 0.0))
+        return max(peak - v0, 0.0) / a + max(peak - v1, 0.0) / a
+
+
+class _Planner:
+    # Bounded look-ahead: plan the buffer as if the machine stops after its
+    # last move, then commit the oldest half. Memory stays O(LOOKAHEAD).
+
+    def __init__(self, machine: Machine, on_done):
+        self.machine = machine
+        self.on_done = on_done
+        self.blocks = []
+        self.previous = None
+
+    def _junction(self, previous: _Block, block: _Block) -> float:
+        # Fastest speed through the corner keeping every axis' velocity jump below its jerk
+        speed = block.nominal if previous is None else min(previous.nominal, block.nominal)
+        for axis, name in enumerate(AXES):
+            jerk = self.machine.jerk[name]
+            before = previous.unit[axis] if previous is not None else 0.0
+            change = abs(before - block.unit[axis])
+            if change * speed > jerk:
+                speed = jerk / change
+        return speed
+
+    def add(self, block: _Block):
+        block.entry_max = self._junction(self.previous, block)
+        self.previous = block
+        self.blocks.append(block)
+        if len(self.blocks) >= 2 * LOOKAHEAD:
+            self._plan()
+            self._commit(LOOKAHEAD)
+
+    def stop(self):
+        """Come to a halt (end of file, dwell): plan and commit everything."""
+        self._plan()
+        self._commit(len(self.blocks))
+        self.previous = None
+
+    def _plan(self):
+        blocks = self.blocks
+        if not blocks:
+            return
+        # Backward: every block must be able to brake to its successor's entry
+        next_entry = 0.0
+        for block in reversed(blocks):
+            block.exit = next_entry
+            reachable = math.sqrt(next_entry * next_entry + 2 * block.acceleration * block.distance)
+            if block is not blocks[0]:
+                block.entry = min(block.entry_max, reachable)
+            next_entry = block.entry
+        # Forward: and accelerate from its own entry to its exit
+        for block, following in zip(blocks, blocks[1:]):
+            reachable = math.sqrt(block.entry * block.entry + 2 * block.acceleration * block.distance)
+            block.exit = min(block.exit, reachable)
+            following.entry = block.exit
+
+    def _commit(self, count: int):
+        for block in self.blocks[:count]:
+            self.on_done(block)
+        del self.blocks[:count]
+
+
+def _parameters(words: list) -> dict:
+    params = {}
+    for word in words:
+        try:
+            params[word[0].upper()] = float(word[1:])
+        except ValueError:
+            pass
+    return params
+
+
+def _arc_points(start: list, target: list, params: dict, clockwise: bool) -> list:
+    # Segment end points of a G2/G3 arc in the XY plane, Z and E spread
+    # evenly over it. The centre is I/J from the start, or found from R
+    # like Marlin does: positive R for the short way round.
+    (x0, y0), (x1, y1) = start[:2], target[:2]
+    if "R" in params:
+        r = params["R"]
+        dx, dy = x1 - x0, y1 - y0
+        chord = math.hypot(dx, dy)
+        if chord == 0:
+            raise ValueError("an R arc needs an end point apart from the start")
+        h = math.sqrt(max((r - chord / 2) * (r + chord / 2), 0.0))
+        side = -1.0 if clockwise != (r < 0) else 1.0
+        cx, cy = (x0 + x1) / 2 - side * h * dy / chord, (y0 + y1) / 2 + side * h * dx / chord
+    elif "I" in params or "J" in params:
+        cx, cy = x0 + params.get("I", 0.0), y0 + params.get("J", 0.0)
+    else:
+        raise ValueError("an arc needs I/J or R")
+
+    radius = math.hypot(x0 - cx, y0 - cy)
+    begin = math.atan2(y0 - cy, x0 - cx)
+    sweep = math.atan2(y1 - cy, x1 - cx) - begin
+    # Same start and end point is a full circle
+    if clockwise:
+        sweep = -(-sweep % math.tau) or -math.tau
+    else:
+        sweep = sweep % math.tau or math.tau
+    count = max(1, math.ceil(abs(sweep) * radius / ARC_SEGMENT))
+    points = []
+    for step in range(1, count):
+        t = step / count
+        angle = begin + sweep * t
+        points.append([cx + radius * math.cos(angle), cy + radius * math.sin(angle),
+                       start[2] + (target[2] - start[2]) * t, start[3] + (target[3] - start[3]) * t])
+    points.append(list(target))
+    return points
+
+
+def _positive(params: dict) -> dict:
+    # Zero or negative limits (M204 S0) would stall the planner, keep the old ones
+    return {name: value for name, value in params.items() if value > 0}
+
+
+def _check_positive(values: dict, what: str):
+    for name, value in values.items():
+        if not value > 0:
+            raise ValueError(f"{what} {name} must be positive, got {value}")
+
+
+def analyze(path, machine: Machine = None) -> dict:
+    """
+    Stream a G-code file and collect print statistics.
+
+    Args:
+        path: G-code file
+        machine: Firmware limits, defaults to Machine()
+
+    Returns:
+        Dict with file, seconds, filament_mm, filament_cm3, travel_moves,
+        travel_mm, retractions, extrusion_moves, the slicer's own estimate
+        (slicer_seconds, slicer_filament_m, None when missing) and layers,
+        a list of per-layer dicts with layer, z, seconds, filament_mm,
+        travel_moves and retractions
+    """
+    machine = machine or Machine()
+    _check_positive(machine.max_feedrate, "max_feedrate")
+    _check_positive(machine.max_acceleration, "max_acceleration")
+    _check_positive({"print": machine.print_acceleration, "travel": machine.travel_acceleration,
+                     "retract": machine.retract_acceleration}, "acceleration")
+    # Copied, the file's M201/M203/M205 change them as it goes
+    machine = Machine(dict(machine.max_feedrate), dict(machine.max_acceleration), dict(machine.jerk),
+                      machine.print_acceleration, machine.travel_acceleration,
+                      machine.retract_acceleration, machine.filament_diameter)
+
+    stats = {
+        "file": str(path), "seconds": 0.0, "filament_mm": 0.0, "filament_cm3": 0.0,
+        "travel_moves": 0, "travel_mm": 0.0, "retractions": 0, "extrusion_moves": 0,
+        "slicer_seconds": None, "slicer_filament_m": None,
+    }
+    layers = {}
+
+    def layer_stats(layer):
+        if layer not in layers:
+            layers[layer] = {"layer": layer, "z": None, "seconds": 0.0, "filament_mm": 0.0,
+                             "travel_moves": 0, "retractions": 0}
+        return layers[layer]
+
+    def done(block):
+        seconds = block.time()
+        stats["seconds"] += seconds
+        layer_stats(block.layer)["seconds"] += seconds
+
+    planner = _Planner(machine, done)
+    position = [0.0, 0.0, 0.0, 0.0]
+    feedrate = 1500.0 / 60
+    absolute, absolute_e = True, True
+    plane = "G17"
+    layer = -1
+
+    with open(path, encoding="utf-8", errors="replace") as gcode:
+        for line in gcode:
+            if line.startswith(";"):
+                if line.startswith(";LAYER:"):
+                    layer = int(line[7:])
+                elif line.startswith(";LAYER_CHANGE"):
+                    layer += 1
+                elif line.startswith(";TIME:"):
+                    stats["slicer_seconds"] = float(line[6:])
+                elif line.startswith(";Filament used:"):
+                    stats["slicer_filament_m"] = float(line[15:].strip().rstrip("m"))
+                continue
+
+            words = line.split(";", 1)[0].split()
+            if not words:
+                continue
+            command = words[0].upper()
+
+            if command in ("G0", "G1", "G2", "G3"):
+                params = _parameters(words[1:])
+                # Marlin ignores F0, a zero speed would never finish the move
+                if params.get("F", 0) > 0:
+                    feedrate = params["F"] / 60
+                target = list(position)
+                for axis, name in enumerate(AXES):
+                    if name in params:
+                        relative = not (absolute_e if name == "E" else absolute)
+                        target[axis] = position[axis] + params[name] if relative else params[name]
+                if command in ("G2", "G3"):
+                    if plane != "G17":
+                        raise ValueError(f"{path}: arcs are only supported in the XY plane (G17), not {plane}")
+                    try:
+                        points = _arc_points(position, target, params, clockwise=command == "G2")
+                    except ValueError as error:
+                        raise ValueError(f"{path}: {error}: {line.strip()}") from None
+                else:
+                    points = [target]
+                extruded = target[3] - position[3]
+
+                start, xy = position, 0.0
+                for point in points:
+                    delta = [t - p for t, p in zip(point, position)]
+                    position = point
+                    segment_xy = math.hypot(delta[0], delta[1])
+                    xy += segment_xy
+                    distance = math.sqrt(segment_xy * segment_xy + delta[2] * delta[2])
+
+                    if distance > 0:
+                        unit = [d / distance for d in delta]
+                        acceleration = machine.print_acceleration if extruded > 0 else machine.travel_acceleration
+                    elif delta[3] != 0:
+                        distance = abs(delta[3])
+                        unit = [0.0, 0.0, 0.0, math.copysign(1.0, delta[3])]
+                        acceleration = machine.retract_acceleration
+                    else:
+                        continue
+
+                    # Scale speed and acceleration down to the slowest axis' limit
+                    nominal = feedrate
+                    for axis, name in enumerate(AXES):
+                        if unit[axis]:
+                            nominal = min(nominal, machine.max_feedrate[name] / abs(unit[axis]))
+                            acceleration = min(acceleration, machine.max_acceleration[name] / abs(unit[axis]))
+                    planner.add(_Block(distance, unit, nominal, acceleration, layer))
+                if target == start:
+                    continue
+
+                current = layer_stats(layer)
+                stats["filament_mm"] += extruded
+                current["filament_mm"] += extruded
+                if extruded < 0:
+                    stats["retractions"] += 1
+                    current["retractions"] += 1
+                elif extruded > 0 and xy > 0:
+                    stats["extrusion_moves"] += 1
+                    if current["z"] is None:
+                        current["z"] = position[2]
+                elif xy > 0:
+                    stats["travel_moves"] += 1
+                    stats["travel_mm"] += xy
+                    current["travel_moves"] += 1
+
+            elif command == "G4":
+                params = _parameters(words[1:])
+                planner.stop()
+                dwell = params.get("S", 0.0) + params.get("P", 0.0) / 1000
+                stats["seconds"] += dwell
+                layer_stats(layer)["seconds"] += dwell
+            elif command == "G10":
+                stats["retractions"] += 1
+                layer_stats(layer)["retractions"] += 1
+            elif command in ("G17", "G18", "G19"):
+                plane = command
+            elif command == "G90":
+                absolute, absolute_e = True, True
+            elif command == "G91":
+                absolute, absolute_e = False, False
+            elif command == "M82":
+                absolute_e = True
+            elif command == "M83":
+                absolute_e = False
+            elif command == "G92":
+                params = _parameters(words[1:])
+                for axis, name in enumerate(AXES):
+                    if name in params:
+                        position[axis] = params[name]
+            elif command == "G28":
+                planner.stop()
+                position[:3] = [0.0, 0.0, 0.0]
+            elif command == "M201":
+                params = _positive(_parameters(words[1:]))
+                machine.max_acceleration.update({a: params[a] for a in AXES if a in params})
+            elif command == "M203":
+                params = _positive(_parameters(words[1:]))
+                machine.max_feedrate.update({a: params[a] for a in AXES if a in params})
+            elif command == "M204":
+                params = _positive(_parameters(words[1:]))
+                if "S" in params:
+                    machine.print_acceleration = machine.travel_acceleration = params["S"]
+                machine.print_acceleration = params.get("P", machine.print_acceleration)
+                machine.travel_acceleration = params.get("T", machine.travel_acceleration)
+                machine.retract_acceleration = params.get("R", machine.retract_acceleration)
+            elif command == "M205":
+                params = _parameters(words[1:])
+                machine.jerk.update({a: params[a] for a in AXES if a in params})
+
+    planner.stop()
+    radius = machine.filament_diameter / 2
+    stats["filament_cm3"] = math.pi * radius * radius * stats["filament_mm"] / 1000
+    stats["layers"] = [layers[k] for k in sorted(layers) if k >= 0]
+    return stats
+
+
+def analyze_all(paths: list, jobs: int = None) -> list:
+    """
+    Analyze many G-code files across worker processes.
+
+    Args:
+        paths: G-code files, or directories searched for *.gcode
+        jobs: Worker count, defaults to all cores
+
+    Returns:
+        One analyze() dict per file, in path order
+    """
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.rglob("*.gcode")) if path.is_dir() else [path])
+    if len(files) == 1:
+        return [analyze(files[0])]
+    with ProcessPoolExecutor(max_workers=min(jobs or os.cpu_count(), len(files) or 1)) as pool:
+        return list(pool.map(analyze, files))
+
+
+def _duration(seconds: float) -> str:
+    minutes, seconds = divmod(round(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m{seconds:02d}s" if hours else f"{minutes}m{seconds:02d}s"
+
+
+def print_report(results: list, show_layers: bool = False):
+    """Print a table with one row per file, plus per-layer tables if asked."""
+    width = max([len(r["file"]) for r in results] + [4])
+    print(f"{'File':<{width}}  {'Time':>9}  {'Slicer':>9}  {'Filament':>9}  {'Layers':>6}  "
+          f"{'Travels':>7}  {'Retracts':>8}")
+    print("-" * (width + 66))
+    for r in results:
+        slicer = _duration(r["slicer_seconds"]) if r["slicer_seconds"] is not None else "-"
+        print(f"{r['file']:<{width}}  {_duration(r['seconds']):>9}  {slicer:>9}  "
+              f"{r['filament_mm'] / 1000:>8.2f}m  {len(r['layers']):>6}  "
+              f"{r['travel_moves']:>7}  {r['retractions']:>8}")
+
+    if show_layers:
+        for r in results:
+            print(f"\n{r['file']}")
+            print(f"{'Layer':>5}  {'Z':>6}  {'Time':>8}  {'Filament':>9}  {'Travels':>7}  {'Retracts':>8}")
+            for layer in r["layers"]:
+                print(f"{layer['layer']:>5}  {layer['z'] or 0.0:>6.2f}  {layer['seconds']:>7.1f}s  "
+                      f"{layer['filament_mm']:>7.1f}mm  {layer['travel_moves']:>7}  {layer['retractions']:>8}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Print time and filament statistics for G-code files.")
+    parser.add_argument("paths", nargs="+", type=Path, help="G-code files or directories")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Worker processes (default: all cores)")
+    parser.add_argument("--layers", action="store_true", help="Also print per-layer statistics")
+    parser.add_argument("--json", action="store_true", help="Print the statistics as JSON")
+    args = parser.parse_args(argv)
+
+    results = analyze_all(args.paths, args.jobs)
+    if not results:
+        print("No G-code files found")
+        return 1
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results, args.layers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
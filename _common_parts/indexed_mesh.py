@@ -0,0 +1,204 @@
+"""
+Indexed triangle meshes: shared float32 vertices and int32 faces.
+
+An STL repeats each vertex in every triangle that uses it, about six
+times on a closed mesh. Welded into an indexed mesh it takes roughly a
+third of the memory and every vertex has one index, so neighbours, edges
+and manifold checks become array operations.
+
+    mesh = IndexedMesh.from_stl("curtain_blocker/curtain_holder.stl")
+    mesh = IndexedMesh.from_part(part)
+    mesh.write_3mf("holder.3mf")
+
+    python -m _common_parts.indexed_mesh part.stl [-o part.3mf]
+"""
+import argparse
+import sys
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+from _common_parts import mesh_io
+
+# Vertices closer than this in mm become one, well above float32 noise
+# on parts up to a few hundred mm and well below print resolution
+WELD_TOLERANCE = 1e-4
+
+# Tessellation of B-rep parts, absolute in mm
+TESSELLATION_TOLERANCE = 0.01
+TESSELLATION_ANGULAR_TOLERANCE = 0.1
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="model" ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>'
+    '</Types>')
+_RELATIONSHIPS = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Target="/3D/3dmodel.model" Id="rel0" '
+    'Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/>'
+    '</Relationships>')
+
+
+def weld(points: np.ndarray, tolerance: float = WELD_TOLERANCE) -> tuple:
+    """
+    Merge points that fall into the same tolerance-sized grid cell.
+
+    Cells are packed into one int64 key per point, so this is a single 1D
+    np.unique instead of a row-wise one. Points just either side of a cell
+    boundary stay apart, which only matters for input noisier than the
+    tolerance.
+
+    Args:
+        points: (n, 3) coordinates
+        tolerance: Cell size in mm
+
+    Returns:
+        (unique points as float32, index of each input point into them)
+    """
+    cells = np.floor(np.asarray(points, dtype=np.float64) / tolerance + 0.5).astype(np.int64)
+    if len(cells) == 0:
+        return np.zeros((0, 3), np.float32), np.zeros(0, np.int64)
+    low = cells.min(axis=0)
+    cells -= low
+    span = int(cells.max()) + 1
+    if span < 1 << 21:
+        keys = (cells[:, 0] << 42) | (cells[:, 1] << 21) | cells[:, 2]
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    else:
+        _, first, inverse = np.unique(cells, axis=0, return_index=True, return_inverse=True)
+    # The first point of each cell keeps its exact coordinates
+    return np.asarray(points, dtype=np.float32)[first], inverse.reshape(-1)
+
+
+class IndexedMesh:
+    """
+    Triangle mesh with shared vertices.
+
+    Attributes:
+        vertices: (m, 3) float32 coordinates in mm
+        faces: (n, 3) int32 vertex indices, counter-clockwise seen from outside
+    """
+
+    def __init__(self, vertices, faces):
+        self.vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+        self.faces = np.ascontiguousarray(faces, dtype=np.int32)
+
+    @classmethod
+    def from_triangles(cls, triangles, tolerance: float = WELD_TOLERANCE):
+        """
+        Weld (n, 3, 3) triangle corners, dropping triangles that collapse.
+
+        Args:
+            triangles: Corners per triangle, e.g. read_stl(path)["vertices"]
+            tolerance: Weld distance in mm
+        """
+        triangles = np.asarray(triangles)
+        vertices, index = weld(triangles.reshape(-1, 3), tolerance)
+        faces = index.reshape(-1, 3)
+        keep = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 2] != faces[:, 0])
+        return cls(vertices, faces[keep])
+
+    @classmethod
+    def from_stl(cls, path, tolerance: float = WELD_TOLERANCE):
+        """Read and weld a binary or ASCII STL."""
+        return cls.from_triangles(mesh_io.load_stl(path)["vertices"], tolerance)
+
+    @classmethod
+    def from_part(cls, part, tolerance: float = TESSELLATION_TOLERANCE,
+                  angular_tolerance: float = TESSELLATION_ANGULAR_TOLERANCE,
+                  weld_tolerance: float = WELD_TOLERANCE):
+        """
+        Tessellate a build123d shape and weld the faces together.
+
+        Args:
+            part: Shape to tessellate
+            tolerance: Linear tessellation tolerance in mm
+            angular_tolerance: Angular tessellation tolerance in radians
+            weld_tolerance: Weld distance in mm
+        """
+        points, triangles = part.tessellate(tolerance, angular_tolerance)
+        # tessellate repeats the vertices of shared edges once per face
+        vertices, index = weld(np.array([(p.X, p.Y, p.Z) for p in points]), weld_tolerance)
+        faces = index[np.asarray(triangles, dtype=np.int64).reshape(-1, 3)]
+        keep = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 2] != faces[:, 0])
+        return cls(vertices, faces[keep])
+
+    def __len__(self):
+        return len(self.faces)
+
+    @property
+    def triangles(self) -> np.ndarray:
+        """(n, 3, 3) corners per face, a copy."""
+        return self.vertices[self.faces]
+
+    @property
+    def nbytes(self) -> int:
+        return self.vertices.nbytes + self.faces.nbytes
+
+    def bounds(self) -> tuple:
+        """(min, max) corner of the bounding box."""
+        return self.vertices.min(axis=0), self.vertices.max(axis=0)
+
+    def write_stl(self, path, header: bytes = b"") -> Path:
+        return mesh_io.write_stl(path, self.vertices, self.faces, header=header)
+
+    def to_3mf_model(self, name: str = "part") -> str:
+        """The 3D/3dmodel.model XML of a 3MF package with this mesh as its only object."""
+        # One % format over the flattened arrays: tolist() still makes a
+        # Python number per value, but there is no per-vertex loop or string
+        # join. %.9g keeps every float32 coordinate exact
+        vertex_lines = ('<vertex x="%.9g" y="%.9g" z="%.9g"/>' * len(self.vertices)) % tuple(
+            self.vertices.ravel().tolist())
+        face_lines = ('<triangle v1="%d" v2="%d" v3="%d"/>' * len(self.faces)) % tuple(self.faces.ravel().tolist())
+        name = name.replace("&", "&amp;").replace('"', "&quot;").replace("<", "&lt;")
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<model unit="millimeter" xml:lang="en-US" '
+            'xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02">'
+            f'<resources><object id="1" name="{name}" type="model"><mesh>'
+            f'<vertices>{vertex_lines}</vertices><triangles>{face_lines}</triangles>'
+            '</mesh></object></resources><build><item objectid="1"/></build></model>')
+
+    def write_3mf(self, path, name: str = None) -> Path:
+        """
+        Write a 3MF package straight from the arrays.
+
+        Args:
+            path: File to write
+            name: Object name shown by slicers, defaults to the file stem
+        """
+        path = Path(path)
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as package:
+            package.writestr("[Content_Types].xml", _CONTENT_TYPES)
+            package.writestr("_rels/.rels", _RELATIONSHIPS)
+            package.writestr("3D/3dmodel.model", self.to_3mf_model(name or path.stem))
+        return path
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Weld an STL into an indexed mesh.")
+    parser.add_argument("stl", type=Path)
+    parser.add_argument("-o", "--output", type=Path, default=None, help="Write a .3mf or .stl")
+    parser.add_argument("--tolerance", type=float, default=WELD_TOLERANCE,
+                        help=f"Weld distance in mm (default: {WELD_TOLERANCE})")
+    args = parser.parse_args(argv)
+
+    mesh = IndexedMesh.from_stl(args.stl, args.tolerance)
+    stl_bytes = len(mesh) * mesh_io.STL_DTYPE.itemsize
+    print(f"{args.stl}: {len(mesh)} faces, {len(mesh.vertices)} vertices, "
+          f"{mesh.nbytes / 1e6:.2f} MB indexed vs {stl_bytes / 1e6:.2f} MB as STL")
+    if args.output:
+        if args.output.suffix.lower() == ".3mf":
+            mesh.write_3mf(args.output)
+        else:
+            mesh.write_stl(args.output)
+        print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+import time
+
+from build123d import Compound, Location, Shape, export_step, import_stl
+from build123d.topology import downcast
+
+from _common_parts.export import export_files, mesh_part
+
+
+def _iterate(iterator) -> list:
+    items = []
+    while iterator.MoveNext():
+        items.append(iterator.GetCurrent())
+    return items
+
+
+def _transform_3mf(wrapper, location: Location):
+    # 3MF uses row vectors: rows 0-2 hold the rotation transposed, row 3 the translation
+    trsf = location.wrapped.Transformation()
+    transform = wrapper.GetIdentityTransform()
+    for col in range(3):
+        for row in range(3):
+            transform.Fields[col][row] = trsf.Value(row + 1, col + 1)
+        transform.Fields[3][col] = trsf.Value(col + 1, 4)
+    return transform
+
+
+class Instances:
+    """
+    One source shape placed many times without copying it.
+
+    Every placement shares the source geometry, and export writes the
+    mesh once with one 3MF component per placement, so parsing, memory and
+    3MF size follow the single part rather than the instance count.
+
+        connector = Instances.from_stl("source_connector.stl")
+        for x in range(4):
+            connector.place(Location((x * 7.5, 0, 0), (90, 0, 0)))
+        show(connector.compound())
+        export_instances(connector, "row_of_connectors")
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.locations = []
+
+    @classmethod
+    def from_stl(cls, path):
+        """Load an STL once as the shared source."""
+        return cls(import_stl(str(path)))
+
+    def place(self, location: Location):
+        """Add a placement, returns a reference sharing the source geometry."""
+        self.locations.append(location)
+        return self._reference(location)
+
+    def _reference(self, location: Location):
+        # New TopoDS handle on the same TShape, nothing is copied. Moved keeps
+        # the source's own location, so a rotated source stays rotated.
+        # Cast by topology, builder classes (Box, Cylinder) can't wrap a shape
+        return Shape.cast(downcast(self.source.wrapped.Moved(location.wrapped)))
+
+    def compound(self) -> Compound:
+        """All placements as one Compound, for show() or further modelling."""
+        return Compound(children=[self._reference(loc) for loc in self.locations])
+
+    def __len__(self):
+        return len(self.locations)
+
+
+def _placements(groups) -> list:
+    # Rounded like the export fingerprint, for the export cache settings
+    return [[[round(v, 6) + 0.0 for v in (*loc.position, *loc.orientation)] for loc in group.locations]
+            for group in groups]
+
+
+def export_instances(instances, name: str, linear_deflection: float = None,
+                     angular_deflection: float = None, use_cache: bool = None) -> dict:
+    """
+    Export instances to STEP, STL and 3MF in the export directory.
+    Each source is tessellated once; the 3MF stores that mesh once plus a
+    transform per placement, the STL is expanded by the 3MF writer.
+    Draft mode, the export cache and PRINT_CHECK work as in export_model.
+
+    Args:
+        instances: The placed Instances, or a list of them for a mixed plate
+        name: Filename without extension
+        linear_deflection: Mesh tolerance override, see export_model
+        angular_deflection: Mesh tolerance override, see export_model
+        use_cache: Skip writing when sources and placements are unchanged,
+            see export_model
+
+    Returns:
+        Seconds spent per step, keys "step", "mesh", "stl" and "3mf",
+        all zero when the export came from the cache, empty in draft mode
+    """
+    groups = [instances] if isinstance(instances, Instances) else list(instances)
+
+    def write(step_path, stl_path, mf3_path, linear_deflection, angular_deflection) -> dict:
+        timings = {}
+        start = time.perf_counter()
+        export_step(Compound(children=[g.compound() for g in groups]), str(step_path))
+        timings["step"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        mesher, meshes = None, []
+        for group in groups:
+            known = len(mesher.meshes) if mesher is not None else 0
+            mesher = mesh_part(group.source, linear_deflection, angular_deflection, mesher)
+            meshes.append(mesher.meshes[known:])
+        model, wrapper = mesher.model, mesher.wrapper
+        # Mesher places the mesh once at the origin, replace that with the instances
+        for item in _iterate(model.GetBuildItems()):
+            model.RemoveBuildItem(item)
+        for components in _iterate(model.GetComponentsObjects()):
+            model.RemoveResource(components)
+        components = model.AddComponentsObject()
+        for group, group_meshes in zip(groups, meshes):
+            for mesh in group_meshes:
+                for location in group.locations:
+                    components.AddComponent(mesh, _transform_3mf(wrapper, location))
+        model.AddBuildItem(components, wrapper.GetIdentityTransform())
+        timings["mesh"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        mesher.write(str(stl_path))
+        timings["stl"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        mesher.write(str(mf3_path))
+        timings["3mf"] = time.perf_counter() - start
+        return timings
+
+    # The sources are fingerprinted once, their placements go in the settings
+    sources = Compound([g.source for g in groups])
+    return export_files(name, sources, write, linear_deflection, angular_deflection, use_cache,
+                        settings={"placements": _placements(groups)},
+                        detail=f"{sum(len(g) for g in groups)} instances, ")
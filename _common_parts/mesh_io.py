@@ -0,0 +1,176 @@
+"""
+Binary STL as NumPy arrays, without OCCT.
+
+    data = read_stl("curtain_blocker/curtain_holder.stl")
+    triangles = data["vertices"]           # (n, 3, 3) float32, no copy
+    write_stl("moved.stl", triangles + (0, 0, 5))
+
+read_stl memory-maps the file: nothing is read until it is used, and
+slicing or reading fields never copies. Analysis and transforms on large
+meshes run at memory speed instead of going through import_stl and a
+B-rep of one face per triangle.
+
+    python -m _common_parts.mesh_io part.stl [more.stl ...]
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+
+HEADER_SIZE = 80
+
+# One binary STL record, 50 bytes
+STL_DTYPE = np.dtype([
+    ("normal", "<f4", (3,)),
+    ("vertices", "<f4", (3, 3)),
+    ("attribute", "<u2"),
+])
+
+
+def _triangle_count(path: Path) -> int:
+    size = path.stat().st_size
+    with open(path, "rb") as f:
+        head = f.read(HEADER_SIZE + 4)
+    if len(head) < HEADER_SIZE + 4:
+        raise ValueError(f"{path} is too short for a binary STL")
+    count = int(np.frombuffer(head, "<u4", 1, HEADER_SIZE)[0])
+    if size != HEADER_SIZE + 4 + count * STL_DTYPE.itemsize:
+        if head.lstrip().startswith(b"solid"):
+            raise ValueError(f"{path} is an ASCII STL, use read_ascii_stl()")
+        raise ValueError(f"{path} holds {size} bytes, {count} triangles need "
+                         f"{HEADER_SIZE + 4 + count * STL_DTYPE.itemsize}")
+    return count
+
+
+def read_stl(path, mode: str = "r") -> np.ndarray:
+    """
+    Memory-map a binary STL as one STL_DTYPE record per triangle.
+
+    Args:
+        path: Binary STL file
+        mode: "r" read-only, "r+" to change the file in place, "c" for
+            changes kept in memory only
+
+    Returns:
+        Structured array with fields normal (n, 3), vertices (n, 3, 3)
+        and attribute (n,), backed by the file
+
+    Raises:
+        ValueError: Not a binary STL
+    """
+    path = Path(path)
+    count = _triangle_count(path)
+    if count == 0:
+        return np.zeros(0, STL_DTYPE)
+    return np.memmap(path, dtype=STL_DTYPE, mode=mode, offset=HEADER_SIZE + 4, shape=(count,))
+
+
+def read_header(path) -> bytes:
+    """The 80 byte header of a binary STL, trailing padding removed."""
+    with open(path, "rb") as f:
+        return f.read(HEADER_SIZE).rstrip(b"\0 ")
+
+
+def read_ascii_stl(path) -> np.ndarray:
+    """
+    Read an ASCII STL into the same structured array as read_stl, in memory.
+
+    Normals are taken from the file, attributes are zero.
+    """
+    text = Path(path).read_bytes().split()
+    words = np.array(text)
+    normals = words[np.flatnonzero(words == b"normal")[:, None] + np.arange(1, 4)].astype(np.float32)
+    vertices = words[np.flatnonzero(words == b"vertex")[:, None] + np.arange(1, 4)].astype(np.float32)
+    data = np.zeros(len(normals), STL_DTYPE)
+    data["normal"] = normals
+    data["vertices"] = vertices.reshape(-1, 3, 3)
+    return data
+
+
+def load_stl(path) -> np.ndarray:
+    """read_stl for binary files, read_ascii_stl for ASCII ones."""
+    try:
+        return read_stl(path)
+    except ValueError:
+        if Path(path).read_bytes()[:HEADER_SIZE].lstrip().startswith(b"solid"):
+            return read_ascii_stl(path)
+        raise
+
+
+def face_normals(triangles: np.ndarray) -> np.ndarray:
+    """Unit normals of (n, 3, 3) triangles, counter-clockwise outward, zero for degenerate ones."""
+    triangles = np.asarray(triangles, dtype=np.float64)
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    return np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+
+
+def write_stl(path, triangles: np.ndarray, faces: np.ndarray = None, normals: np.ndarray = None,
+              attributes: np.ndarray = None, header: bytes = b"") -> Path:
+    """
+    Write a binary STL from arrays.
+
+        write_stl("part.stl", triangles)           # (n, 3, 3)
+        write_stl("part.stl", vertices, faces)     # (m, 3) and (n, 3) indices
+        write_stl("copy.stl", data)                # a read_stl array
+
+    Args:
+        path: File to write
+        triangles: (n, 3, 3) corners, (m, 3) vertices with faces, or an
+            STL_DTYPE array written as is
+        faces: (n, 3) vertex indices into triangles
+        normals: (n, 3) face normals, computed from the corners if None
+        attributes: (n,) attribute words, zero if None
+        header: Up to 80 bytes, padded with zeros
+
+    Returns:
+        The path written
+    """
+    path = Path(path)
+    if header and len(header) > HEADER_SIZE:
+        raise ValueError(f"STL header is {len(header)} bytes, at most {HEADER_SIZE} fit")
+
+    if isinstance(triangles, np.ndarray) and triangles.dtype == STL_DTYPE:
+        data = triangles
+    else:
+        triangles = np.asarray(triangles)
+        if faces is not None:
+            triangles = triangles[np.asarray(faces)]
+        data = np.empty(len(triangles), STL_DTYPE)
+        data["vertices"] = triangles
+        data["normal"] = face_normals(triangles) if normals is None else normals
+        data["attribute"] = 0 if attributes is None else attributes
+
+    with open(path, "wb") as f:
+        f.write(header.ljust(HEADER_SIZE, b"\0"))
+        f.write(np.uint32(len(data)).tobytes())
+        data.tofile(f)
+    return path
+
+
+def surface_area(triangles: np.ndarray) -> float:
+    """Total area of (n, 3, 3) triangles."""
+    triangles = np.asarray(triangles, dtype=np.float64)
+    cross = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    return float(np.linalg.norm(cross, axis=1).sum() / 2)
+
+
+def volume(triangles: np.ndarray) -> float:
+    """Enclosed volume of a closed, outward-facing triangle mesh (signed tetrahedra)."""
+    triangles = np.asarray(triangles, dtype=np.float64)
+    return float(np.einsum("ij,ij->i", triangles[:, 0], np.cross(triangles[:, 1], triangles[:, 2])).sum() / 6)
+
+
+def main(argv=None) -> int:
+    for name in argv if argv is not None else sys.argv[1:]:
+        data = load_stl(name)
+        triangles = data["vertices"]
+        low, high = triangles.min(axis=(0, 1)), triangles.max(axis=(0, 1))
+        print(f"{name}: {len(data)} triangles, "
+              f"size {' x '.join(f'{v:.2f}' for v in high - low)} mm, "
+              f"area {surface_area(triangles):.1f} mm2, volume {volume(triangles):.1f} mm3")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
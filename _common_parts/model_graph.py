@@ -0,0 +1,88 @@
+import ocp_vscode
+
+from _common_parts.export import export_model
+from _common_parts.part_cache import cached_part
+
+
+class ModelGraph:
+    """
+    Named parts of a model script, built lazily and at most once per
+    parameter set, shared by the viewer and the exporter.
+
+        model = ModelGraph(PART_NAME)
+
+        @model.part("front", prepare_export=lambda p: p.solids()[0])
+        def front_cover(): ...
+
+        model.show(reset_camera=Camera.KEEP)   # builds every part once
+        model.export()                          # reuses the same solids
+        model.check_assembly()                  # interference and clearance
+
+    Parts are cached on the module-level constants they read, so changing
+    a constant and re-running the cell rebuilds only what depends on it.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.nodes = {}
+
+    def part(self, node: str, prepare_export=None):
+        """
+        Register a part factory as a named node.
+
+        Args:
+            node: Node name, exported as <name>_<node>
+            prepare_export: Optional function applied to the part before export
+        """
+        def register(func):
+            factory = cached_part(maxsize=4)(func)
+            self.nodes[node] = (factory, prepare_export)
+            return factory
+        return register
+
+    def get(self, node: str):
+        """Build (or reuse) a node's part."""
+        factory, _ = self.nodes[node]
+        return factory()
+
+    def show(self, *nodes, **kwargs):
+        """Show the given nodes, or all of them, in the OCP viewer."""
+        nodes = nodes or tuple(self.nodes)
+        # Looked up per call so headless builds can swap show() for a no-op
+        ocp_vscode.show(*[self.get(n) for n in nodes], names=list(nodes), **kwargs)
+
+    def export_part(self, node: str):
+        """A node's part as exported, prepare_export applied."""
+        _, prepare_export = self.nodes[node]
+        part = self.get(node)
+        return prepare_export(part) if prepare_export is not None else part
+
+    def export(self, *nodes, **kwargs):
+        """
+        Export the given nodes, or all of them, with export_model.
+
+        Args:
+            nodes: Node names, defaults to every node
+            kwargs: Passed on to export_model
+        """
+        for node in nodes or tuple(self.nodes):
+            export_model(self.export_part(node), f"{self.name}_{node}", **kwargs)
+
+    def check_assembly(self, *nodes, **kwargs) -> list:
+        """
+        Check the given nodes, or all of them, for interference and
+        clearance where they are built, and print the report.
+
+        Args:
+            nodes: Node names, defaults to every node
+            kwargs: Passed on to assembly.check_assembly
+
+        Returns:
+            assembly.PairCheck per pair of nodes
+        """
+        # Needs scipy, only loaded by models that check their assembly
+        from _common_parts.assembly import check_assembly, print_report
+
+        results = check_assembly({node: self.export_part(node) for node in nodes or tuple(self.nodes)}, **kwargs)
+        print_report(results)
+        return results
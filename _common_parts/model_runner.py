@@ -0,0 +1,128 @@
+import ast
+import os
+import sys
+from pathlib import Path
+
+import ocp_vscode
+
+from _common_parts.export import export_session
+
+REPO_ROOT = Path(__file__).parent.parent
+
+# A script calling any of these is a model, see find_models
+EXPORT_CALLS = ("export_model(", "export_instances(", "ModelGraph(")
+
+
+def _no_viewer(*args, **kwargs):
+    pass
+
+
+def disable_viewer():
+    """
+    Replace the ocp_vscode show functions with no-ops.
+    Must run before a model script does `from ocp_vscode import *`.
+    """
+    for name in ("show", "show_object", "show_objects", "show_all", "show_clear"):
+        setattr(ocp_vscode, name, _no_viewer)
+
+
+def find_models(root: Path = REPO_ROOT) -> list:
+    """
+    Find every model script in the repo: a .py file in a top-level
+    model directory that exports with one of EXPORT_CALLS.
+    """
+    models = []
+    for model_dir in sorted(root.iterdir()):
+        if not model_dir.is_dir() or model_dir.name.startswith(("_", ".")):
+            continue
+        for script in sorted(model_dir.glob("*.py")):
+            source = script.read_text(encoding="utf-8")
+            if any(call in source for call in EXPORT_CALLS):
+                models.append(script)
+    return models
+
+
+def model_name(script: Path) -> str:
+    """Name used for output folders and reports, e.g. curtain_blocker/holder."""
+    script = Path(script).resolve()
+    return f"{script.parent.name}/{script.stem}"
+
+
+def forget_model_modules():
+    """
+    Drop imported model modules (e.g. curtain_blocker.blocker) so a long-lived
+    process picks up edits. _common_parts and the libraries stay loaded.
+    """
+    common = REPO_ROOT / "_common_parts"
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None)
+        if not path:
+            continue
+        path = Path(path).resolve()
+        if REPO_ROOT in path.parents and common not in path.parents:
+            del sys.modules[name]
+
+
+def compile_model(script: Path, overrides: dict = None):
+    """
+    Compile a model script, replacing the values of module-level constants.
+    `base_height = 7` with overrides {"base_height": 6} runs as `base_height = 6`,
+    so everything computed from it afterwards follows.
+
+    Args:
+        script: Path to the model script
+        overrides: Constant name to new value, values must be Python literals
+
+    Raises:
+        ValueError: An override does not match a module-level assignment
+    """
+    script = Path(script)
+    tree = ast.parse(script.read_text(encoding="utf-8"), filename=str(script))
+    remaining = set(overrides or {})
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1:
+            target = node.targets[0]
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            target = node.target
+        else:
+            continue
+        if isinstance(target, ast.Name) and target.id in remaining:
+            value = ast.parse(repr(overrides[target.id]), mode="eval").body
+            node.value = ast.copy_location(value, node.value)
+            remaining.discard(target.id)
+    if remaining:
+        raise ValueError(f"Not module-level constants in {script.name}: {', '.join(sorted(remaining))}")
+    return compile(ast.fix_missing_locations(tree), str(script), "exec")
+
+
+def run_model(script: Path, export_dir: Path, overrides: dict = None, timings: dict = None) -> list:
+    """
+    Run a model script headless, without the viewer, exporting into export_dir.
+
+    Args:
+        script: Path to the model script
+        export_dir: Where export_model writes the files
+        overrides: Module-level constants to replace, see compile_model()
+        timings: Filled with export_model's seconds per step for each export name
+
+    Returns:
+        Paths of every exported file
+    """
+    script = Path(script).resolve()
+    code = compile_model(script, overrides)
+    disable_viewer()
+    if str(REPO_ROOT) not in sys.path:
+        sys.path.insert(0, str(REPO_ROOT))
+
+    export_dir = Path(export_dir).resolve()
+    with export_session(export_dir) as session:
+        # Stray relative writes land next to the exports, not in the repo
+        cwd = os.getcwd()
+        os.chdir(export_dir)
+        try:
+            exec(code, {"__name__": "__main__", "__file__": str(script)})
+        finally:
+            os.chdir(cwd)
+            if timings is not None:
+                timings.update(session.timings)
+    return session.files
@@ -0,0 +1,141 @@
+import functools
+import inspect
+import types
+from collections import OrderedDict
+
+from build123d import BaseLineObject, BasePartObject, BaseSketchObject, Curve, Part, Shape, Sketch
+from build123d.topology import downcast
+from OCP.TopLoc import TopLoc_Location
+
+from _common_parts import draft
+
+# Module-level values that count as "constants" for the cache key
+_CONSTANT_TYPES = (int, float, str, bool, type(None), tuple, frozenset)
+
+# Builder objects (Box, Circle, ...) can't be rebuilt from a TopoDS shape
+_PLAIN_CLASS = ((BasePartObject, Part), (BaseSketchObject, Sketch), (BaseLineObject, Curve))
+
+
+def plain_class(shape: Shape) -> type:
+    """Class that rebuilds a shape from its TopoDS shape, Part for a Box and the like."""
+    return next((plain for base, plain in _PLAIN_CLASS if isinstance(shape, base)), shape.__class__)
+
+
+def _share(value):
+    # New handle on the same TShape: cheap, and in-place move() on the
+    # copy does not move the cached solid
+    if isinstance(value, Shape) and value.wrapped is not None:
+        return plain_class(value)(downcast(value.wrapped.Moved(TopLoc_Location())))
+    if isinstance(value, tuple):
+        return tuple(_share(v) for v in value)
+    if isinstance(value, list):
+        return [_share(v) for v in value]
+    return value
+
+
+def _global_names(func, module_globals: dict, seen: set) -> set:
+    # Names a function reads from its module, following calls into other
+    # functions of the same module and into nested helper functions
+    func = inspect.unwrap(func)
+    if func in seen:
+        return set()
+    seen.add(func)
+
+    names = set()
+    codes = [func.__code__]
+    while codes:
+        code = codes.pop()
+        names.update(code.co_names)
+        codes.extend(c for c in code.co_consts if isinstance(c, types.CodeType))
+
+    for name in list(names):
+        value = module_globals.get(name)
+        if inspect.isfunction(value) and inspect.unwrap(value).__globals__ is module_globals:
+            names |= _global_names(value, module_globals, seen)
+    return names
+
+
+def dependencies(func) -> tuple:
+    """
+    What a function reads from its own module, directly or through the
+    same-module functions it calls.
+
+    Returns:
+        (those functions sorted by name, names of everything else it reads)
+    """
+    module_globals = inspect.unwrap(func).__globals__
+    names = _global_names(func, module_globals, set())
+    functions = sorted(n for n in names if inspect.isfunction(module_globals.get(n))
+                       and inspect.unwrap(module_globals[n]).__globals__ is module_globals)
+    return [inspect.unwrap(module_globals[n]) for n in functions], sorted(names.difference(functions))
+
+
+def module_constants(func, names) -> tuple:
+    """Current (name, value) of the module-level constants among names."""
+    module_globals = inspect.unwrap(func).__globals__
+    # co_names also lists attributes (.translate), keep real constants only
+    return tuple((name, module_globals[name]) for name in names
+                 if name in module_globals and isinstance(module_globals[name], _CONSTANT_TYPES))
+
+
+def cached_part(func=None, *, maxsize: int = 32):
+    """
+    Cache the solids a feature factory returns.
+
+    The key is the call arguments plus every module-level constant the
+    factory reads (directly or through helpers it calls), so changing
+    e.g. WALL_THICKNESS and re-running a cell rebuilds instead of reusing.
+    Each call returns a cheap copy sharing the cached geometry.
+
+        @cached_part
+        def get_board_holder_clip(): ...
+
+        @cached_part(maxsize=8)
+        def get_dent(is_right=False): ...
+
+    Args:
+        maxsize: Entries kept, least recently used are dropped first
+    """
+    if func is None:
+        return functools.partial(cached_part, maxsize=maxsize)
+
+    signature = inspect.signature(func)
+    cache = OrderedDict()
+    stats = {"hits": 0, "misses": 0}
+    # Resolved on first call, the helpers may be defined after the factory
+    constant_names = None
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        nonlocal constant_names
+        if constant_names is None:
+            _, constant_names = dependencies(func)
+
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        constants = module_constants(func, constant_names)
+        # Draft parts (no fillets) never stand in for full quality ones
+        key = (tuple(bound.arguments.items()), constants, draft.ENABLED)
+        try:
+            hash(key)
+        except TypeError:
+            # Unhashable arguments (shapes, lists), nothing to reuse
+            stats["misses"] += 1
+            return func(*args, **kwargs)
+
+        if key in cache:
+            stats["hits"] += 1
+            cache.move_to_end(key)
+        else:
+            stats["misses"] += 1
+            cache[key] = func(*args, **kwargs)
+            if len(cache) > maxsize:
+                cache.popitem(last=False)
+        return _share(cache[key])
+
+    def cache_info() -> dict:
+        return {**stats, "size": len(cache), "maxsize": maxsize}
+
+    wrapper.cache_info = cache_info
+    wrapper.cache_clear = cache.clear
+    return wrapper
@@ -0,0 +1,142 @@
+"""
+Named OCCT performance profiles, applied once per script:
+
+    from _common_parts.performance import use_profile
+    use_profile("fast-preview")
+
+or for every script in a session with OCCT_PROFILE=fast-preview; every
+model script imports this module, which applies OCCT_PROFILE. A profile
+sets the process-wide OCCT switches that build123d otherwise leaves alone:
+parallel booleans, the fuzzy boolean tolerance, the thread pool BRepMesh
+runs on, the export tessellation tolerances and whether 3D fillets are
+built (see draft.py). Draft mode exports nothing, so "fast-preview" leaves
+the export tessellation alone and "fast-export" is the one for quick
+test prints.
+
+    python -m _common_parts.performance            # active settings
+    python -m _common_parts.performance --list     # every profile
+"""
+import argparse
+import os
+import sys
+from dataclasses import asdict, dataclass
+
+from OCP.BOPAlgo import BOPAlgo_Options
+from OCP.OSD import OSD_Parallel, OSD_ThreadPool
+
+from _common_parts import booleans, draft, export
+
+
+@dataclass(frozen=True)
+class Profile:
+    name: str
+    # Parallel mode for every OCCT boolean, not only the ones that ask for it
+    parallel: bool
+    # Fuzzy boolean tolerance in mm, None for exact booleans
+    fuzzy: float
+    # Skip 3D fillets and chamfers, see draft.set_draft_mode. Nothing is
+    # exported in draft mode
+    draft: bool
+    # Export tessellation, see export.set_mesh_tolerance, None keeps the
+    # current one
+    linear_deflection: float = None
+    angular_deflection: float = None
+    # Threads for OCCT's parallel algorithms (BRepMesh, booleans), None for all cores
+    threads: int = None
+
+
+PROFILES = {
+    # Quick look while modelling: no fillets, coarse viewer meshes, no exports
+    "fast-preview": Profile(
+        name="fast-preview", parallel=True, fuzzy=1e-4, draft=True),
+    # Test prints: fillets on, coarse export meshes
+    "fast-export": Profile(
+        name="fast-export", parallel=True, fuzzy=1e-4, draft=False,
+        linear_deflection=0.01, angular_deflection=0.5),
+    # Final files: exact booleans, project default tessellation
+    "accurate-export": Profile(
+        name="accurate-export", parallel=True, fuzzy=None, draft=False,
+        linear_deflection=0.001, angular_deflection=0.1),
+}
+
+ACTIVE = None
+
+
+def use_profile(profile) -> Profile:
+    """
+    Apply a performance profile to every boolean, fillet and tessellation
+    that follows in this process.
+
+    Args:
+        profile: Name from PROFILES or a Profile
+
+    Returns:
+        The applied Profile
+
+    Raises:
+        ValueError: Unknown profile name
+    """
+    global ACTIVE
+    if isinstance(profile, str):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown profile {profile!r}, expected one of {', '.join(PROFILES)}")
+        profile = PROFILES[profile]
+
+    BOPAlgo_Options.SetParallelMode_s(profile.parallel)
+    booleans.set_fuzzy_value(profile.fuzzy)
+    export.set_mesh_tolerance(profile.linear_deflection, profile.angular_deflection)
+    draft.set_draft_mode(profile.draft)
+    OSD_ThreadPool.DefaultPool_s().Init(profile.threads or -1)
+    ACTIVE = profile
+    return profile
+
+
+def active_settings() -> dict:
+    """The settings in effect right now, read back from OCCT and the modules they live in."""
+    pool = OSD_ThreadPool.DefaultPool_s()
+    return {
+        "profile": ACTIVE.name if ACTIVE else None,
+        "parallel_booleans": BOPAlgo_Options.GetParallelMode_s(),
+        "fuzzy_value": booleans.FUZZY_VALUE,
+        "linear_deflection": export.LINEAR_DEFLECTION,
+        "angular_deflection": export.ANGULAR_DEFLECTION,
+        "fillets": not draft.ENABLED,
+        "occt_threads": pool.NbThreads(),
+        "logical_processors": OSD_Parallel.NbLogicalProcessors_s(),
+    }
+
+
+def print_settings(settings: dict = None):
+    settings = settings or active_settings()
+    width = max(len(name) for name in settings)
+    for name, value in settings.items():
+        print(f"{name:<{width}}  {value}")
+
+
+if os.environ.get("OCCT_PROFILE"):
+    use_profile(os.environ["OCCT_PROFILE"])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Show OCCT performance settings.")
+    parser.add_argument("profile", nargs="?", default=None,
+                        help="Apply this profile before reporting (default: OCCT_PROFILE or none)")
+    parser.add_argument("--list", action="store_true", help="Show every profile")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for profile in PROFILES.values():
+            print_settings(asdict(profile))
+            print()
+        return 0
+    if args.profile:
+        try:
+            use_profile(args.profile)
+        except ValueError as error:
+            parser.error(str(error))
+    print_settings()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
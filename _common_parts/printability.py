@@ -0,0 +1,273 @@
+"""
+Printability checks on a part's tessellation, Z up as exported.
+
+    report = analyze(IndexedMesh.from_part(part))
+    print_summary(report, "front cover")
+    write_heatmap("front_printability.ply", report)
+
+    python -m _common_parts.printability ac_pir_detector_case/ac_pir_detector_case_front.stl
+    python -m _common_parts.printability part.stl --overhang 50 --min-wall 1.2 -o build/printability
+
+Per part it finds:
+    overhangs: faces off the bed turned down more than the overhang angle
+        from vertical, their area and the support volume between them and
+        the part or bed below
+    thin walls: the thickness at every face, how far a ray from the face's
+        centre travels straight into the part before it leaves again
+    open and non-manifold edges: edges of one face, or of more than two
+Rays go through a BVH (see bvh.py): the PIR case parts take a few tenths
+of a second, cheap enough for every export. Set PRINT_CHECK=1 to print the
+summary on every export_model call.
+"""
+import argparse
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from _common_parts import mesh_io
+from _common_parts.bvh import BVH
+from _common_parts.indexed_mesh import IndexedMesh
+
+# Degrees from vertical a downward face may lean before it needs support
+OVERHANG_ANGLE = 45.0
+# Two perimeters of a 0.4 mm nozzle
+MIN_WALL = 0.8
+# Thickness rays stop here, thicker walls all count as this thick
+THICKNESS_RANGE = 10.0
+# Faces this close to the lowest point lie on the bed
+BED_TOLERANCE = 0.01
+
+ENABLED = os.environ.get("PRINT_CHECK", "0") not in ("", "0")
+
+# Heatmap colours
+THIN_COLOR = (230, 20, 20)
+WALL_COLOR = (250, 220, 40)
+SOLID_COLOR = (60, 190, 80)
+OVERHANG_COLOR = (40, 110, 240)
+EDGE_COLOR = (230, 40, 230)
+
+
+@dataclass
+class Printability:
+    """
+    Per face results of analyze().
+
+    Attributes:
+        mesh: The analysed mesh
+        normals: (n, 3) outward unit normals
+        areas: (n,) face areas in mm2
+        overhang: (n,) faces that need support
+        support_height: (n,) mm from an overhang face down to the part or bed, 0 elsewhere
+        thickness: (n,) wall thickness in mm, inf past THICKNESS_RANGE or without a hit
+        open_edges: (k, 2) vertex indices of edges with one face
+        non_manifold_edges: (k, 2) vertex indices of edges with three or more faces
+        bad_edge_faces: (n,) faces with an open or non-manifold edge
+        overhang_angle: Degrees from vertical used for overhang
+        min_wall: Thinner walls count as thin
+        seconds: Time analyze() took
+    """
+    mesh: IndexedMesh
+    normals: np.ndarray
+    areas: np.ndarray
+    overhang: np.ndarray
+    support_height: np.ndarray
+    thickness: np.ndarray
+    open_edges: np.ndarray
+    non_manifold_edges: np.ndarray
+    bad_edge_faces: np.ndarray
+    overhang_angle: float
+    min_wall: float
+    seconds: float
+
+    @property
+    def overhang_area(self) -> float:
+        return float(self.areas[self.overhang].sum())
+
+    @property
+    def support_volume(self) -> float:
+        """Prisms from each overhang face straight down, mm3, an estimate for solid support."""
+        projected = self.areas * -self.normals[:, 2]
+        return float((projected * self.support_height)[self.overhang].sum())
+
+    @property
+    def thin(self) -> np.ndarray:
+        return self.thickness < self.min_wall
+
+    @property
+    def thin_area(self) -> float:
+        return float(self.areas[self.thin].sum())
+
+    @property
+    def thinnest_face(self) -> int:
+        return int(np.argmin(self.thickness))
+
+
+def edges(faces: np.ndarray) -> tuple:
+    """
+    Undirected edges of a mesh and how many faces use each.
+
+    Returns:
+        (edges (k, 2) with the lower index first, face count per edge,
+        index into edges of every face side (n, 3))
+    """
+    sides = np.sort(faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2).astype(np.int64), axis=1)
+    keys = (sides[:, 0] << 32) | sides[:, 1]
+    _, first, inverse, counts = np.unique(keys, return_index=True, return_inverse=True, return_counts=True)
+    return sides[first], counts, inverse.reshape(-1, 3)
+
+
+def analyze(mesh: IndexedMesh, overhang_angle: float = OVERHANG_ANGLE, min_wall: float = MIN_WALL,
+            thickness_range: float = THICKNESS_RANGE) -> Printability:
+    """
+    Check a mesh for overhangs, thin walls and open or non-manifold edges.
+
+    Args:
+        mesh: Part as printed, Z up, the lowest point on the bed
+        overhang_angle: Degrees from vertical a face may lean down unsupported
+        min_wall: Walls thinner than this in mm count as thin
+        thickness_range: Longest thickness measured in mm
+
+    Returns:
+        Per face results, see Printability
+    """
+    start = time.perf_counter()
+    triangles = mesh.triangles.astype(np.float64)
+    cross = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    areas = np.linalg.norm(cross, axis=1) / 2
+    normals = mesh_io.face_normals(triangles)
+    # A mesh wound inside out still gets its rays into the material
+    if mesh_io.volume(triangles) < 0:
+        normals = -normals
+    centres = triangles.mean(axis=1)
+    solid = areas > 0
+    tree = BVH(triangles)
+    faces = np.arange(len(triangles))
+
+    thickness = np.full(len(triangles), np.inf)
+    thickness[solid], _ = tree.intersect(centres[solid], -normals[solid], thickness_range, skip=faces[solid])
+
+    bed = mesh.vertices[:, 2].min() if len(mesh.vertices) else 0.0
+    on_bed = triangles[:, :, 2].max(axis=1) <= bed + BED_TOLERANCE
+    overhang = solid & ~on_bed & (-normals[:, 2] > np.sin(np.radians(overhang_angle)))
+    # Down from each overhang to the part below it, or the bed
+    drop = centres[overhang, 2] - bed
+    below, _ = tree.intersect(centres[overhang], np.tile((0.0, 0.0, -1.0), (len(drop), 1)), drop,
+                              skip=faces[overhang])
+    support_height = np.zeros(len(triangles))
+    support_height[overhang] = np.minimum(below, drop)
+
+    edge_list, counts, sides = edges(mesh.faces)
+    return Printability(
+        mesh=mesh,
+        normals=normals,
+        areas=areas,
+        overhang=overhang,
+        support_height=support_height,
+        thickness=thickness,
+        open_edges=edge_list[counts == 1],
+        non_manifold_edges=edge_list[counts > 2],
+        bad_edge_faces=(counts[sides] != 2).any(axis=1),
+        overhang_angle=overhang_angle,
+        min_wall=min_wall,
+        seconds=time.perf_counter() - start,
+    )
+
+
+def face_colors(report: Printability) -> np.ndarray:
+    """
+    (n, 3) uint8 heatmap colour per face.
+
+    Walls go from yellow at min_wall to green at three times that, thin
+    ones are red. Overhangs that are not thin are blue, faces on open or
+    non-manifold edges magenta.
+    """
+    ramp = np.clip((report.thickness - report.min_wall) / (2 * report.min_wall), 0, 1)[:, None]
+    colors = (1 - ramp) * WALL_COLOR + ramp * np.array(SOLID_COLOR)
+    colors[report.overhang] = OVERHANG_COLOR
+    colors[report.thin] = THIN_COLOR
+    colors[report.bad_edge_faces] = EDGE_COLOR
+    return colors.round().astype(np.uint8)
+
+
+def write_heatmap(path, report: Printability) -> Path:
+    """
+    Write a binary PLY with the face_colors of a report.
+
+    Every face gets its own three vertices, so viewers that only read
+    vertex colours (MeshLab, Blender, CloudCompare) show flat face colours.
+    """
+    path = Path(path)
+    triangles = report.mesh.triangles
+    vertex = np.zeros(3 * len(triangles), np.dtype([("xyz", "<f4", (3,)), ("rgb", "u1", (3,))]))
+    vertex["xyz"] = triangles.reshape(-1, 3)
+    vertex["rgb"] = np.repeat(face_colors(report), 3, axis=0)
+    face = np.zeros(len(triangles), np.dtype([("count", "u1"), ("index", "<i4", (3,))]))
+    face["count"] = 3
+    face["index"] = np.arange(3 * len(triangles)).reshape(-1, 3)
+    header = (
+        "ply\nformat binary_little_endian 1.0\ncomment printability heatmap\n"
+        f"element vertex {len(vertex)}\n"
+        "property float x\nproperty float y\nproperty float z\n"
+        "property uchar red\nproperty uchar green\nproperty uchar blue\n"
+        f"element face {len(face)}\n"
+        "property list uchar int vertex_indices\nend_header\n")
+    with open(path, "wb") as f:
+        f.write(header.encode("ascii"))
+        vertex.tofile(f)
+        face.tofile(f)
+    return path
+
+
+def print_summary(report: Printability, name: str = "part"):
+    print(f"{name}: {len(report.mesh)} faces, checked in {report.seconds:.2f}s")
+    print(f"  overhangs past {report.overhang_angle:g} deg: {report.overhang.sum()} faces, "
+          f"{report.overhang_area:.1f} mm2, support ~{report.support_volume:.0f} mm3")
+    thinnest = report.thinnest_face if len(report.mesh) else None
+    if thinnest is not None and np.isfinite(report.thickness[thinnest]):
+        x, y, z = report.mesh.triangles[thinnest].mean(axis=0)
+        # + 0.0 turns a -0.0 from touching faces into 0.00
+        print(f"  thinnest wall: {report.thickness[thinnest] + 0.0:.2f} mm at ({x:.1f}, {y:.1f}, {z:.1f}), "
+              f"{report.thin.sum()} faces below {report.min_wall:g} mm ({report.thin_area:.1f} mm2)")
+    else:
+        print("  thinnest wall: no wall measured")
+    print(f"  open edges: {len(report.open_edges)}, non-manifold edges: {len(report.non_manifold_edges)}")
+
+
+def check_export(stl_path: Path, name: str):
+    """Print the summary for an STL export_model just wrote (PRINT_CHECK=1)."""
+    print_summary(analyze(IndexedMesh.from_stl(stl_path)), name)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check STL parts for overhangs, thin walls and bad edges.")
+    parser.add_argument("stl", type=Path, nargs="+")
+    parser.add_argument("--overhang", type=float, default=OVERHANG_ANGLE,
+                        help=f"Degrees from vertical that need support (default: {OVERHANG_ANGLE:g})")
+    parser.add_argument("--min-wall", type=float, default=MIN_WALL,
+                        help=f"Thinnest acceptable wall in mm (default: {MIN_WALL:g})")
+    parser.add_argument("-o", "--output", type=Path, default=None,
+                        help="Write <name>_printability.ply heatmaps into this directory")
+    args = parser.parse_args(argv)
+
+    problems = False
+    for path in args.stl:
+        try:
+            mesh = IndexedMesh.from_stl(path)
+        except (OSError, ValueError) as error:
+            parser.error(str(error))
+        report = analyze(mesh, args.overhang, args.min_wall)
+        print_summary(report, str(path))
+        problems |= bool(report.thin.any() or report.bad_edge_faces.any())
+        if args.output:
+            args.output.mkdir(parents=True, exist_ok=True)
+            heatmap = write_heatmap(args.output / f"{path.stem}_printability.ply", report)
+            print(f"  heatmap: {heatmap}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,319 @@
+"""
+Per-operation profiler for model scripts.
+
+    python -m _common_parts.profiler ac_pir_detector_case/ac_pir_detector_case.py
+    python -m _common_parts.profiler phone-samsung-s22-case/phone-samsung-s22.py --top 50
+
+Runs the script headless with build123d's booleans (+, -, &), fillet,
+chamfer, extrude, loft, revolve, sweep, batch_boolean, Mesher and
+export_step timed. Each call is recorded with its wall time, the faces
+and edges going in and out and the script line that made it. Prints the
+slowest lines and writes a folded stack file for flamegraph.pl or
+https://www.speedscope.app.
+"""
+import argparse
+import functools
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+import build123d
+from build123d import Compound, Shape
+from build123d.mesher import Mesher
+from OCP.TopAbs import TopAbs_EDGE, TopAbs_FACE
+from OCP.TopExp import TopExp
+
+try:
+    from OCP.collections import IndexedMap_TopoDS_Shape_TopTools_ShapeMapHasher as TopTools_IndexedMapOfShape
+except ImportError:  # OCP < 8
+    from OCP.TopTools import TopTools_IndexedMapOfShape
+
+from _common_parts import booleans, brep_cache, export_cache
+from _common_parts.build_server import parse_overrides
+from _common_parts.model_runner import REPO_ROOT, compile_model, model_name, run_model
+
+DEFAULT_OUTPUT = REPO_ROOT / "build" / "profile"
+
+# build123d functions, patched wherever they were imported by name
+FUNCTIONS = {
+    "fillet": build123d.fillet,
+    "chamfer": build123d.chamfer,
+    "extrude": build123d.extrude,
+    "loft": build123d.loft,
+    "revolve": build123d.revolve,
+    "sweep": build123d.sweep,
+    "export_step": build123d.export_step,
+    "batch_boolean": booleans.batch_boolean,
+}
+
+# (class, attribute, label)
+METHODS = [
+    (Shape, "__add__", "fuse (+)"),
+    (Shape, "__sub__", "cut (-)"),
+    (Shape, "__and__", "intersect (&)"),
+    (Compound, "__add__", "fuse (+)"),
+    (Compound, "__sub__", "cut (-)"),
+    (Compound, "__and__", "intersect (&)"),
+    (Mesher, "add_shape", "Mesher.add_shape"),
+    (Mesher, "write", "Mesher.write"),
+]
+
+
+@dataclass
+class Call:
+    operation: str
+    # Innermost repo line that made the call, "model/script.py:123"
+    location: str
+    # Folded stack, outermost first: repo frames, then enclosing operations
+    stack: tuple
+    seconds: float
+    # Without the time of operations called from this one
+    self_seconds: float
+    faces_in: int
+    edges_in: int
+    faces_out: int
+    edges_out: int
+
+
+def _count(shape, kind) -> int:
+    found = TopTools_IndexedMapOfShape()
+    TopExp.MapShapes_s(shape, kind, found)
+    return found.Extent()
+
+
+def _topology(values) -> tuple:
+    # Faces and edges of every shape in values, one level into lists
+    faces = edges = 0
+    for value in values:
+        items = value if isinstance(value, (list, tuple)) else (value,)
+        for item in items:
+            if isinstance(item, Shape) and item.wrapped is not None:
+                faces += _count(item.wrapped, TopAbs_FACE)
+                edges += _count(item.wrapped, TopAbs_EDGE)
+    return faces, edges
+
+
+class Profiler:
+    """
+    Times the operations in FUNCTIONS and METHODS while active.
+
+        with Profiler() as profiler:
+            run_model(script, export_dir)
+        print_report(profiler.calls)
+    """
+
+    def __init__(self):
+        self.calls = []
+        # One [label, child seconds, counting overhead] per operation in progress
+        self._active = []
+        self._patched = []
+        self._frame_labels = {}
+
+    def _repo_stack(self) -> tuple:
+        # Frames in repo files outside this module, outermost first
+        frames = []
+        frame = sys._getframe(2)
+        while frame is not None:
+            code = frame.f_code
+            label = self._frame_labels.get(code.co_filename, "")
+            if label == "":
+                path = Path(code.co_filename).resolve()
+                label = None
+                if REPO_ROOT in path.parents and path != Path(__file__).resolve():
+                    label = path.relative_to(REPO_ROOT).as_posix()
+                self._frame_labels[code.co_filename] = label
+            if label:
+                frames.append(f"{code.co_name} ({label}:{frame.f_lineno})")
+            frame = frame.f_back
+        return tuple(reversed(frames))
+
+    def wrap(self, label: str, function):
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            # Compound.__sub__ calls Shape.__sub__, count that once
+            if self._active and self._active[-1][0] == label:
+                return function(*args, **kwargs)
+
+            counting = time.perf_counter()
+            repo_stack = self._repo_stack()
+            faces_in, edges_in = _topology(list(args) + list(kwargs.values()))
+            entry = [label, 0.0, 0.0]
+            self._active.append(entry)
+            start = time.perf_counter()
+            result = None
+            try:
+                result = function(*args, **kwargs)
+                return result
+            finally:
+                end = time.perf_counter()
+                self._active.pop()
+                faces_out, edges_out = _topology([result])
+                # Inner calls' bookkeeping is not the operation's time
+                seconds = end - start - entry[2]
+                overhead = entry[2] + (start - counting) + (time.perf_counter() - end)
+                if self._active:
+                    self._active[-1][1] += seconds
+                    self._active[-1][2] += overhead
+                location = repo_stack[-1].rpartition(" (")[2][:-1] if repo_stack else "?"
+                self.calls.append(Call(
+                    operation=label,
+                    location=location,
+                    stack=repo_stack + tuple(e[0] for e in self._active) + (label,),
+                    seconds=seconds,
+                    self_seconds=seconds - entry[1],
+                    faces_in=faces_in, edges_in=edges_in,
+                    faces_out=faces_out, edges_out=edges_out))
+        return timed
+
+    def _replace(self, original, replacement):
+        # Every module that imported the function by name gets the replacement
+        for module in list(sys.modules.values()):
+            namespace = getattr(module, "__dict__", None)
+            if not namespace:
+                continue
+            for attribute, value in list(namespace.items()):
+                if value is original:
+                    self._patched.append((module, attribute, original))
+                    setattr(module, attribute, replacement)
+
+    def start(self):
+        for name, function in FUNCTIONS.items():
+            self._replace(function, self.wrap(name, function))
+        for cls, attribute, label in METHODS:
+            original = cls.__dict__[attribute]
+            self._patched.append((cls, attribute, original))
+            setattr(cls, attribute, self.wrap(label, original))
+
+    def stop(self):
+        for owner, attribute, original in reversed(self._patched):
+            setattr(owner, attribute, original)
+        self._patched = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def summarize(calls: list) -> list:
+    """
+    Group calls by operation and source line, slowest self time first.
+
+    Returns:
+        One dict per group with calls, seconds, self_seconds and the
+        topology of its slowest call
+    """
+    groups = defaultdict(list)
+    for call in calls:
+        groups[call.operation, call.location].append(call)
+    rows = []
+    for (operation, location), group in groups.items():
+        slowest = max(group, key=lambda c: c.self_seconds)
+        rows.append({
+            "operation": operation,
+            "location": location,
+            "calls": len(group),
+            "seconds": sum(c.seconds for c in group),
+            "self_seconds": sum(c.self_seconds for c in group),
+            "faces": f"{slowest.faces_in}->{slowest.faces_out}",
+            "edges": f"{slowest.edges_in}->{slowest.edges_out}",
+        })
+    return sorted(rows, key=lambda r: -r["self_seconds"])
+
+
+def print_report(calls: list, top: int = 25, wall_seconds: float = None):
+    rows = summarize(calls)
+    profiled = sum(c.self_seconds for c in calls)
+    headers = ("self s", "total s", "calls", "operation", "faces in->out", "edges in->out", "line")
+    table = [(f"{r['self_seconds']:.3f}", f"{r['seconds']:.3f}", str(r["calls"]), r["operation"],
+              r["faces"], r["edges"], r["location"]) for r in rows[:top]]
+    widths = [max(len(h), *(len(row[i]) for row in table)) if table else len(h) for i, h in enumerate(headers)]
+    print("  ".join(h.ljust(w) for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in table:
+        print("  ".join(cell.ljust(w) for cell, w in zip(row, widths)))
+    if len(rows) > top:
+        print(f"... {len(rows) - top} more lines")
+    summary = f"{len(calls)} operations, {profiled:.2f}s"
+    if wall_seconds:
+        summary += f" of {wall_seconds:.2f}s wall time ({profiled / wall_seconds:.0%})"
+    print(summary)
+
+
+def write_folded(calls: list, path: Path) -> Path:
+    """
+    Write self times as folded stacks ("frame;frame;operation microseconds"),
+    the input of flamegraph.pl and speedscope.
+    """
+    stacks = defaultdict(float)
+    for call in calls:
+        stacks[";".join(frame.replace(";", ",") for frame in call.stack)] += call.self_seconds
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, seconds in sorted(stacks.items()):
+            f.write(f"{stack} {max(1, round(seconds * 1e6))}\n")
+    return path
+
+
+def profile_model(script: Path, export_dir: Path, overrides: dict = None, use_caches: bool = False) -> tuple:
+    """
+    Run a model script headless with every operation timed.
+
+    Args:
+        script: Model script
+        export_dir: Where export_model writes the files
+        overrides: Module-level constants to replace, see compile_model()
+        use_caches: Keep the BREP and export caches on, by default
+            everything is built and exported for real
+
+    Returns:
+        (calls, wall seconds)
+    """
+    caches = brep_cache.ENABLED, export_cache.ENABLED
+    brep_cache.ENABLED = export_cache.ENABLED = use_caches
+    try:
+        start = time.perf_counter()
+        with Profiler() as profiler:
+            run_model(script, export_dir, overrides)
+        return profiler.calls, time.perf_counter() - start
+    finally:
+        brep_cache.ENABLED, export_cache.ENABLED = caches
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Time every build123d operation of a model script.")
+    parser.add_argument("script", type=Path, help="Model script")
+    parser.add_argument("--set", dest="overrides", action="append", default=[],
+                        metavar="NAME=VALUE", help="Override a module-level constant")
+    parser.add_argument("--top", type=int, default=25, help="Lines in the report (default: 25)")
+    parser.add_argument("--cached", action="store_true",
+                        help="Keep the BREP and export caches on (default: build and export everything)")
+    parser.add_argument("-o", "--output", type=Path, default=None,
+                        help="Export directory (default: build/profile/<model dir>/)")
+    parser.add_argument("--trace", type=Path, default=None,
+                        help="Folded stack file (default: <output>/<script>.folded)")
+    args = parser.parse_args(argv)
+
+    output = args.output or DEFAULT_OUTPUT / args.script.resolve().parent.name
+    overrides = parse_overrides(args.overrides)
+    # Only bad overrides are usage errors, the model's own ValueErrors propagate
+    try:
+        compile_model(args.script, overrides)
+    except ValueError as error:
+        parser.error(str(error))
+    calls, wall = profile_model(args.script, output, overrides, args.cached)
+
+    print(f"\n{model_name(args.script)}")
+    print_report(calls, args.top, wall)
+    trace = write_folded(calls, args.trace or Path(output) / f"{args.script.stem}.folded")
+    print(f"Flamegraph trace: {trace}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+"""
+Check that rebuilt models still match the STEP/STL files committed next to them.
+
+    python -m _common_parts.regression              # every model, all cores
+    python -m _common_parts.regression gear_slotter wl_1865
+
+Each model is rebuilt headless without caches. Every exported part with a
+committed <name>.step or <name>.stl beside its script is compared on:
+    volume and surface area, relative, from the STEP B-reps
+    bounding box corners, in mm
+    symmetric Hausdorff distance between the surfaces, in mm, from points
+    sampled on each mesh and their exact distance to the other mesh
+Parts without a committed file are listed as skipped.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from _common_parts.build_all import pool_context
+from _common_parts.bvh import point_triangle_distance
+from _common_parts.indexed_mesh import IndexedMesh
+from _common_parts.model_runner import find_models, model_name
+
+# Relative volume and area difference
+PROPERTY_TOLERANCE = 1e-3
+# Bounding box corners in mm
+BOX_TOLERANCE = 0.01
+# Surface distance in mm, room for a different tessellation of curved faces
+HAUSDORFF_TOLERANCE = 0.05
+
+# Random surface points per mesh, on top of its vertices
+SAMPLES = 20000
+# Grid point spacing on the triangles searched for the nearest one, in mm
+GRID_SPACING = 2.0
+MAX_DIVISIONS = 32
+# Nearest grid points whose triangles are measured per point, to start with
+CANDIDATES = 8
+PAIRS_PER_CHUNK = 1 << 20
+# Distances below this in mm are not worth proving exact
+RESOLUTION = 1e-4
+REFINE_BATCH = 256
+
+
+def sample_surface(mesh: IndexedMesh, count: int, rng) -> np.ndarray:
+    """
+    Points on a mesh: every vertex and `count` random points spread by area.
+    """
+    triangles = mesh.triangles.astype(np.float64)
+    areas = np.linalg.norm(np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0]), axis=1)
+    chosen = rng.choice(len(triangles), size=count, p=areas / areas.sum())
+    # Uniform barycentric coordinates, folded back into the triangle
+    u, v = rng.random(count), rng.random(count)
+    outside = u + v > 1
+    u[outside], v[outside] = 1 - u[outside], 1 - v[outside]
+    corners = triangles[chosen]
+    random = corners[:, 0] + u[:, None] * (corners[:, 1] - corners[:, 0]) + v[:, None] * (corners[:, 2] - corners[:, 0])
+    return np.concatenate([mesh.vertices[np.unique(mesh.faces)].astype(np.float64), random])
+
+
+def _grid(mesh: IndexedMesh, spacing: float) -> tuple:
+    # Regular barycentric grid on every triangle with at most `spacing`
+    # between grid points along the edges. Returns the points, their
+    # triangle and how far any surface point can be from its triangle's grid
+    triangles = mesh.triangles.astype(np.float64)
+    edges = np.stack([triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 1],
+                      triangles[:, 0] - triangles[:, 2]], axis=1)
+    longest = np.linalg.norm(edges, axis=2).max(axis=1)
+    divisions = np.clip(np.ceil(longest / spacing), 1, MAX_DIVISIONS).astype(np.int64)
+    points, faces = [], []
+    for n in np.unique(divisions):
+        i, j = np.nonzero(np.add.outer(np.arange(n + 1), np.arange(n + 1)) <= n)
+        chosen = np.flatnonzero(divisions == n)
+        corners = triangles[chosen]
+        points.append((corners[:, None, 0] + (i / n)[None, :, None] * (corners[:, None, 1] - corners[:, None, 0])
+                       + (j / n)[None, :, None] * (corners[:, None, 2] - corners[:, None, 0])).reshape(-1, 3))
+        faces.append(np.repeat(chosen, len(i)))
+    # A point of a triangle is within its longest edge / sqrt(3) of a corner
+    reach = float((longest / divisions).max()) / np.sqrt(3)
+    return np.concatenate(points), np.concatenate(faces), reach
+
+
+class SurfaceIndex:
+    """
+    Exact point to mesh distances, with a KD-tree over grid points on
+    every triangle to find the few triangles worth measuring.
+    """
+
+    def __init__(self, mesh: IndexedMesh, spacing: float = GRID_SPACING):
+        self.triangles = mesh.triangles.astype(np.float64)
+        points, self.faces, self.reach = _grid(mesh, spacing)
+        # Unbalanced builds in half the time, queries barely notice
+        self.tree = cKDTree(points, balanced_tree=False)
+
+    def _measure(self, points: np.ndarray, k: int) -> tuple:
+        k = min(k, self.tree.n)
+        distance, exact = np.empty(len(points)), np.empty(len(points), bool)
+        # Chunks keep the (points x candidates) arrays to a few million rows
+        step = max(1, PAIRS_PER_CHUNK // k)
+        for start in range(0, len(points), step):
+            chunk = points[start:start + step]
+            gaps, nearest = self.tree.query(chunk, k=k)
+            gaps, nearest = gaps.reshape(len(chunk), -1), nearest.reshape(len(chunk), -1)
+            corners = self.triangles[self.faces[nearest.ravel()]]
+            repeated = np.repeat(chunk, k, axis=0)
+            found = point_triangle_distance(repeated, corners[:, 0], corners[:, 1], corners[:, 2])
+            found = found.reshape(len(chunk), k).min(axis=1)
+            distance[start:start + step] = found
+            # The nearest triangle has a grid point within distance + reach: if
+            # every grid point that close was a candidate, the answer is exact
+            exact[start:start + step] = (gaps[:, -1] > found + self.reach) | (k == self.tree.n)
+        return distance, exact
+
+    def max_distance(self, points: np.ndarray) -> float:
+        """
+        Largest distance from the (n, 3) points to the surface, exact
+        down to RESOLUTION.
+
+        The first pass gives every point an upper bound, exact where its
+        search covered every triangle that could be nearer. Only points
+        whose bound still beats the largest exact distance are searched
+        wider, which is a handful unless the surfaces are far apart.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        bound, exact = self._measure(points, CANDIDATES)
+        searched = np.full(len(points), CANDIDATES)
+        best = bound[exact].max(initial=0.0)
+        while True:
+            todo = np.flatnonzero(~exact & (bound > max(best, RESOLUTION)))
+            if not len(todo):
+                return float(best)
+            # Largest bounds first, once exact they rule out the rest
+            batch = todo[np.argsort(-bound[todo])[:REFINE_BATCH]]
+            k = min(int(searched[batch].max()) * 4, self.tree.n)
+            bound[batch], exact[batch] = self._measure(points[batch], k)
+            searched[batch] = k
+            best = max(best, bound[batch][exact[batch]].max(initial=0.0))
+
+
+def hausdorff(a: IndexedMesh, b: IndexedMesh, samples: int = SAMPLES, seed: int = 0) -> float:
+    """
+    Symmetric Hausdorff distance between two meshes in mm, from the
+    vertices and random surface points of each measured exactly against
+    the other. 0 for two empty meshes, inf when only one is empty.
+    """
+    if not len(a) or not len(b):
+        return 0.0 if len(a) == len(b) else np.inf
+    rng = np.random.default_rng(seed)
+    return max(SurfaceIndex(b).max_distance(sample_surface(a, samples, rng)),
+               SurfaceIndex(a).max_distance(sample_surface(b, samples, rng)))
+
+
+def _properties(step: Path) -> dict:
+    from build123d import import_step
+    shape = import_step(str(step))
+    box = shape.bounding_box()
+    return {"shape": shape, "volume": shape.volume, "area": shape.area,
+            "box": np.array([tuple(box.min), tuple(box.max)])}
+
+
+def compare_part(name: str, rebuilt: Path, reference: Path, samples: int = SAMPLES, tolerances: dict = None) -> dict:
+    """
+    Compare one exported part with its committed files.
+
+    Args:
+        name: Export name, the file stem
+        rebuilt: Directory with the fresh <name>.step/.stl
+        reference: Directory with the committed ones
+        samples: Surface samples per mesh for the Hausdorff distance
+        tolerances: Overrides for "property", "box" and "hausdorff"
+
+    Returns:
+        Dict with part, ok, the measured differences and failures, a list
+        of what is out of tolerance
+    """
+    tolerances = {"property": PROPERTY_TOLERANCE, "box": BOX_TOLERANCE, "hausdorff": HAUSDORFF_TOLERANCE,
+                  **(tolerances or {})}
+    result = {"part": name, "ok": True, "skipped": False, "failures": []}
+    reference_step, reference_stl = reference / f"{name}.step", reference / f"{name}.stl"
+    if not reference_step.exists() and not reference_stl.exists():
+        result["skipped"] = True
+        return result
+
+    new = _properties(rebuilt / f"{name}.step")
+    if reference_step.exists():
+        old = _properties(reference_step)
+        for key in ("volume", "area"):
+            difference = abs(new[key] - old[key]) / max(abs(old[key]), 1e-12)
+            result[key] = difference
+            if difference > tolerances["property"]:
+                result["failures"].append(f"{key} {old[key]:.3f} -> {new[key]:.3f}")
+        result["box"] = float(np.abs(new["box"] - old["box"]).max())
+        if result["box"] > tolerances["box"]:
+            result["failures"].append(f"bounding box moved {result['box']:.3f} mm")
+
+    if reference_stl.exists():
+        new_mesh, old_mesh = IndexedMesh.from_stl(rebuilt / f"{name}.stl"), IndexedMesh.from_stl(reference_stl)
+    else:
+        # Same tessellation on both sides, so only the geometry can differ
+        new_mesh, old_mesh = IndexedMesh.from_part(new["shape"]), IndexedMesh.from_part(old["shape"])
+    # Nothing to measure against, e.g. a STEP of an STL-based part that
+    # imports as a compound without faces
+    empty = [f"{side} has no faces" for side, mesh in (("reference", old_mesh), ("rebuilt part", new_mesh))
+             if not len(mesh)]
+    if empty:
+        result["failures"].extend(empty)
+        result["ok"] = False
+        return result
+    result["hausdorff"] = hausdorff(new_mesh, old_mesh, samples)
+    if result["hausdorff"] > tolerances["hausdorff"]:
+        result["failures"].append(f"surfaces {result['hausdorff']:.3f} mm apart")
+    result["ok"] = not result["failures"]
+    return result
+
+
+def _check_model(script: str, samples: int, tolerances: dict) -> dict:
+    # Worker entry point: rebuild one model and compare each exported part
+    from _common_parts import brep_cache, export_cache
+    from _common_parts.model_runner import run_model
+
+    brep_cache.ENABLED = export_cache.ENABLED = False
+    script = Path(script)
+    start = time.perf_counter()
+    result = {"model": model_name(script), "ok": True, "parts": [], "error": None}
+    try:
+        with tempfile.TemporaryDirectory() as output:
+            with contextlib.redirect_stdout(io.StringIO()):
+                files = run_model(script, Path(output))
+            for step in sorted(p for p in files if p.suffix == ".step"):
+                result["parts"].append(compare_part(step.stem, step.parent, script.parent, samples, tolerances))
+    except Exception:
+        result["error"] = traceback.format_exc().strip().splitlines()[-1]
+    result["ok"] = result["error"] is None and all(p["ok"] for p in result["parts"])
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def check(scripts: list, jobs: int = None, samples: int = SAMPLES, tolerances: dict = None) -> list:
+    """
+    Rebuild and compare models across worker processes.
+
+    Returns:
+        One result per model with model, ok, error, seconds and parts,
+        see compare_part()
+    """
+    results = []
+    with ProcessPoolExecutor(max_workers=min(jobs or os.cpu_count(), len(scripts)),
+                             mp_context=pool_context(),
+                             max_tasks_per_child=1) as pool:
+        futures = [pool.submit(_check_model, str(s), samples, tolerances) for s in scripts]
+        for future in as_completed(futures):
+            result = future.result()
+            status = "ok" if result["ok"] else "FAILED"
+            print(f"[{len(results) + 1}/{len(scripts)}] {result['model']}: {status} ({result['seconds']:.2f}s)")
+            results.append(result)
+    return sorted(results, key=lambda r: r["model"])
+
+
+def print_report(results: list):
+    rows = []
+    for model in results:
+        if model["error"]:
+            rows.append((model["model"], "", "ERROR", "", "", "", "", model["error"]))
+        for part in model["parts"]:
+            if part["skipped"]:
+                rows.append((model["model"], part["part"], "skip", "", "", "", "", "no committed .step/.stl"))
+                continue
+            rows.append((
+                model["model"], part["part"], "pass" if part["ok"] else "FAIL",
+                f"{part['volume']:.2e}" if "volume" in part else "-",
+                f"{part['area']:.2e}" if "area" in part else "-",
+                f"{part['box']:.4f}" if "box" in part else "-",
+                f"{part['hausdorff']:.4f}" if "hausdorff" in part else "-",
+                "; ".join(part["failures"])))
+    headers = ("model", "part", "result", "volume", "area", "box mm", "hausdorff mm", "")
+    widths = [max([len(h)] + [len(r[i]) for r in rows]) for i, h in enumerate(headers)]
+    print()
+    print("  ".join(h.ljust(w) for h, w in zip(headers, widths)).rstrip())
+    print("  ".join("-" * w for w in widths[:-1]))
+    for row in rows:
+        print("  ".join(cell.ljust(w) for cell, w in zip(row, widths)).rstrip())
+    failed = sum(r[2] in ("FAIL", "ERROR") for r in rows)
+    checked = sum(r[2] != "skip" for r in rows)
+    print(f"\n{checked - failed}/{checked} parts match their committed files")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare rebuilt models with their committed STEP/STL files.")
+    parser.add_argument("models", nargs="*",
+                        help="Only models whose name contains one of these (default: every model)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--samples", type=int, default=SAMPLES,
+                        help=f"Random surface points per mesh (default: {SAMPLES})")
+    parser.add_argument("--tolerance", type=float, default=HAUSDORFF_TOLERANCE,
+                        help=f"Hausdorff distance in mm (default: {HAUSDORFF_TOLERANCE})")
+    parser.add_argument("--property-tolerance", type=float, default=PROPERTY_TOLERANCE,
+                        help=f"Relative volume/area difference (default: {PROPERTY_TOLERANCE})")
+    args = parser.parse_args(argv)
+
+    scripts = [s for s in find_models() if not args.models or any(m in model_name(s) for m in args.models)]
+    if not scripts:
+        parser.error(f"No model matches {', '.join(args.models)}")
+    start = time.perf_counter()
+    results = check(scripts, args.jobs, args.samples,
+                    {"hausdorff": args.tolerance, "property": args.property_tolerance})
+    print_report(results)
+    print(f"Checked {len(scripts)} models in {time.perf_counter() - start:.2f}s")
+    return 0 if all(r["ok"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,25 @@
 from build123d import *
 from ocp_vscode import *
 from bd_warehouse.thread import MetricTrapezoidalThread
+from _common_parts.brep_cache import disk_cached_part
 
+# Models star-import this module, keep the helpers it imports out of them
+__all__ = ["get_screw_base"]
 
+
+@disk_cached_part
+def get_thread(diameter=8, pitch=1.5, length=20):
+    """Metric trapezoidal external thread, cached on disk as it takes seconds to build."""
+    # Metric trapezoidal thread (size format: "DiameterxPitch")
+    size = f"{diameter}x{pitch}"
+    return MetricTrapezoidalThread(
+        size=size,
+        length=length,
+        external=True
+    )
+
+
+@disk_cached_part
 def get_screw_base(diameter=8, pitch=1.5, length=20, head_diameter=None, head_height=None):
     """Make a simple flathead screw with metric trapezoidal thread."""
 
@@ -11,13 +28,7 @@ def get_screw_base(diameter=8, pitch=1.5, length=20, head_diameter=None, head_he
     if head_height is None:
         head_height = diameter * 0.6
 
-    # Metric trapezoidal thread (size format: "DiameterxPitch")
-    size = f"{diameter}x{pitch}"
-    thread = MetricTrapezoidalThread(
-        size=size,
-        length=length,
-        external=True
-    )
+    thread = get_thread(diameter, pitch, length)
 
     # Flat head
     head = Cylinder(radius=head_diameter/2, height=head_height)
@@ -0,0 +1,205 @@
+"""
+Build every variant of a model over a grid or list of parameter values.
+
+    python -m _common_parts.sweep guitar_saddle/guitar_saddle.py \\
+        --grid base_height=6,7 --grid cutout_height=1,2,3
+    python -m _common_parts.sweep guitar_saddle/guitar_saddle.py --variants saddles.json
+
+Each variant overrides module-level constants (see model_runner.compile_model)
+and exports as <PART_NAME>_<name>-<value>_..., e.g.
+guitar_saddle_base_height-6_cutout_height-2. A variant whose script and
+parameters are unchanged since its last build is skipped.
+"""
+import argparse
+import ast
+import contextlib
+import hashlib
+import itertools
+import json
+import os
+import re
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from _common_parts.build_all import pool_context, print_table
+from _common_parts.build_server import parse_overrides
+from _common_parts.model_runner import REPO_ROOT, compile_model, run_model
+
+DEFAULT_OUTPUT = REPO_ROOT / "build" / "sweeps"
+
+
+def parse_grid(pairs: list) -> dict:
+    """Turn ["base_height=6,7", "name=a,b"] into {"base_height": [6, 7], "name": ["a", "b"]}."""
+    grid = {}
+    for pair in pairs:
+        name, _, values = pair.partition("=")
+        try:
+            parsed = ast.literal_eval(f"[{values}]")
+        except (ValueError, SyntaxError):
+            parsed = [v.strip() for v in values.split(",")]
+        grid[name.strip()] = parsed
+    return grid
+
+
+def expand(grid: dict = None, variants: list = None, fixed: dict = None) -> list:
+    """
+    Combine explicit variants with every combination of the grid values.
+
+    Args:
+        grid: Constant name to list of values, all combinations are built
+        variants: Override dicts, each is combined with every grid point
+        fixed: Overrides shared by every variant
+
+    Returns:
+        One override dict per variant
+    """
+    grid = grid or {}
+    points = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+    return [{**(fixed or {}), **variant, **point} for variant in (variants or [{}]) for point in points]
+
+
+def _slug(value) -> str:
+    text = value if isinstance(value, str) else repr(value)
+    return re.sub(r"[^A-Za-z0-9.]+", "-", text).strip("-")
+
+
+def variant_name(part_name: str, overrides: dict) -> str:
+    """Export name for a variant, the part name plus each name-value pair."""
+    return "_".join([part_name] + [f"{name}-{_slug(value)}" for name, value in overrides.items()])
+
+
+def _part_name(script: Path) -> str:
+    # PART_NAME as assigned in the script, the folder name if it has none
+    tree = ast.parse(script.read_text(encoding="utf-8"))
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name) and node.targets[0].id == "PART_NAME"):
+            return ast.literal_eval(node.value)
+    return script.stem
+
+
+def variant_key(script: Path, overrides: dict) -> str:
+    """Hash of the script source and the variant's overrides."""
+    return hashlib.sha256(json.dumps({
+        "script": hashlib.sha256(script.read_bytes()).hexdigest(),
+        "overrides": {name: repr(value) for name, value in overrides.items()},
+    }, sort_keys=True).encode()).hexdigest()
+
+
+def _manifest(output: Path, name: str) -> Path:
+    return output / f"{name}.sweep.json"
+
+
+def _is_built(output: Path, name: str, key: str) -> bool:
+    path = _manifest(output, name)
+    if not path.exists():
+        return False
+    manifest = json.loads(path.read_text())
+    return manifest["key"] == key and all(Path(f).exists() for f in manifest["files"])
+
+
+def _build_variant(script: str, output: str, name: str, overrides: dict, key: str) -> dict:
+    # Worker entry point, one variant per call
+    output = Path(output)
+    log_path = output / f"{name}.log"
+    start = time.perf_counter()
+    result = {"model": name, "ok": True, "files": [], "error": None}
+    with open(log_path, "w", encoding="utf-8") as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            files = run_model(Path(script), output, {**overrides, "PART_NAME": name})
+            result["files"] = [str(p) for p in files]
+        except BaseException:
+            traceback.print_exc()
+            result["ok"] = False
+            result["error"] = traceback.format_exc().strip().splitlines()[-1]
+    result["seconds"] = time.perf_counter() - start
+    result["log"] = str(log_path)
+    if result["ok"]:
+        _manifest(output, name).write_text(json.dumps(
+            {"key": key, "overrides": {k: repr(v) for k, v in overrides.items()}, "files": result["files"]},
+            indent=2))
+    return result
+
+
+def sweep(script: Path, variants: list, output: Path = None, jobs: int = None, force: bool = False) -> list:
+    """
+    Build each variant of a model script across worker processes.
+
+    Args:
+        script: Model script
+        variants: One override dict per variant, see expand()
+        output: Directory for every variant's files, defaults to build/sweeps/<model>/
+        jobs: Worker count, defaults to all cores
+        force: Rebuild variants that are already up to date
+
+    Returns:
+        One result dict per built variant, like build_all()
+
+    Raises:
+        ValueError: An override is not a module-level constant of the script
+    """
+    script = Path(script).resolve()
+    output = Path(output or DEFAULT_OUTPUT / script.parent.name).resolve()
+    output.mkdir(parents=True, exist_ok=True)
+    # Fail before starting workers if a name is not a constant of the script
+    compile_model(script, {name: value for variant in variants for name, value in variant.items()})
+
+    part_name = _part_name(script)
+    jobs_to_run = []
+    for overrides in variants:
+        name = variant_name(part_name, overrides)
+        key = variant_key(script, overrides)
+        if not force and _is_built(output, name, key):
+            print(f"Unchanged: {name} (cached)")
+        else:
+            jobs_to_run.append((name, overrides, key))
+
+    results = []
+    if not jobs_to_run:
+        return results
+    with ProcessPoolExecutor(max_workers=min(jobs or os.cpu_count(), len(jobs_to_run)),
+                             mp_context=pool_context(),
+                             max_tasks_per_child=1) as pool:
+        futures = [pool.submit(_build_variant, str(script), str(output), name, overrides, key)
+                   for name, overrides, key in jobs_to_run]
+        for future in as_completed(futures):
+            result = future.result()
+            status = "ok" if result["ok"] else "FAILED"
+            print(f"[{len(results) + 1}/{len(jobs_to_run)}] {result['model']}: {status} ({result['seconds']:.2f}s)")
+            results.append(result)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build parameter variants of a model script.")
+    parser.add_argument("script", type=Path, help="Model script")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2,...",
+                        help="Values for a module-level constant, every combination is built")
+    parser.add_argument("--variants", type=Path, default=None,
+                        help="JSON file with a list of override objects")
+    parser.add_argument("--set", dest="overrides", action="append", default=[],
+                        metavar="NAME=VALUE", help="Override shared by every variant")
+    parser.add_argument("-o", "--output", type=Path, default=None,
+                        help="Output directory (default: build/sweeps/<model dir>/)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Worker processes (default: all cores)")
+    parser.add_argument("-f", "--force", action="store_true", help="Rebuild up-to-date variants")
+    args = parser.parse_args(argv)
+
+    variants = json.loads(args.variants.read_text()) if args.variants else None
+    variants = expand(parse_grid(args.grid), variants, parse_overrides(args.overrides))
+    try:
+        results = sweep(args.script, variants, args.output, args.jobs, args.force)
+    except ValueError as error:
+        parser.error(str(error))
+    if results:
+        print_table(results)
+    return 0 if all(r["ok"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,373 @@
+"""
+G-code toolpaths as NumPy arrays, for travel and stringing analysis.
+
+    python -m _common_parts.toolpath curtain-blocker/curtain_holder_set.gcode --layers
+    python -m _common_parts.toolpath a.gcode b.gcode      # compare arrangements
+
+The file is tokenized and its numbers parsed as whole byte arrays, so
+Python never loops over individual lines, moves or digits. That is about
+20-25 MB/s on the bundled files (a 3 MB file in 0.12 s on one core), not
+hundreds of MB/s: a single NumPy pass over the buffer runs at about 700
+MB/s there, and tokenizing, parsing and the running positions take a few
+dozen such passes.
+
+Travels are checked against a per-layer occupancy grid of the printed
+lines: a travel that leaves every printed island crosses open air, where
+strings form unless the filament is retracted.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+_AXES = "XYZE"
+_WORDS = b"XYZEF"
+
+# Byte class lookup tables, indexing one is much faster than np.isin on a whole file
+_IS_DELIMITER = np.zeros(256, dtype=bool)
+_IS_DELIMITER[list(b" \t\r\n;")] = True
+_IS_WORD = np.zeros(256, dtype=bool)
+_IS_WORD[list(_WORDS)] = True
+
+# Statements the toolpath depends on, matched at the start of a line and
+# followed by a delimiter
+_MOVE, _G92, _G90, _G91, _M82, _M83, _G28 = range(7)
+_COMMANDS = {b"G0": _MOVE, b"G1": _MOVE, b"G92": _G92, b"G90": _G90, b"G91": _G91,
+             b"M82": _M82, b"M83": _M83, b"G28": _G28}
+
+# Layer change comments, see _layer_numbers
+_LAYER_MARKS = (b";LAYER:", b";LAYER_CHANGE")
+
+_POWERS = 10.0 ** np.arange(19)
+
+# Bytes looked at after each word letter, longer numbers are cut off
+_NUMBER_WIDTH = 12
+
+
+def _parse_numbers(window: np.ndarray):
+    # Decimal numbers starting each column of bytes, all columns at once.
+    # Every digit is weighted by the power of ten of the digits after it;
+    # at most _NUMBER_WIDTH digits stay exact in float64. Dividing by the
+    # power of ten of the decimals then rounds like float() does.
+    inside = np.logical_and.accumulate(~_IS_DELIMITER[window], axis=0)
+    value = window - np.uint8(ord("0"))
+    digit = inside & (value < 10)
+    count = np.cumsum(digit, axis=0, dtype=np.int8)
+    mantissa = (np.where(digit, value, 0) * _POWERS[count[-1] - count]).sum(axis=0)
+    dot = inside & (window == ord("."))
+    decimals = np.where(dot.any(axis=0), count[-1] - np.where(dot, count, 0).max(axis=0), 0)
+    sign = np.where(window[0] == ord("-"), -1.0, 1.0)
+    return sign * mantissa / _POWERS[decimals], digit.any(axis=0)
+
+
+def _layer_numbers(data, line_starts: np.ndarray) -> np.ndarray:
+    # Layer of each ;LAYER:<n> (Cura) or ;LAYER_CHANGE (PrusaSlicer, Orca)
+    # line: <n> sets it, a change counts up from the last one, -1 before any
+    change = data[line_starts + len(b";LAYER")] == ord("_")
+    numbers, _ = _parse_numbers(data[np.arange(len(b";LAYER:"), len(b";LAYER:") + _NUMBER_WIDTH)[:, None]
+                                     + line_starts])
+    values = np.where(change, 1.0, numbers)
+    layer = _positions(values, ~change, change)
+    layer -= ~np.logical_or.accumulate(~change)
+    return layer.astype(np.int32)
+
+
+def _forward_fill(values: np.ndarray, present: np.ndarray, initial):
+    # Repeat the last present value over the following rows
+    index = np.where(present, np.arange(len(values)), -1)
+    np.maximum.accumulate(index, out=index)
+    return np.where(index >= 0, values[np.maximum(index, 0)], initial)
+
+
+def _positions(values: np.ndarray, is_set: np.ndarray, relative: np.ndarray) -> np.ndarray:
+    # Coordinate after every row: rows in is_set assign the value, relative
+    # rows add it. A running sum restarted at every assignment.
+    values = np.nan_to_num(values)
+    delta = np.where(relative & ~is_set, values, 0.0)
+    total = np.cumsum(delta)
+    index = np.where(is_set, np.arange(len(values)), -1)
+    np.maximum.accumulate(index, out=index)
+    last = np.maximum(index, 0)
+    base = np.where(index >= 0, values[last] - total[last], 0.0)
+    return base + total
+
+
+class Toolpath:
+    """
+    Straight G0/G1 moves of a print as parallel arrays, one entry per move.
+
+        path = Toolpath.from_gcode("curtain_holder_set.gcode")
+        path.length[path.is_travel].sum()      # travel distance in mm
+        path.layer_report()                    # per-layer travel and retraction numbers
+
+    Attributes:
+        start, end: (n, 3) XYZ before and after each move in mm
+        extrusion: Filament pushed (negative for retractions) in mm
+        feedrate: Commanded speed in mm/min
+        layer: Slicer layer number, -1 before the first layer
+    """
+
+    def __init__(self, start, end, extrusion, feedrate, layer):
+        self.start = start
+        self.end = end
+        self.extrusion = extrusion
+        self.feedrate = feedrate
+        self.layer = layer
+
+    @classmethod
+    def from_gcode(cls, path):
+        """Parse a G-code file into a Toolpath."""
+        with open(path, "rb") as file:
+            raw = file.read()
+        # Trailing delimiters so lookups past the last line stay in bounds
+        data = np.frombuffer(raw + b"\n" * (_NUMBER_WIDTH + 1), dtype=np.uint8)
+        size = len(raw)
+
+        line_starts = np.concatenate([[0], np.flatnonzero(data[:size] == ord("\n")) + 1])
+        line_starts = line_starts[line_starts < size]
+        head = [data[line_starts + i] for i in range(max(len(mark) for mark in _LAYER_MARKS))]
+
+        def starts_with(prefix: bytes) -> np.ndarray:
+            match = np.ones(len(line_starts), dtype=bool)
+            for i, byte in enumerate(prefix):
+                match &= head[i] == byte
+            return match
+
+        kind = np.full(len(line_starts), -1, dtype=np.int8)
+        for command, code in _COMMANDS.items():
+            kind[starts_with(command) & _IS_DELIMITER[head[len(command)]]] = code
+        # Not ;LAYER_COUNT or ;LAYER_HEIGHT
+        is_layer = starts_with(_LAYER_MARKS[0]) | starts_with(_LAYER_MARKS[1])
+
+        # Every line the toolpath needs becomes a row, in file order
+        rows = np.flatnonzero((kind >= 0) | is_layer)
+        row_of_line = np.full(len(line_starts), -1)
+        row_of_line[rows] = np.arange(len(rows))
+        kind = kind[rows]
+        count = len(rows)
+
+        # Words: an axis letter after a blank, on a move or G92 line, before any comment
+        blanks = np.flatnonzero((data[:size] == ord(" ")) | (data[:size] == ord("\t"))) + 1
+        letters = blanks[_IS_WORD[data[blanks]]]
+        line = np.searchsorted(line_starts, letters, side="right") - 1
+        # First semicolon from the start of the line, the padding newline if none
+        semicolons = np.append(np.flatnonzero(data[:size] == ord(";")), len(data))
+        comment = semicolons[np.searchsorted(semicolons, line_starts[line])]
+        row = row_of_line[line]
+        keep = (row >= 0) & (letters < comment)
+        keep[keep] = np.isin(kind[row[keep]], (_MOVE, _G92))
+        letters, row = letters[keep], row[keep]
+
+        numbers, valid = _parse_numbers(data[np.arange(1, _NUMBER_WIDTH + 1)[:, None] + letters])
+        # A letter without a number (G28 X) carries no value
+        letters, row, numbers = letters[valid], row[valid], numbers[valid]
+
+        values = {}
+        for word in _WORDS:
+            values[chr(word)] = column = np.full(count, np.nan)
+            mine = data[letters] == word
+            column[row[mine]] = numbers[mine]
+        feedrate = values.pop("F")
+
+        is_move = kind == _MOVE
+        is_g92 = kind == _G92
+        is_home = kind == _G28
+        # Bare G92 zeroes every axis
+        bare = is_g92 & (np.bincount(row, minlength=count) == 0)
+        for axis in _AXES:
+            values[axis][bare] = 0.0
+        for axis in "XYZ":
+            values[axis][is_home] = 0.0
+
+        is_mode = np.isin(kind, (_G90, _G91))
+        relative_xyz = _forward_fill(kind == _G91, is_mode, False)
+        relative_e = _forward_fill(np.isin(kind, (_G91, _M83)), is_mode | np.isin(kind, (_M82, _M83)), False)
+
+        position = []
+        for axis in _AXES:
+            present = ~np.isnan(values[axis])
+            relative = relative_e if axis == "E" else relative_xyz
+            is_set = present & (is_g92 | is_home | (is_move & ~relative))
+            position.append(_positions(values[axis], is_set, relative & is_move & present))
+        position = np.stack(position, axis=1)
+        previous = np.vstack([np.zeros((1, 4)), position[:-1]])
+
+        is_layer = is_layer[rows]
+        layer_numbers = np.zeros(count, dtype=np.int32)
+        layer_numbers[is_layer] = _layer_numbers(data, line_starts[rows[is_layer]])
+        layer = _forward_fill(layer_numbers, is_layer, -1).astype(np.int32)
+        feedrate = _forward_fill(feedrate, ~np.isnan(feedrate), np.nan)
+
+        return cls(
+            start=np.ascontiguousarray(previous[is_move, :3]),
+            end=np.ascontiguousarray(position[is_move, :3]),
+            extrusion=position[is_move, 3] - previous[is_move, 3],
+            feedrate=feedrate[is_move],
+            layer=layer[is_move])
+
+    def __len__(self):
+        return len(self.extrusion)
+
+    @property
+    def length(self) -> np.ndarray:
+        """XY distance of every move in mm."""
+        delta = self.end[:, :2] - self.start[:, :2]
+        return np.hypot(delta[:, 0], delta[:, 1])
+
+    @property
+    def is_travel(self) -> np.ndarray:
+        return (self.extrusion <= 0) & (self.length > 0)
+
+    @property
+    def is_extrusion(self) -> np.ndarray:
+        return (self.extrusion > 0) & (self.length > 0)
+
+    @property
+    def is_retraction(self) -> np.ndarray:
+        return self.extrusion < 0
+
+    def is_retracted(self) -> np.ndarray:
+        """Per move, whether the last filament move before it was a retraction."""
+        moved = self.extrusion != 0
+        last = _forward_fill(np.arange(len(self)), moved, -1)
+        # Shift by one, a move's own extrusion does not count for itself
+        last = np.concatenate([[-1], last[:-1]])
+        return (last >= 0) & (self.extrusion[np.maximum(last, 0)] < 0)
+
+    def open_travel(self, cell: float = 0.5) -> np.ndarray:
+        """
+        Length in mm each travel spends over open space on its layer.
+
+        Printed lines are rasterized per layer onto a grid of `cell` mm,
+        empty cells connected to the grid border are open space, so the
+        sparse infill inside a closed perimeter still counts as part.
+        """
+        result = np.zeros(len(self))
+        printing = self.is_extrusion & (self.layer >= 0)
+        travel = self.is_travel & (self.layer >= 0)
+        if not printing.any() or not travel.any():
+            return result
+
+        layers, layer_index = np.unique(self.layer[printing | travel], return_inverse=True)
+        index = np.full(len(self), -1)
+        index[printing | travel] = layer_index
+
+        lines = np.flatnonzero(printing)
+        low = np.minimum(self.start[lines, :2], self.end[lines, :2]).min(axis=0) - 2 * cell
+        high = np.maximum(self.start[lines, :2], self.end[lines, :2]).max(axis=0) + 2 * cell
+        shape = (len(layers), *(np.ceil((high - low) / cell).astype(int) + 1))
+
+        def samples(moves):
+            # Points every half cell along each move, plus the move each belongs to
+            count = np.maximum(np.ceil(self.length[moves] / (cell / 2)).astype(int), 1) + 1
+            owner = np.repeat(moves, count)
+            offset = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+            t = (offset / np.repeat(count - 1, count))[:, None]
+            xy = self.start[owner, :2] * (1 - t) + self.end[owner, :2] * t
+            cells = np.clip(((xy - low) / cell).astype(int), 0, np.array(shape[1:]) - 1)
+            return owner, index[owner], cells[:, 0], cells[:, 1], offset, count
+
+        occupied = np.zeros(shape, dtype=bool)
+        _, layer_of, x, y, _, _ = samples(lines)
+        occupied[layer_of, x, y] = True
+
+        # Flood fill from the border through empty cells, 4-connected so it
+        # can't slip through diagonal perimeter lines
+        outside = np.zeros(shape, dtype=bool)
+        outside[:, [0, -1], :] = True
+        outside[:, :, [0, -1]] = True
+        outside &= ~occupied
+        while True:
+            grown = outside.copy()
+            grown[:, 1:, :] |= outside[:, :-1, :]
+            grown[:, :-1, :] |= outside[:, 1:, :]
+            grown[:, :, 1:] |= outside[:, :, :-1]
+            grown[:, :, :-1] |= outside[:, :, 1:]
+            grown &= ~occupied
+            if np.array_equal(grown, outside):
+                break
+            outside = grown
+
+        owner, layer_of, x, y, offset, count = samples(np.flatnonzero(travel))
+        # Endpoints sit on printed lines, only the way between them counts
+        inner = (offset > 0) & (offset < np.repeat(count, count) - 1)
+        over_air = outside[layer_of, x, y] & inner
+        step = self.length[owner] / (np.repeat(count, count) - 1)
+        np.add.at(result, owner[over_air], step[over_air])
+        return result
+
+    def layer_report(self, cell: float = 0.5) -> list:
+        """
+        Travel and retraction numbers per layer, moves before the first
+        layer (start G-code, purge lines) in a layer -1 row if there are any.
+
+        Returns:
+            One dict per layer with layer, travels, travel_mm, open_travels
+            (travels crossing open space), open_travel_mm, unretracted_open
+            (open travels without a retraction, the stringing risk),
+            retractions and retract_mm
+        """
+        length = self.length
+        travel = self.is_travel
+        open_mm = self.open_travel(cell)
+        crossing = open_mm > 0
+        unretracted = crossing & ~self.is_retracted()
+        retraction = self.is_retraction
+
+        layers = np.unique(self.layer)
+        count = len(layers)
+        index = np.searchsorted(layers, self.layer)
+
+        def per_layer(mask, weights=None):
+            return np.bincount(index[mask], weights=None if weights is None else weights[mask],
+                               minlength=count)
+
+        columns = {
+            "travels": per_layer(travel),
+            "travel_mm": per_layer(travel, length),
+            "open_travels": per_layer(crossing),
+            "open_travel_mm": per_layer(crossing, open_mm),
+            "unretracted_open": per_layer(unretracted),
+            "retractions": per_layer(retraction),
+            "retract_mm": per_layer(retraction, -self.extrusion),
+        }
+        return [{"layer": int(layer), **{name: values[i].item() for name, values in columns.items()}}
+                for i, layer in enumerate(layers)]
+
+
+def summarize(report: list) -> dict:
+    """Totals over a layer_report()."""
+    keys = [k for k in (report[0] if report else {}) if k != "layer"]
+    return {key: sum(layer[key] for layer in report) for key in keys}
+
+
+def _print_row(label: str, row: dict, width: int):
+    print(f"{label:<{width}}  {row['travels']:>7}  {row['travel_mm']:>9.0f}  {row['open_travels']:>6}  "
+          f"{row['open_travel_mm']:>8.0f}  {row['unretracted_open']:>10}  {row['retractions']:>8}  "
+          f"{row['retract_mm']:>8.1f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Travel and retraction analysis of G-code toolpaths.")
+    parser.add_argument("files", nargs="+", type=Path, help="G-code files, compared side by side")
+    parser.add_argument("--cell", type=float, default=0.5, help="Occupancy grid size in mm (default: 0.5)")
+    parser.add_argument("--layers", action="store_true", help="Also print per-layer rows")
+    args = parser.parse_args(argv)
+
+    reports = {str(f): Toolpath.from_gcode(f).layer_report(args.cell) for f in args.files}
+    width = max([len(f) for f in reports] + [5])
+    header = (f"{'':<{width}}  {'Travels':>7}  {'Travel mm':>9}  {'Open':>6}  {'Open mm':>8}  "
+              f"{'Unretract.':>10}  {'Retracts':>8}  {'Retr. mm':>8}")
+    print(header)
+    print("-" * len(header))
+    for name, report in reports.items():
+        if args.layers:
+            for layer in report:
+                _print_row(f"  layer {layer['layer']}", layer, width)
+        _print_row(name, summarize(report), width)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""
+Rebuild models as their files are saved.
+
+    python -m _common_parts.watch                  # every model
+    python -m _common_parts.watch curtain_blocker  # models whose name contains this
+
+Polls the model directories and _common_parts for changed .py files. A
+change rebuilds the models that are the changed file or import it, also
+indirectly: saving curtain_blocker/blocker.py rebuilds the blocker and
+curtain_blocker/holder.py, which imports get_slider from it. Saving a
+_common_parts module rebuilds every model that uses it.
+
+Builds run in a worker process that has build123d and OCP imported before
+the edit arrives, so a rebuild costs the geometry and nothing else. Saves
+in quick succession are collected into one rebuild, and a save during a
+build cancels it and starts over with the new code. Exports whose geometry
+fingerprint did not change are restored from the export cache instead of
+being written again (see export_cache.py).
+"""
+import argparse
+import ast
+import importlib
+import json
+import queue
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+COMMON = REPO_ROOT / "_common_parts"
+DEFAULT_OUTPUT = REPO_ROOT / "build"
+
+# Seconds without further saves before a rebuild starts
+DEBOUNCE = 0.3
+# Seconds between scans of the files
+INTERVAL = 0.2
+
+
+def python_files(root: Path = REPO_ROOT) -> list:
+    """Every .py file in the top-level model directories and _common_parts."""
+    files = []
+    for directory in sorted(root.iterdir()):
+        if directory.is_dir() and (directory == COMMON or not directory.name.startswith(("_", "."))):
+            files.extend(sorted(directory.glob("*.py")))
+    return files
+
+
+def _mtimes(files: list) -> dict:
+    times = {}
+    for path in files:
+        try:
+            times[path] = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            pass
+    return times
+
+
+def _module_file(module: str, script: Path):
+    # Repo file of an absolute import, None for libraries. Scripts put the
+    # repo root on sys.path and Python puts their own directory first
+    parts = module.split(".")
+    for base in (script.parent, REPO_ROOT):
+        for candidate in (base.joinpath(*parts).with_suffix(".py"), base.joinpath(*parts, "__init__.py")):
+            if candidate.exists():
+                return candidate
+    return None
+
+
+def imports(script: Path) -> set:
+    """
+    Repo files a script imports, from its import statements.
+
+    Raises:
+        SyntaxError: The script does not parse
+    """
+    found = set()
+    for node in ast.walk(ast.parse(script.read_text(encoding="utf-8"), filename=str(script))):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            # from _common_parts import draft imports a module, from x import name doesn't
+            names = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+        else:
+            continue
+        for name in names:
+            path = _module_file(name, script)
+            if path is not None and path != script:
+                found.add(path)
+    return found
+
+
+def dependents(graph: dict, changed: set) -> set:
+    """The changed files and every file that imports one of them, directly or not."""
+    importers = {}
+    for path, imported in graph.items():
+        for dependency in imported:
+            importers.setdefault(dependency, set()).add(path)
+    result, todo = set(), list(changed)
+    while todo:
+        path = todo.pop()
+        if path not in result:
+            result.add(path)
+            todo.extend(importers.get(path, ()))
+    return result
+
+
+class _Worker:
+    # A build process that imports the libraries right away and then waits
+    # on stdin for one list of scripts, so it is warm when the edit comes
+
+    def __init__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "_common_parts.watch", "--worker"],
+            cwd=REPO_ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        self.results = queue.Queue()
+        self.scripts = []
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        for line in self.process.stdout:
+            if line.startswith("{"):
+                self.results.put(json.loads(line))
+
+    def submit(self, scripts: list, output: Path):
+        self.scripts = list(scripts)
+        self.process.stdin.write(json.dumps({"scripts": [str(s) for s in scripts], "output": str(output)}) + "\n")
+        self.process.stdin.close()
+
+    def finished(self) -> list:
+        done = []
+        while not self.results.empty():
+            result = self.results.get()
+            self.scripts.remove(Path(result["script"]))
+            done.append(result)
+        return done
+
+    def busy(self) -> bool:
+        return bool(self.scripts) and self.process.poll() is None
+
+    def kill(self):
+        self.process.kill()
+        self.process.wait()
+
+
+def _work():
+    # Worker process side of _Worker
+    from _common_parts.build_all import PRELOAD, _build_one
+    for module in PRELOAD:
+        importlib.import_module(module)
+    from _common_parts.model_runner import forget_model_modules
+
+    job = json.loads(sys.stdin.readline())
+    for script in job["scripts"]:
+        forget_model_modules()
+        result = _build_one(script, job["output"])
+        result["script"] = script
+        print(json.dumps(result), flush=True)
+
+
+def _print_result(result: dict):
+    status = "ok" if result["ok"] else f"FAILED: {result['error']} (see {result['log']})"
+    print(f"[{time.strftime('%H:%M:%S')}] {result['model']}: {status} ({result['seconds']:.2f}s)")
+
+
+def watch(models: list = None, output: Path = DEFAULT_OUTPUT, debounce: float = DEBOUNCE,
+          interval: float = INTERVAL):
+    """
+    Rebuild models whenever they or a file they import changes, until interrupted.
+
+    Args:
+        models: Only models whose name contains one of these, defaults to every model
+        output: Output tree, like build_all
+        debounce: Seconds to wait for more saves before building
+        interval: Seconds between scans
+    """
+    from _common_parts.model_runner import find_models, model_name
+
+    output = Path(output).resolve()
+    files = python_files()
+    times = _mtimes(files)
+    graph = {}
+    for path in files:
+        try:
+            graph[path] = imports(path)
+        except SyntaxError:
+            graph[path] = set()
+
+    standby = _Worker()
+    running = None
+    pending, last_change = set(), None
+    print(f"Watching {len(files)} files, Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(interval)
+            current = _mtimes(python_files())
+            changed = {p for p in current.keys() | times.keys() if current.get(p) != times.get(p)}
+            times = current
+            if changed:
+                for path in changed:
+                    if path not in current:
+                        graph.pop(path, None)
+                        continue
+                    try:
+                        graph[path] = imports(path)
+                    except SyntaxError:
+                        # Half-typed edit: keep the old edges, the build will report it
+                        graph.setdefault(path, set())
+                watched = [s.resolve() for s in find_models()
+                           if not models or any(m in model_name(s) for m in models)]
+                affected = dependents(graph, changed)
+                pending |= {s for s in watched if s in affected}
+                last_change = time.monotonic()
+                print(f"Changed: {', '.join(p.relative_to(REPO_ROOT).as_posix() for p in sorted(changed))}")
+                # The standby has the old _common_parts loaded
+                if any(COMMON in p.parents for p in changed):
+                    standby.kill()
+                    standby = _Worker()
+
+            if running:
+                for result in running.finished():
+                    _print_result(result)
+                if not running.busy():
+                    if running.scripts:
+                        print(f"Worker stopped before building {', '.join(model_name(s) for s in running.scripts)}")
+                    running = None
+
+            if pending and time.monotonic() - last_change >= debounce:
+                if running:
+                    print(f"Cancelled: {', '.join(model_name(s) for s in running.scripts)}")
+                    running.kill()
+                    pending |= set(running.scripts)
+                print(f"Building: {', '.join(model_name(s) for s in sorted(pending))}")
+                running, standby = standby, _Worker()
+                running.submit(sorted(pending), output)
+                pending = set()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for worker in (standby, running):
+            if worker:
+                worker.kill()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild models when their files change.")
+    parser.add_argument("models", nargs="*",
+                        help="Only models whose name contains one of these (default: every model)")
+    parser.add_argument("-o", "--output", type=Path, default=DEFAULT_OUTPUT,
+                        help="Output tree (default: build/)")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE,
+                        help=f"Seconds without saves before building (default: {DEBOUNCE})")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        _work()
+        return 0
+    watch(args.models, args.output, args.debounce)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,11 +17,18 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from _common_parts.screws import *  # noqa: E402
+from _common_parts import performance  # noqa: E402,F401
 from _common_parts.export import export_model  # noqa: E402
+from _common_parts.part_cache import cached_part  # noqa: E402
+from _common_parts.booleans import batch_boolean  # noqa: E402
+from _common_parts.model_graph import ModelGraph  # noqa: E402
 
 # Used to name the exported files
 PART_NAME = "ac_pir_detector_case"
 
+# Each part is built once and shared by show() and export
+model = ModelGraph(PART_NAME)
+
 # %%
 ASSEMBLED_VIEW = True
 ASSEMBLY_VIEW_WITH_OFFSET = False
@@ -115,6 +122,7 @@ def get_case_y_size(include_walls: bool):
 
 
 # Return Clip with hole, hole, and cutout for wall
+@cached_part
 def get_screw_and_slots(slot_height: float, override_screw_depth: float = FULL_SCREW_DEPTH):
     clip = Circle(SCREW_HOLE_DIAMETER / 2 + SCREW_SLOT_PADDING)
     clip = extrude(clip, slot_height)
@@ -130,6 +138,7 @@ def get_screw_and_slots(slot_height: float, override_screw_depth: float = FULL_S
 
 
 # Z positioned holder clip
+@cached_part
 def get_board_holder_clip():
     screw_depth = 5.7
     clip, hole, _ = get_screw_and_slots(
@@ -154,7 +163,7 @@ def get_all_holder_clips():
         (-x_diff / 2, y_diff / 2, 0))
     c4 = get_board_holder_clip().translate(
         (x_diff / 2, y_diff / 2, 0))
-    return c1 + c2 + c3 + c4
+    return batch_boolean(c1, fuse=[c2, c3, c4])
 
 
 def pir_hole():
@@ -289,6 +298,7 @@ def get_back_cover_screw_z_position():
 
 
 # This is the part where we devolve into nonsense :)
+@cached_part
 def get_painful_screwholder(is_cutout: bool = False):
     zpos = get_back_cover_screw_z_position()
     s1_slot, s1_hole, s1_wall_cutout = get_screw_and_slots(
@@ -371,6 +381,7 @@ def cover_foot_mount_screw_slots():
         cutout.translate((x_pos, y_pos2, z_pos_cutout))
 
 
+@model.part("front", prepare_export=lambda p: p.solids()[0])
 def front_cover():
     # Floor base
     fc = Rectangle(get_case_x_size(True), get_case_y_size(True))
@@ -378,14 +389,16 @@ def front_cover():
     fillet_z = fc.edges().filter_by(Axis.Z)
     fc = fillet(fillet_z, radius=CASE_FILLET_RADIUS)
     fc = fc.translate((get_case_x_pos_offset(True), 0, 0))
-    # Assemble related objects
-    return fc - (pir_hole() + tft_hole()) + \
-        get_all_holder_clips() + add_tft_padding() + \
-        get_half_y_walls() + get_x_front_cover_walls() + \
-        get_back_cover_screwholders_and_cutouts(False) + \
-        maybe_more_sane_case_screws(False)
+    # Assemble related objects, one multi-argument boolean per step
+    fc = batch_boolean(fc, cut=[pir_hole(), tft_hole()])
+    return batch_boolean(fc, fuse=[
+        get_all_holder_clips(), add_tft_padding(),
+        get_half_y_walls(), get_x_front_cover_walls(),
+        get_back_cover_screwholders_and_cutouts(False),
+        maybe_more_sane_case_screws(False)])
 
 
+@model.part("back")
 def back_cover():
     # Cutout one X wall for back cover only
     x_size = get_case_x_size(True) - WALL_THICKNESS
@@ -422,9 +435,11 @@ def back_cover():
     ah = extrude(ah, WALL_THICKNESS)
     ah = ah.translate((-50,12,WALL_THICKNESS + CASE_Z_SPACE) )
 
-    final_back_cover = bc + y_walls + x_wall - \
-        (get_back_cover_screwholders_and_cutouts(
-            True) + maybe_more_sane_case_screws(True) + cover_foot_mount_screw_slots())
+    final_back_cover = batch_boolean(
+        bc, fuse=[y_walls, x_wall],
+        cut=[get_back_cover_screwholders_and_cutouts(True),
+             maybe_more_sane_case_screws(True),
+             cover_foot_mount_screw_slots()])
     if ASSEMBLED_VIEW and ASSEMBLY_VIEW_WITH_OFFSET:
         final_back_cover = final_back_cover.translate((
             ASSEMBLY_VIEW_X_OFFSET,
@@ -483,6 +498,7 @@ def foot_base():
     return fb + foot_l - foot_l_hole + foot_r - foot_r_hole
 
 
+@model.part("foot")
 def foot_final():
     final = foot_base()
     final = final.rotate(Axis.Y, 90)
@@ -493,19 +509,17 @@ def foot_final():
     return final
 
 
-show(front_cover(), back_cover(), foot_final(), reset_camera=Camera.KEEP)
-# show(front_cover(), reset_camera=Camera.KEEP)
-# show(back_cover(), reset_camera=Camera.KEEP)
-# show(foot_final(), reset_camera=Camera.KEEP)
+model.show(reset_camera=Camera.KEEP)
+# model.show("front", reset_camera=Camera.KEEP)
+# model.show("back", reset_camera=Camera.KEEP)
+# model.show("foot", reset_camera=Camera.KEEP)
 
 # %%
 # Export
-front_cover_export = front_cover().solids()[0]
-export_model(front_cover_export, f"{PART_NAME}_front")
-
-back_cover_export = back_cover()
-export_model(back_cover_export, f"{PART_NAME}_back")
+# Reuses the parts built for the preview above
+model.export()
 
-foot_export = foot_final()
-export_model(foot_export, f"{PART_NAME}_foot")
+# %%
+# Interference and clearance between the assembled parts
+model.check_assembly()
 # %%
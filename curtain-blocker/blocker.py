@@ -17,6 +17,7 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from _common_parts.screws import *  # noqa: E402
+from _common_parts import performance  # noqa: E402,F401
 from _common_parts.fillet_assist import *  # noqa: E402
 
 
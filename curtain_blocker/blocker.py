@@ -17,8 +17,10 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from _common_parts.screws import *  # noqa: E402
+from _common_parts import performance  # noqa: E402,F401
 from _common_parts.fillet_assist import *  # noqa: E402
 from _common_parts.export import export_model  # noqa: E402
+from _common_parts.part_cache import cached_part  # noqa: E402
 
 
 # Used to name the exported files
@@ -48,6 +50,7 @@ if base_height + blocker_height < 15:
     raise ValueError("Blocker height not long enough to actually block")
 
 
+@cached_part
 def get_dent(is_right=False):
     # Define shape
     dent_shape = Rectangle(base_width, dent_depth)
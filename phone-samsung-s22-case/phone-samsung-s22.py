@@ -19,7 +19,9 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from _common_parts.screws import *  # noqa: E402
+from _common_parts import performance  # noqa: E402,F401
 from _common_parts.export import export_model  # noqa: E402
+from _common_parts.booleans import batch_boolean  # noqa: E402
 
 # Used to name the exported files
 PART_NAME = "s22_case"
@@ -179,6 +181,8 @@ except Exception as e:
     print(f"Failed to fillet lip: {e}")
 
 # Add cutouts for ports and buttons
+# Collected here and subtracted in one pass at the end
+cutouts = []
 
 # Bottom cutout for charging port (USB-C centered)
 # Note this also has mic hole
@@ -194,7 +198,7 @@ charging_cutout = fillet(charging_cutout.edges().filter_by(Axis.Y), 2.0)
 charging_cutout = charging_cutout.move(
     Location((charging_x_offset, -case_height/2 - 1, case_depth/2 + cutout_z_offset)))
 
-phone_case = phone_case - charging_cutout
+cutouts.append(charging_cutout)
 
 # Speaker/mic hole on bottom right
 speaker_width = 12  # mm
@@ -208,7 +212,7 @@ speaker_cutout = fillet(speaker_cutout.edges().filter_by(Axis.Y), 1.5)
 speaker_cutout = speaker_cutout.move(
     Location((-case_width/2 + speaker_x_offset, -case_height/2 - 1, case_depth/2 + cutout_z_offset)))
 
-phone_case = phone_case - speaker_cutout
+cutouts.append(speaker_cutout)
 
 # Microphone hole on bottom (opposite side from USB, at top edge)
 mic_diameter = 3  # mm
@@ -225,7 +229,7 @@ mic_cutout = mic_cutout.rotate(Axis.X, 90)
 mic_cutout = mic_cutout.move(
     Location((8, case_height/2 + 1, case_depth/2 + cutout_z_offset)))
 
-phone_case = phone_case - mic_cutout
+cutouts.append(mic_cutout)
 
 # Side cutout for volume buttons (RIGHT side when looking at back)
 volume_cutout_height = 20  # mm - length of volume rocker
@@ -239,7 +243,7 @@ volume_cutout = fillet(volume_cutout.edges().filter_by(Axis.X), 1.5)
 volume_cutout = volume_cutout.move(
     Location((case_width/2 + 1, case_height/2 + volume_button_y_offset, case_depth/2 + cutout_z_offset)))
 
-phone_case = phone_case - volume_cutout
+cutouts.append(volume_cutout)
 
 # Side cutout for power button (RIGHT side when looking at back)
 power_cutout_height = 12  # mm - power button size
@@ -253,7 +257,7 @@ power_cutout = fillet(power_cutout.edges().filter_by(Axis.X), 1.5)
 power_cutout = power_cutout.move(
     Location((case_width/2 + 1, case_height/2 + power_button_y_offset, case_depth/2 + cutout_z_offset)))
 
-phone_case = phone_case - power_cutout
+cutouts.append(power_cutout)
 
 # Camera cutout (rounded rectangle at top-left corner)
 camera_width = 21.5  # mm - camera island width (X direction)
@@ -286,7 +290,7 @@ camera_y_offset = case_height/2 - camera_height/2 - wall_thickness - 2
 camera_cutout = camera_cutout.move(
     Location((camera_x_offset, camera_y_offset, -1)))
 
-phone_case = phone_case - camera_cutout
+cutouts.append(camera_cutout)
 
 # Flashlight cutout (circular, tapered from 5mm to 6mm diameter)
 flashlight_diameter_top = 6  # mm - at the back surface
@@ -308,7 +312,7 @@ flashlight_cutout = flashlight_cutout.move(
     Location((flashlight_x_offset, flashlight_y_offset, -1))
 )
 
-phone_case = phone_case - flashlight_cutout
+cutouts.append(flashlight_cutout)
 
 # Create an inclined cut for the lip using loft
 lip_incline_depth = 1.0  # Depth of the incline
@@ -340,8 +344,10 @@ lip_incline = lip_incline.move(
     Location((0, 0, case_depth - 0.5))
 )
 
-# Subtract the inclined cut from the phone case
-phone_case = phone_case - lip_incline
+cutouts.append(lip_incline)
+
+# Subtract all cutouts from the phone case at once
+phone_case = batch_boolean(phone_case, cut=cutouts)
 
 # Add nice edge filleting for comfort - with better filtering
 try:
@@ -17,65 +17,75 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from _common_parts.screws import *  # noqa: E402
-from _common_parts.export import export_model  # noqa: E402
+from _common_parts import performance  # noqa: E402,F401
+from _common_parts.instancing import Instances, export_instances  # noqa: E402
+from _common_parts.arrange import arrange  # noqa: E402
 
 # Used to name the exported files
 PART_NAME = "pyramidofconnectors"
 
+# Lay all copies flat on the bed with room between them instead of stacking the pyramid
+ARRANGE_ON_BED = True
+CONNECTOR_COUNT = 30
+BED_SPACING = 3.0
+
 # %%
 
 # NOTE!! This kinda worked but it was way too attached to eachother still got stringy because hopping around.
 
 
-# Load and rotate the source STL
+# Load the source STL once, every copy below references it
 source_stl_path = Path(__file__).parent / "source_connector.stl"
+connector = Instances.from_stl(source_stl_path)
 
-# Part dimensions after rotation
-part_x = 7
-part_y = 7
-part_z = 17
-
-# Pyramid config
-spacing = 0.5  # 0.5mm between parts
+if ARRANGE_ON_BED:
+    # Standing up like in the pyramid, packed side by side on one layer
+    standing = Rot(90, 0, 0) * connector.source
+    connector = arrange([(standing, CONNECTOR_COUNT)], spacing=BED_SPACING)[0][0]
+    pyramid = connector.compound()
+    show(pyramid, reset_camera=Camera.KEEP)
+else:
+    # Part dimensions after rotation
+    part_x = 7
+    part_y = 7
+    part_z = 17
 
-# Pyramid layers: 4x4, 3x3, 2x2, 1x1
-layers = [4, 3, 2, 1]
+    # Pyramid config
+    spacing = 0.5  # 0.5mm between parts
 
-pyramid_parts = []
-current_z = 0
+    # Pyramid layers: 4x4, 3x3, 2x2, 1x1
+    layers = [4, 3, 2, 1]
 
-for layer_idx, layer_size in enumerate(layers):
-    # Calculate offsets for this layer
-    x_step = part_x + spacing
-    y_step = part_y + spacing
+    current_z = 0
 
-    # Center this layer
-    start_x = -(layer_size - 1) * x_step / 2
-    start_y = -(layer_size - 1) * y_step / 2
+    for layer_idx, layer_size in enumerate(layers):
+        # Calculate offsets for this layer
+        x_step = part_x + spacing
+        y_step = part_y + spacing
 
-    for row in range(layer_size):
-        for col in range(layer_size):
-            x_pos = start_x + col * x_step
-            y_pos = start_y + row * y_step
+        # Center this layer
+        start_x = -(layer_size - 1) * x_step / 2
+        start_y = -(layer_size - 1) * y_step / 2
 
-            # Load STL
-            part = import_stl(str(source_stl_path))
+        for row in range(layer_size):
+            for col in range(layer_size):
+                x_pos = start_x + col * x_step
+                y_pos = start_y + row * y_step
 
-            # Try using Location with rotation angles directly
-            loc = Location((x_pos, y_pos, current_z), (90, 0, 0))
-            part = part.locate(loc)
-            pyramid_parts.append(part)
+                # Try using Location with rotation angles directly
+                loc = Location((x_pos, y_pos, current_z), (90, 0, 0))
+                connector.place(loc)
 
-    # Move up for next layer
-    current_z += part_z + spacing
+        # Move up for next layer
+        current_z += part_z + spacing
 
-# Combine all parts
-pyramid = Compound(children=pyramid_parts)
+    # Combine all parts
+    pyramid = connector.compound()
 
-show(pyramid, reset_camera=Camera.KEEP)
+    show(pyramid, reset_camera=Camera.KEEP)
 
 # %%
 # Export
-export_part = pyramid
-export_model(export_part, PART_NAME)
+# One mesh plus a 3MF component per placement
+export_instances(connector, PART_NAME)
 # %%
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Model scripts and _common_parts import from the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,26 @@
+from build123d import Box, Pos
+
+from _common_parts.assembly import check_assembly
+
+
+def test_nested_part_interferes():
+    (pair,) = check_assembly({"outer": Box(20, 20, 20), "inner": Box(5, 5, 5)})
+    assert pair.clearance == 0
+    assert abs(pair.overlap_volume - 125) < 1e-6
+
+
+def test_outer_part_second_interferes():
+    (pair,) = check_assembly({"inner": Box(5, 5, 5), "outer": Box(20, 20, 20)})
+    assert abs(pair.overlap_volume - 125) < 1e-6
+
+
+def test_separate_parts_clear():
+    (pair,) = check_assembly({"left": Box(10, 10, 10), "right": Pos(13, 0, 0) * Box(10, 10, 10)})
+    assert abs(pair.clearance - 3) < 1e-6
+    assert not pair.regions
+
+
+def test_overlapping_parts():
+    (pair,) = check_assembly({"left": Box(10, 10, 10), "right": Pos(8, 0, 0) * Box(10, 10, 10)})
+    assert pair.clearance == 0
+    assert abs(pair.overlap_volume - 200) < 1e-6
@@ -0,0 +1,25 @@
+from build123d import Box, Cylinder, Part, Pos
+
+from _common_parts.booleans import batch_boolean
+
+
+def test_matches_chained_operators():
+    base = Box(20, 20, 5)
+    fuse = [Pos(x, 0, 5) * Box(2, 2, 5) for x in (-6, 0, 6)]
+    cut = [Pos(x, 6, 0) * Cylinder(1, 10) for x in (-6, 0, 6)]
+    chained = base + fuse[0] + fuse[1] + fuse[2] - cut[0] - cut[1] - cut[2]
+    batched = batch_boolean(base, fuse=fuse, cut=cut)
+    assert isinstance(batched, Part)
+    assert abs(batched.volume - chained.volume) < 1e-6
+    assert len(batched.solids()) == 1
+    # Same-domain faces are merged like build123d does
+    assert len(batched.faces()) == len(chained.faces())
+
+
+def test_overlapping_and_coplanar_tools():
+    base = Box(10, 10, 10)
+    # On the base top, one duplicate and one touching its side
+    fuse = [Pos(0, 0, 7.5) * Box(4, 4, 5), Pos(0, 0, 7.5) * Box(4, 4, 5), Pos(4, 0, 7.5) * Box(4, 4, 5)]
+    batched = batch_boolean(base, fuse=fuse, fuzzy=1e-4)
+    assert abs(batched.volume - (1000 + 80 + 80)) < 1e-3
+    assert len(batched.solids()) == 1
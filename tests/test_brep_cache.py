@@ -0,0 +1,51 @@
+from build123d import Box, Part, Solid
+
+from _common_parts import brep_cache
+
+SIZE = 2.0
+calls = []
+
+
+def _side():
+    return SIZE
+
+
+@brep_cache.disk_cached_part
+def cube():
+    calls.append("cube")
+    return Solid.make_box(_side(), 1, 1)
+
+
+@brep_cache.disk_cached_part
+def block():
+    calls.append("block")
+    return Box(SIZE, 1, 1)
+
+
+def _use_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(brep_cache, "BREP_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(brep_cache, "ENABLED", True)
+    calls.clear()
+
+
+def test_hit_returns_same_class(monkeypatch, tmp_path):
+    _use_cache(monkeypatch, tmp_path)
+    built, loaded = cube(), cube()
+    assert calls == ["cube"]
+    assert type(built) is type(loaded) is Solid
+    assert abs(loaded.volume - 2) < 1e-9
+
+
+def test_builder_objects_come_back_as_part(monkeypatch, tmp_path):
+    _use_cache(monkeypatch, tmp_path)
+    built, loaded = block(), block()
+    assert calls == ["block"]
+    assert type(built) is type(loaded) is Part
+
+
+def test_constant_read_by_callee_changes_key(monkeypatch, tmp_path):
+    _use_cache(monkeypatch, tmp_path)
+    cube()
+    monkeypatch.setitem(cube.__wrapped__.__globals__, "SIZE", 3.0)
+    assert abs(cube().volume - 3) < 1e-9
+    assert calls == ["cube", "cube"]
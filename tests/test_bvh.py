@@ -0,0 +1,96 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+from _common_parts.bvh import BVH, _segments_cross, triangle_distance
+
+TRIANGLE = np.array([[0.0, 0, 0], [1, 0, 0], [0, 1, 0]])
+
+
+def _random_triangles(rng, count: int, spread: float, size: float) -> np.ndarray:
+    return rng.uniform(-spread, spread, (count, 1, 3)) + rng.uniform(-size, size, (count, 3, 3))
+
+
+def _sampled_distance(first: np.ndarray, second: np.ndarray, steps: int = 60) -> float:
+    # Closest pair of barycentric grid points, an upper bound within a grid cell
+    u, v = np.meshgrid(np.linspace(0, 1, steps), np.linspace(0, 1, steps))
+    keep = u + v <= 1
+    weights = np.stack([1 - u[keep] - v[keep], u[keep], v[keep]], axis=1)
+    distance, _ = cKDTree(weights @ second).query(weights @ first)
+    return float(distance.min())
+
+
+def test_known_distances():
+    above = TRIANGLE + (0.2, 0.2, 3)
+    beside = TRIANGLE + (2, 0, 0)
+    crossing = np.array([[0.2, 0.2, -1], [0.3, 0.2, 1], [0.2, 0.3, 1]])
+    # Skew edges: x axis edge and a vertical triangle above y = 0.5
+    skew = np.array([[0.5, -1, 2], [0.5, 1, 2], [0.5, 0, 5]])
+    distance = triangle_distance(np.array([TRIANGLE] * 4), np.array([above, beside, crossing, skew]))
+    assert np.allclose(distance, [3, 1, 0, 2])
+
+
+def test_matches_sampling_on_random_pairs():
+    rng = np.random.default_rng(1)
+    first = _random_triangles(rng, 40, 1.5, 1.0)
+    second = _random_triangles(rng, 40, 1.5, 1.0)
+    exact = triangle_distance(first, second)
+    for a, b, d in zip(first, second, exact):
+        sampled = _sampled_distance(a, b)
+        # Never above a real pair of points, and within the grid spacing
+        assert d <= sampled + 1e-9
+        assert sampled - d < 0.1
+
+
+def test_segments_cross():
+    triangles = np.array([TRIANGLE] * 3)
+    p = np.array([[0.2, 0.2, -1], [0.2, 0.2, 0.5], [2, 2, -1]])
+    q = np.array([[0.2, 0.2, 1], [0.2, 0.2, 1], [2, 2, 1]])
+    assert _segments_cross(p, q, triangles).tolist() == [True, False, False]
+
+
+def _box_gap(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    # Gap between the boxes of every pair of triangles, brute force
+    low_a, high_a = first.min(axis=1)[:, None], first.max(axis=1)[:, None]
+    low_b, high_b = second.min(axis=1)[None], second.max(axis=1)[None]
+    apart = np.maximum(np.maximum(low_b - high_a, low_a - high_b), 0)
+    return np.linalg.norm(apart, axis=2)
+
+
+def test_near_pairs_finds_every_close_pair():
+    rng = np.random.default_rng(2)
+    first = _random_triangles(rng, 300, 10, 0.5)
+    second = _random_triangles(rng, 200, 10, 0.5) + (3, 0, 0)
+    expected = np.argwhere(_box_gap(first, second) <= 0.25)
+    mine, theirs, gap = BVH(first).near_pairs(BVH(second), 0.25)
+    found = {(int(i), int(j)) for i, j in zip(mine, theirs)}
+    assert {(int(i), int(j)) for i, j in expected} <= found
+    assert len(found) == len(mine)
+    # Leaf box gaps never exceed the triangles' real distance
+    assert np.all(gap <= triangle_distance(first[mine], second[theirs]) + 1e-9)
+
+
+def test_near_pairs_keeps_closest_pair():
+    rng = np.random.default_rng(3)
+    first = _random_triangles(rng, 200, 5, 0.5)
+    second = _random_triangles(rng, 150, 5, 0.5) + (20, 0, 0)
+    i, j = np.meshgrid(np.arange(len(first)), np.arange(len(second)), indexing="ij")
+    distance = triangle_distance(first[i.ravel()], second[j.ravel()])
+    closest = np.unravel_index(np.argmin(distance), i.shape)
+    mine, theirs, _ = BVH(first).near_pairs(BVH(second), 0.0, closest=True)
+    assert (closest[0], closest[1]) in set(zip(mine.tolist(), theirs.tolist()))
+    assert np.isclose(triangle_distance(first[mine], second[theirs]).min(), distance.min())
+
+
+def test_intersect_box():
+    # Two triangles per side of a unit cube, hit from outside and inside
+    corners = np.array([[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype=float)
+    faces = np.array([[0, 1, 3], [0, 3, 2], [4, 6, 7], [4, 7, 5], [0, 4, 5], [0, 5, 1],
+                      [2, 3, 7], [2, 7, 6], [0, 2, 6], [0, 6, 4], [1, 5, 7], [1, 7, 3]])
+    tree = BVH(corners[faces])
+    origins = [[0.5, 0.5, -2], [0.5, 0.5, 0.5], [3, 3, 3], [0.5, 0.5, -2]]
+    directions = [[0, 0, 1], [1, 0, 0], [1, 0, 0], [0, 0, 1]]
+    distance, face = tree.intersect(origins, directions, max_distance=[np.inf, np.inf, np.inf, 1.0])
+    assert np.allclose(distance, [2, 0.5, np.inf, np.inf])
+    # Bottom face z = 0, then side x = 1
+    assert face[0] in (8, 9) and face[1] in (2, 3)
+    assert face[2] == face[3] == -1
@@ -0,0 +1,10 @@
+from _common_parts import coupons
+from _common_parts.part_cache import dependencies, module_constants
+
+
+def test_builtin_coupon_key_covers_build_and_constants():
+    functions, names = dependencies(coupons._builtin_coupon)
+    assert {f.__name__ for f in functions} >= {"_build", "_footprint", "_block", "_label"}
+    constants = dict(module_constants(coupons._builtin_coupon, names))
+    for name in ("COUPON_HEIGHT", "COUPON_MARGIN", "LABEL_HEIGHT", "LABEL_DEPTH", "PEG_HEIGHT", "SLOT_LENGTH"):
+        assert name in constants
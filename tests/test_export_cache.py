@@ -0,0 +1,44 @@
+from build123d import Box, Pos, Rot
+
+from _common_parts import export_cache
+
+SETTINGS = {"linear_deflection": 0.001}
+
+
+def test_fingerprint_ignores_construction_order():
+    first = Box(10, 10, 10) + Pos(5, 0, 0) * Box(4, 4, 4)
+    second = Pos(5, 0, 0) * Box(4, 4, 4) + Box(10, 10, 10)
+    assert export_cache.fingerprint(first, SETTINGS) == export_cache.fingerprint(second, SETTINGS)
+
+
+def test_fingerprint_changes_with_geometry_and_settings():
+    key = export_cache.fingerprint(Box(10, 10, 10), SETTINGS)
+    assert export_cache.fingerprint(Box(10, 10, 10.01), SETTINGS) != key
+    assert export_cache.fingerprint(Pos(0.01, 0, 0) * Box(10, 10, 10), SETTINGS) != key
+    assert export_cache.fingerprint(Rot(0, 0, 30) * Box(10, 10, 10), SETTINGS) != key
+    assert export_cache.fingerprint(Box(10, 10, 10), {"linear_deflection": 0.01}) != key
+
+
+def _write(stem, text: str):
+    for suffix in (".step", ".stl"):
+        stem.with_name(stem.name + suffix).write_text(text + suffix)
+
+
+def test_store_and_restore(tmp_path, monkeypatch):
+    monkeypatch.setattr(export_cache, "CACHE_DIR", tmp_path / "cache")
+    suffixes = (".step", ".stl")
+    stem = tmp_path / "part"
+    assert not export_cache.restore(stem, "a", suffixes)
+    _write(stem, "a")
+    export_cache.store(stem, "a", suffixes)
+    assert export_cache.restore(stem, "a", suffixes)
+
+    # Another geometry written over it, the first one comes back from the store
+    _write(stem, "b")
+    export_cache.store(stem, "b", suffixes)
+    assert export_cache.restore(stem, "a", suffixes)
+    assert (tmp_path / "part.stl").read_text() == "a.stl"
+
+    # Edited by hand and never stored, it can't count as unchanged
+    stem.with_name("part.step").write_text("edited")
+    assert not export_cache.restore(stem, "c", suffixes)
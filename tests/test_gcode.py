@@ -0,0 +1,42 @@
+import math
+
+import pytest
+
+from _common_parts.gcode import Machine, analyze
+
+
+def _analyze(tmp_path, text: str, machine: Machine = None) -> dict:
+    path = tmp_path / "part.gcode"
+    path.write_text(text)
+    return analyze(path, machine)
+
+
+def test_zero_acceleration_keeps_previous_limits(tmp_path):
+    result = _analyze(tmp_path, "M204 S0\nM201 X0\nG1 X10 F600\n")
+    assert result["seconds"] > 1.0
+    assert result["travel_moves"] == 1
+
+
+def test_zero_acceleration_machine_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="acceleration"):
+        _analyze(tmp_path, "G1 X10\n", Machine(print_acceleration=0))
+
+
+def test_half_circle_arc(tmp_path):
+    arc = _analyze(tmp_path, "G1 X0 Y0 F600\nG2 X20 Y0 I10 J0 E5\n")
+    assert arc["extrusion_moves"] == 1
+    assert math.isclose(arc["filament_mm"], 5)
+    # 31.4 mm at 10 mm/s plus acceleration
+    assert 3.1 < arc["seconds"] < 3.5
+
+
+def test_arc_by_radius_matches_centre(tmp_path):
+    by_centre = _analyze(tmp_path, "G1 F600\nG3 X20 Y0 I10 J0\n")
+    by_radius = _analyze(tmp_path, "G1 F600\nG3 X20 Y0 R10\n")
+    assert math.isclose(by_centre["travel_mm"], 10 * math.pi, rel_tol=1e-3)
+    assert math.isclose(by_radius["travel_mm"], by_centre["travel_mm"], rel_tol=1e-9)
+
+
+def test_arc_outside_xy_plane_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="G18"):
+        _analyze(tmp_path, "G18\nG2 X20 I10\n")
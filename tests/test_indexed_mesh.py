@@ -0,0 +1,31 @@
+import re
+import zipfile
+
+import numpy as np
+from build123d import Box, Pos
+
+from _common_parts import mesh_io
+from _common_parts.indexed_mesh import IndexedMesh
+
+
+def _read_3mf(path) -> tuple:
+    xml = zipfile.ZipFile(path).read("3D/3dmodel.model").decode()
+    vertices = np.array(re.findall(r'<vertex x="([^"]+)" y="([^"]+)" z="([^"]+)"/>', xml), dtype=np.float64)
+    faces = np.array(re.findall(r'<triangle v1="(\d+)" v2="(\d+)" v3="(\d+)"/>', xml), dtype=np.int32)
+    return vertices.astype(np.float32), faces
+
+
+def test_3mf_keeps_float32_vertices(tmp_path):
+    # Far from the origin, where 6 significant digits lose whole micrometres
+    mesh = IndexedMesh.from_part(Pos(123.456, -78.9, 300.1) * Box(10, 20, 30))
+    vertices, faces = _read_3mf(mesh.write_3mf(tmp_path / "part.3mf"))
+    assert np.array_equal(vertices, mesh.vertices)
+    assert np.array_equal(faces, mesh.faces)
+
+
+def test_welding_shares_vertices():
+    mesh = IndexedMesh.from_part(Box(10, 10, 10))
+    assert len(mesh.vertices) == 8
+    assert len(mesh) == 12
+    assert abs(mesh_io.volume(mesh.triangles) - 1000) < 1e-3
+
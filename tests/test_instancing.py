@@ -0,0 +1,44 @@
+import numpy as np
+from build123d import Box, Location
+from build123d.mesher import Mesher
+from OCP.gp import gp_Pnt
+
+from _common_parts import draft, export_cache, mesh_io
+from _common_parts.export import export_session
+from _common_parts.instancing import Instances, _transform_3mf, export_instances
+
+
+def test_transform_3mf_matches_location():
+    location = Location((10, -20, 5), (30, 45, 60))
+    transform = _transform_3mf(Mesher().wrapper, location)
+    # 3MF row vectors: [x y z 1] times the 4x3 matrix
+    matrix = np.array([[transform.Fields[row][col] for col in range(3)] for row in range(4)])
+    points = np.array([[0, 0, 0], [1, 0, 0], [0, 2, 0], [3, 4, 5]], dtype=float)
+    moved = np.hstack([points, np.ones((len(points), 1))]) @ matrix
+    trsf = location.wrapped.Transformation()
+    expected = [(q.X(), q.Y(), q.Z()) for q in (gp_Pnt(*p).Transformed(trsf) for p in points)]
+    assert np.allclose(moved, expected, atol=1e-6)
+
+
+def test_export_instances(tmp_path, monkeypatch):
+    monkeypatch.setattr(export_cache, "ENABLED", False)
+    boxes = Instances(Box(1, 2, 3))
+    boxes.place(Location((0, 0, 0)))
+    boxes.place(Location((10, 0, 0), (0, 0, 90)))
+    with export_session(tmp_path) as session:
+        export_instances(boxes, "boxes")
+    assert sorted(p.name for p in session.files) == ["boxes.3mf", "boxes.step", "boxes.stl"]
+    triangles = mesh_io.read_stl(tmp_path / "boxes.stl")["vertices"]
+    assert abs(mesh_io.volume(triangles) - 12) < 1e-4
+    # The rotated copy is 2 wide in x around x = 10
+    second = triangles[triangles[..., 0].min(axis=1) > 5]
+    assert np.allclose([second[..., 0].min(), second[..., 0].max()], [9, 11], atol=1e-5)
+
+
+def test_draft_mode_skips_export(tmp_path, monkeypatch):
+    monkeypatch.setattr(draft, "ENABLED", True)
+    boxes = Instances(Box(1, 2, 3))
+    boxes.place(Location((0, 0, 0)))
+    with export_session(tmp_path):
+        assert export_instances(boxes, "boxes") == {}
+    assert not list(tmp_path.iterdir())
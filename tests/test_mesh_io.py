@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from build123d import Box, export_stl
+
+from _common_parts import mesh_io
+
+# Unit tetrahedron, outward facing
+VERTICES = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]], dtype=np.float32)
+FACES = np.array([[0, 2, 1], [0, 1, 3], [0, 3, 2], [1, 2, 3]])
+
+
+def test_round_trip(tmp_path):
+    triangles = VERTICES[FACES]
+    attributes = np.arange(4, dtype=np.uint16)
+    path = mesh_io.write_stl(tmp_path / "tet.stl", triangles, attributes=attributes, header=b"tetrahedron")
+    data = mesh_io.read_stl(path)
+    assert np.array_equal(data["vertices"], triangles)
+    assert np.array_equal(data["attribute"], attributes)
+    assert np.allclose(data["normal"], mesh_io.face_normals(triangles))
+    assert mesh_io.read_header(path) == b"tetrahedron"
+    assert abs(mesh_io.volume(data["vertices"]) - 1 / 6) < 1e-7
+
+
+def test_indexed_write_and_record_copy(tmp_path):
+    first = mesh_io.write_stl(tmp_path / "indexed.stl", VERTICES, FACES)
+    second = mesh_io.write_stl(tmp_path / "copy.stl", mesh_io.read_stl(first))
+    assert first.read_bytes() == second.read_bytes()
+
+
+def test_empty_mesh(tmp_path):
+    path = mesh_io.write_stl(tmp_path / "empty.stl", np.zeros((0, 3, 3), np.float32))
+    assert len(mesh_io.read_stl(path)) == 0
+
+
+def test_truncated_file_is_rejected(tmp_path):
+    path = mesh_io.write_stl(tmp_path / "tet.stl", VERTICES[FACES])
+    path.write_bytes(path.read_bytes()[:-10])
+    with pytest.raises(ValueError, match="bytes"):
+        mesh_io.read_stl(path)
+
+
+def test_ascii_stl(tmp_path):
+    path = tmp_path / "box.stl"
+    export_stl(Box(10, 20, 30), str(path), ascii_format=True)
+    with pytest.raises(ValueError, match="ASCII"):
+        mesh_io.read_stl(path)
+    data = mesh_io.load_stl(path)
+    assert len(data) == 12
+    assert abs(mesh_io.volume(data["vertices"]) - 6000) < 1e-2
+    assert abs(mesh_io.surface_area(data["vertices"]) - 2200) < 1e-2
+
+
+def test_reads_occt_binary_stl(tmp_path):
+    path = tmp_path / "box.stl"
+    export_stl(Box(10, 20, 30), str(path))
+    assert abs(mesh_io.volume(mesh_io.read_stl(path)["vertices"]) - 6000) < 1e-2
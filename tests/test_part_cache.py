@@ -0,0 +1,45 @@
+from build123d import Box, Part, Pos
+
+from _common_parts import draft
+from _common_parts.part_cache import cached_part
+
+WIDTH = 2.0
+SCALE = 1.0
+
+
+def _height():
+    return 3.0 * SCALE
+
+
+@cached_part
+def block(depth=1.0):
+    return Box(WIDTH, depth, _height())
+
+
+def test_hits_share_geometry_without_aliasing():
+    block.cache_clear()
+    first = block()
+    first.move(Pos(100, 0, 0))
+    second = block(depth=1.0)
+    assert block.cache_info()["hits"] >= 1
+    assert type(second) is Part
+    assert abs(second.center().X) < 1e-9
+
+
+def test_key_follows_constants_and_callees(monkeypatch):
+    block.cache_clear()
+    assert abs(block().volume - 6) < 1e-9
+    monkeypatch.setitem(globals(), "WIDTH", 4.0)
+    assert abs(block().volume - 12) < 1e-9
+    # SCALE is only read by _height
+    monkeypatch.setitem(globals(), "SCALE", 2.0)
+    assert abs(block().volume - 24) < 1e-9
+
+
+def test_draft_mode_has_its_own_entries(monkeypatch):
+    block.cache_clear()
+    block()
+    misses = block.cache_info()["misses"]
+    monkeypatch.setattr(draft, "ENABLED", True)
+    block()
+    assert block.cache_info()["misses"] == misses + 1
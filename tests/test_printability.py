@@ -0,0 +1,54 @@
+import math
+
+import numpy as np
+from build123d import Box, Plane, Polygon, extrude
+
+from _common_parts.indexed_mesh import IndexedMesh
+from _common_parts.printability import analyze, edges, write_heatmap
+
+
+def test_hollow_box_wall_thickness():
+    wall = 1.5
+    shell = Box(20, 20, 20) - Box(20 - 2 * wall, 20 - 2 * wall, 20 - 2 * wall)
+    report = analyze(IndexedMesh.from_part(shell))
+    assert abs(report.thickness.min() - wall) < 1e-3
+    assert report.thin_area == 0
+
+
+def test_underside_overhang():
+    # Foot on the bed, then an underside rising 30 deg from the bed, 60 deg from vertical
+    run = 10 / math.tan(math.radians(30))
+    profile = Polygon((0, 0), (10, 0), (10 + run, 10), (0, 10), align=None)
+    report = analyze(IndexedMesh.from_part(extrude(Plane.XZ * profile, 10)))
+    centres = report.mesh.triangles.mean(axis=1)
+    underside = np.isclose(report.normals[:, 2], -math.cos(math.radians(30)), atol=1e-3)
+    on_bed = np.isclose(centres[:, 2], 0) & (report.normals[:, 2] < -0.99)
+    assert underside.any() and on_bed.any()
+    assert report.overhang[underside].all()
+    assert not report.overhang[on_bed].any()
+    assert report.overhang.sum() == underside.sum()
+    # Straight down to the bed from each underside face
+    assert np.allclose(report.support_height[underside], centres[underside, 2])
+
+
+def test_open_box_edges(tmp_path):
+    mesh = IndexedMesh.from_part(Box(10, 10, 10))
+    top = mesh.triangles[:, :, 2].min(axis=1) > 4.99
+    assert top.sum() == 2
+    report = analyze(IndexedMesh(mesh.vertices, mesh.faces[~top]))
+    assert len(report.open_edges) == 4
+    assert len(report.non_manifold_edges) == 0
+    # One side triangle along each open edge
+    assert report.bad_edge_faces.sum() == 4
+
+    heatmap = write_heatmap(tmp_path / "open.ply", report)
+    header = heatmap.read_bytes().split(b"end_header\n")[0].decode()
+    assert "element vertex 30" in header and "element face 10" in header
+
+
+def test_edges_of_closed_mesh():
+    mesh = IndexedMesh.from_part(Box(10, 10, 10))
+    edge_list, counts, sides = edges(mesh.faces)
+    assert len(edge_list) == 18
+    assert np.all(counts == 2)
+    assert sides.shape == (12, 3)
@@ -0,0 +1,37 @@
+from build123d import Box, Compound, Pos, export_step
+
+from _common_parts.indexed_mesh import IndexedMesh
+from _common_parts.regression import compare_part, hausdorff
+
+
+def test_hausdorff_of_identical_and_shifted_boxes():
+    box = IndexedMesh.from_part(Box(10, 20, 30))
+    shifted = IndexedMesh.from_part(Pos(0.1, 0, 0) * Box(10, 20, 30))
+    assert hausdorff(box, box, samples=2000) < 1e-6
+    assert abs(hausdorff(box, shifted, samples=2000) - 0.1) < 1e-4
+
+
+def test_empty_mesh_is_no_crash():
+    box = IndexedMesh.from_part(Box(10, 10, 10))
+    empty = IndexedMesh.from_part(Compound([]))
+    assert len(empty) == 0
+    assert hausdorff(empty, empty) == 0
+    assert hausdorff(box, empty) == float("inf")
+
+
+def test_reference_without_faces_fails(tmp_path):
+    rebuilt, reference = tmp_path / "rebuilt", tmp_path / "reference"
+    rebuilt.mkdir()
+    reference.mkdir()
+    export_step(Box(10, 10, 10), str(rebuilt / "part.step"))
+    export_step(Compound([]), str(reference / "part.step"))
+    result = compare_part("part", rebuilt, reference, samples=500)
+    assert not result["ok"]
+    assert "reference has no faces" in result["failures"]
+
+
+def test_same_part_passes(tmp_path):
+    export_step(Box(10, 10, 10), str(tmp_path / "part.step"))
+    result = compare_part("part", tmp_path, tmp_path, samples=500)
+    assert result["ok"]
+    assert result["hausdorff"] < 1e-6
@@ -0,0 +1,37 @@
+from _common_parts.toolpath import Toolpath, summarize
+
+GCODE = b"""\
+;LAYER_COUNT:2
+;LAYER_HEIGHT:0.2
+G90
+M82
+G92 E0
+G1 X10 Y0 Z0.2 F3000
+G1 X20 Y0 E1
+G1 E0.5
+G0 X30 Y5
+;LAYER:0
+G1 X40 Y5 E2
+G0 X50 Y5
+;LAYER:1
+G1 E1.5
+G0 X60 Y5 Z0.4
+G1 X70 Y5 E3
+"""
+
+
+def test_layer_count_comment_is_no_layer_change(tmp_path):
+    path = tmp_path / "part.gcode"
+    path.write_bytes(GCODE)
+    toolpath = Toolpath.from_gcode(path)
+    assert toolpath.layer.tolist() == [-1, -1, -1, -1, 0, 0, 1, 1, 1]
+
+
+def test_moves_before_first_layer_are_counted(tmp_path):
+    path = tmp_path / "part.gcode"
+    path.write_bytes(GCODE)
+    report = Toolpath.from_gcode(path).layer_report()
+    assert [row["layer"] for row in report] == [-1, 0, 1]
+    totals = summarize(report)
+    assert totals["travels"] == 4
+    assert totals["retractions"] == 2